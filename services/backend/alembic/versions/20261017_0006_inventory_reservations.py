@@ -0,0 +1,50 @@
+"""move open orders from stock decrements to reservations
+
+Revision ID: 20261017_0006
+Revises: 20260224_0005
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+
+
+revision = '20261017_0006'
+down_revision = '20260224_0005'
+branch_labels = None
+depends_on = None
+
+
+OPEN_ORDER_QTY = """
+    COALESCE(
+        (
+            SELECT SUM(order_items.qty_ordered)
+            FROM order_items
+            JOIN orders ON orders.id = order_items.order_id
+            WHERE order_items.product_id = products.id
+              AND orders.status IN ('RECEIVED', 'PICKING', 'SUBSTITUTION_PENDING')
+        ),
+        0
+    )
+"""
+
+
+def upgrade() -> None:
+    op.execute(
+        f"""
+        UPDATE products
+        SET
+            stock_qty = stock_qty + {OPEN_ORDER_QTY},
+            reserved_qty = {OPEN_ORDER_QTY}
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute(
+        """
+        UPDATE products
+        SET
+            stock_qty = stock_qty - reserved_qty,
+            reserved_qty = 0
+        """
+    )
@@ -0,0 +1,34 @@
+"""trigram indexes for product search
+
+Revision ID: 20261017_0007
+Revises: 20261017_0006
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+
+
+revision = '20261017_0007'
+down_revision = '20261017_0006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # pg_trgm splits text into 3-character grams regardless of word breaks, so
+    # the same GIN index serves ILIKE '%앞다리%' and word_similarity on Korean
+    # compound names. Other dialects use the in-process index in app.search.
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.execute('CREATE INDEX IF NOT EXISTS ix_products_name_trgm ON products USING gin (name gin_trgm_ops)')
+    op.execute(
+        'CREATE INDEX IF NOT EXISTS ix_products_description_trgm ON products USING gin (description gin_trgm_ops)'
+    )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute('DROP INDEX IF EXISTS ix_products_description_trgm')
+    op.execute('DROP INDEX IF EXISTS ix_products_name_trgm')
@@ -0,0 +1,32 @@
+"""persist product effective price for listing filters and sorts
+
+Revision ID: 20261017_0008
+Revises: 20261017_0007
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '20261017_0008'
+down_revision = '20261017_0007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('products', sa.Column('effective_price', sa.Numeric(12, 2), nullable=True))
+    op.execute('UPDATE products SET effective_price = COALESCE(sale_price, base_price)')
+    op.alter_column('products', 'effective_price', nullable=False)
+    op.create_index(
+        'ix_products_listing_price',
+        'products',
+        ['is_visible', 'status', 'effective_price', 'id'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_products_listing_price', table_name='products')
+    op.drop_column('products', 'effective_price')
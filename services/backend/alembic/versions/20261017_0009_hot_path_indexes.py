@@ -0,0 +1,41 @@
+"""indexes for hot-path lookups
+
+Revision ID: 20261017_0009
+Revises: 20261017_0008
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+
+
+revision = '20261017_0009'
+down_revision = '20261017_0008'
+branch_labels = None
+depends_on = None
+
+
+INDEXES = [
+    ('ix_cart_items_cart_id', 'cart_items', ['cart_id']),
+    ('ix_order_items_order_id', 'order_items', ['order_id']),
+    ('ix_order_status_logs_order_id', 'order_status_logs', ['order_id']),
+    ('ix_refunds_order_id', 'refunds', ['order_id']),
+    ('ix_orders_customer_phone', 'orders', ['customer_phone']),
+    ('ix_orders_status_ordered_at', 'orders', ['status', 'ordered_at']),
+    ('ix_products_listing_popularity', 'products', ['is_visible', 'status', 'popularity']),
+    ('ix_promotions_active_window', 'promotions', ['is_active', 'start_at', 'end_at']),
+]
+
+
+def upgrade() -> None:
+    # CONCURRENTLY cannot run inside a transaction and does not block writes
+    # on the live tables. IF NOT EXISTS makes a retry after a failed build safe
+    # once the invalid index left behind has been dropped.
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, unique=False, if_not_exists=True, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
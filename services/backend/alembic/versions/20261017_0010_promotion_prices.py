@@ -0,0 +1,47 @@
+"""apply live promotion prices to products
+
+Revision ID: 20261017_0010
+Revises: 20261017_0009
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '20261017_0010'
+down_revision = '20261017_0009'
+branch_labels = None
+depends_on = None
+
+
+LIVE_PROMOTION_PRODUCTS = """
+    FROM promotion_products
+    JOIN promotions ON promotions.id = promotion_products.promotion_id
+    WHERE promotion_products.product_id = products.id
+      AND promotions.is_active
+      AND promotions.start_at <= now()
+      AND promotions.end_at >= now()
+"""
+
+
+def upgrade() -> None:
+    op.add_column('products', sa.Column('promo_price', sa.Numeric(12, 2), nullable=True))
+    op.add_column('products', sa.Column('on_promotion', sa.Boolean(), nullable=False, server_default=sa.false()))
+    # Initial state; the app's promotion price scheduler keeps it current.
+    op.execute(
+        f"""
+        UPDATE products
+        SET
+            promo_price = (SELECT MIN(promotion_products.promo_price) {LIVE_PROMOTION_PRODUCTS}),
+            on_promotion = EXISTS (SELECT 1 {LIVE_PROMOTION_PRODUCTS})
+        """
+    )
+    # LEAST ignores NULLs, so a missing sale or promo price drops out.
+    op.execute('UPDATE products SET effective_price = LEAST(base_price, sale_price, promo_price)')
+
+
+def downgrade() -> None:
+    op.execute('UPDATE products SET effective_price = COALESCE(sale_price, base_price)')
+    op.drop_column('products', 'on_promotion')
+    op.drop_column('products', 'promo_price')
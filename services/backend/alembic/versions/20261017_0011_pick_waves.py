@@ -0,0 +1,55 @@
+"""add pick waves with order-to-tote assignments
+
+Revision ID: 20261017_0011
+Revises: 20261017_0010
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '20261017_0011'
+down_revision = '20261017_0010'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'pick_waves',
+        sa.Column('id', sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column(
+            'status',
+            sa.Enum('PLANNED', 'PICKING', 'COMPLETED', 'CANCELED', name='wavestatus'),
+            nullable=False,
+        ),
+        sa.Column('slot_start', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('delivery_zone_id', sa.Integer(), sa.ForeignKey('delivery_zones.id'), nullable=True),
+        sa.Column('order_count', sa.Integer(), nullable=False),
+        sa.Column('item_count', sa.Integer(), nullable=False),
+        sa.Column('tote_count', sa.Integer(), nullable=False),
+        sa.Column('created_by', sa.String(length=60), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+    )
+    op.create_index('ix_pick_waves_status_slot', 'pick_waves', ['status', 'slot_start'], unique=False)
+    op.create_table(
+        'pick_wave_orders',
+        sa.Column('id', sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column('wave_id', sa.Integer(), sa.ForeignKey('pick_waves.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('order_id', sa.Integer(), sa.ForeignKey('orders.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('first_tote', sa.Integer(), nullable=False),
+        sa.Column('tote_count', sa.Integer(), nullable=False),
+        sa.Column('item_count', sa.Integer(), nullable=False),
+        sa.UniqueConstraint('order_id', name='uq_pick_wave_orders_order_id'),
+    )
+    op.create_index('ix_pick_wave_orders_wave_id', 'pick_wave_orders', ['wave_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_pick_wave_orders_wave_id', table_name='pick_wave_orders')
+    op.drop_table('pick_wave_orders')
+    op.drop_index('ix_pick_waves_status_slot', table_name='pick_waves')
+    op.drop_table('pick_waves')
+    sa.Enum(name='wavestatus').drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,40 @@
+"""materialize approved refund totals on orders
+
+Revision ID: 20261017_0012
+Revises: 20261017_0011
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '20261017_0012'
+down_revision = '20261017_0011'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'orders',
+        sa.Column('refunded_total', sa.Numeric(12, 2), server_default='0', nullable=False),
+    )
+    op.execute(
+        """
+        UPDATE orders
+        SET refunded_total = COALESCE(
+            (
+                SELECT SUM(refunds.amount)
+                FROM refunds
+                WHERE refunds.order_id = orders.id
+                  AND refunds.status IN ('APPROVED', 'DONE')
+            ),
+            0
+        )
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('orders', 'refunded_total')
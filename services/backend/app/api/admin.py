@@ -1,12 +1,28 @@
-from datetime import datetime, timezone
+from dataclasses import replace
+from datetime import datetime
 from decimal import Decimal
 
 from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request
-from sqlalchemy import and_, func, or_, select
+from fastapi.responses import StreamingResponse
+from sqlalchemy import and_, insert, select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
 from app.api.utils import order_to_schema, product_to_schema
-from app.db import get_db
+from app.cache import admin_auth_cache, attach_cached_row, catalog_cache, snapshot_row, user_auth_cache
+from app.compression import compression_stats
+from app.coverage import (
+    CoverageAddress,
+    CoverageInputError,
+    CoverageMatcher,
+    iter_csv,
+    iter_ndjson,
+    parse_csv,
+    parse_json,
+)
+from app.db import get_db, pool_stats
+from app.inventory import StockReservationError, consume_stock
 from app.models import (
     AdminUser,
     AuditLog,
@@ -18,14 +34,20 @@ from app.models import (
     OrderItem,
     OrderStatus,
     OrderStatusLog,
+    PickWave,
+    PickWaveOrder,
     Product,
     ProductStatus,
     Promotion,
     PromotionProduct,
     Refund,
+    WaveStatus,
     ZoneType,
 )
+from app.pagination import NEXT_CURSOR_HEADER, KeysetColumn, KeysetSort, paginate, split_page
+from app.passwords import password_hasher
 from app.schemas import (
+    AdminBulkOrderStatusUpdate,
     AdminLoginResponse,
     AdminOrderStatusUpdate,
     AdminPromotionOut,
@@ -38,15 +60,20 @@ from app.schemas import (
     BannerOut,
     BannerPatchInput,
     BannerUpsertInput,
+    BulkOrderStatusResultOut,
+    BulkOrderStatusUpdateOut,
     InventoryUpdateInput,
     NoticeOut,
     NoticePatchInput,
     NoticeUpsertInput,
+    OrderOut,
     PolicyOut,
     PolicyPatchInput,
-    PickingListItemOut,
     PickingListOut,
-    PickingListSummaryOut,
+    PickRouteOut,
+    PickWaveDetailOut,
+    PickWaveOrderOut,
+    PickWaveOut,
     ProductCreateInput,
     ProductPatchInput,
     ProductOut,
@@ -57,11 +84,51 @@ from app.schemas import (
     OrderRefundSummaryOut,
     OrderStatusLogOut,
     ShortageActionInput,
+    ShortageBatchInput,
+    WavePlanInput,
+    WaveStatusUpdate,
+)
+from app.services import (
+    DomainError,
+    bulk_update_order_status,
+    effective_price,
+    get_or_create_policy,
+    get_order_with_items,
+    require_admin,
+    select_orders_with_items,
+    to_decimal,
+    update_order_status,
+)
+from app.picking import (
+    build_picking_list,
+    iter_picking_csv,
+    iter_picking_ndjson,
+    iter_picking_records,
+    picking_item,
+    picking_list_query,
 )
-from app.services import DomainError, effective_price, get_or_create_policy, require_admin, to_decimal, update_order_status
+from app.pick_route import pick_route_to_schema, store_layout
+from app.waves import WAVE_PICK_STATUSES, WaveLimits, plan_waves, update_wave_status
+from app.pricing import promotion_price_scheduler, refresh_promotion_prices
+from app.refunds import add_refunded_totals
+from app.responses import trusted_json
+from app.search import product_search_index
+from app.zones import radius_zone_index
 
 router = APIRouter(prefix='/admin', tags=['admin'])
 
+ORDER_PAGE_LIMIT = 200
+PRODUCT_PAGE_LIMIT = 500
+
+ORDER_SORT = KeysetSort(
+    'ordered_at',
+    [
+        KeysetColumn(Order.ordered_at, True, lambda order: order.ordered_at, datetime),
+        KeysetColumn(Order.id, True, lambda order: order.id),
+    ],
+)
+PRODUCT_SORT = KeysetSort('id', [KeysetColumn(Product.id, False, lambda product: product.id)])
+
 
 def parse_admin_token(token: str) -> int:
     if not token.startswith('admin-'):
@@ -76,6 +143,10 @@ def require_admin_token(
     if not x_admin_token:
         raise HTTPException(status_code=401, detail={'code': 'UNAUTHORIZED', 'message': '관리자 토큰이 필요합니다.'})
 
+    cached = admin_auth_cache.get(x_admin_token)
+    if cached is not None:
+        return attach_cached_row(db, AdminUser, cached)
+
     try:
         admin_id = parse_admin_token(x_admin_token)
     except Exception:
@@ -85,6 +156,7 @@ def require_admin_token(
     if not admin or not admin.is_active:
         raise HTTPException(status_code=401, detail={'code': 'UNAUTHORIZED', 'message': '유효하지 않은 관리자 계정입니다.'})
 
+    admin_auth_cache.set(x_admin_token, admin.id, snapshot_row(admin))
     return admin
 
 
@@ -97,37 +169,53 @@ def add_audit(
     after_json: dict | None = None,
     before_json: dict | None = None,
 ) -> None:
-    db.add(
-        AuditLog(
-            actor_type='ADMIN',
-            actor_id=str(admin.id),
-            entity_type=entity_type,
-            entity_id=entity_id,
-            action=action,
-            before_json=before_json,
-            after_json=after_json,
-        )
-    )
+    db.add(AuditLog(**audit_row(admin, entity_type, entity_id, action, after_json, before_json)))
 
 
-def sum_approved_refunds(db: Session, order_id: int) -> Decimal:
-    total = db.scalar(
-        select(func.coalesce(func.sum(Refund.amount), 0)).where(
-            and_(Refund.order_id == order_id, Refund.status.in_(['APPROVED', 'DONE']))
-        )
-    )
-    return to_decimal(total)
+def audit_row(
+    admin: AdminUser,
+    entity_type: str,
+    entity_id: str,
+    action: str,
+    after_json: dict | None = None,
+    before_json: dict | None = None,
+) -> dict:
+    # Column values of an admin audit row, for bulk inserts.
+    return {
+        'actor_type': 'ADMIN',
+        'actor_id': str(admin.id),
+        'entity_type': entity_type,
+        'entity_id': entity_id,
+        'action': action,
+        'before_json': before_json,
+        'after_json': after_json,
+    }
 
 
-def refresh_order_final_total(db: Session, order: Order) -> None:
-    refunded = sum_approved_refunds(db, order.id)
-    recalculated = to_decimal(order.total_estimated) - refunded
+def refresh_order_final_total(order: Order) -> None:
+    recalculated = to_decimal(order.total_estimated) - to_decimal(order.refunded_total)
     if recalculated < Decimal('0'):
         recalculated = Decimal('0')
     order.total_final = recalculated
 
 
-def get_order_refund_summary(order: Order, refunded_total: Decimal) -> OrderRefundSummaryOut:
+def record_refunded_totals(db: Session, amounts: dict[int, Decimal]) -> None:
+    # validate_refund_limit checked the totals as read; add_refunded_totals
+    # re-checks them as stored, in case another refund committed in between.
+    updated = add_refunded_totals(db, amounts)
+    if any(amount > Decimal('0') and order_id not in updated for order_id, amount in amounts.items()):
+        raise HTTPException(
+            status_code=400,
+            detail={
+                'code': 'REFUND_LIMIT_EXCEEDED',
+                'message': '다른 환불이 먼저 처리되어 환불 가능 잔액을 초과했습니다.',
+            },
+        )
+
+
+def get_order_refund_summary(order: Order, refunded_total: Decimal | None = None) -> OrderRefundSummaryOut:
+    if refunded_total is None:
+        refunded_total = to_decimal(order.refunded_total)
     total_estimated = to_decimal(order.total_estimated)
     refundable_remaining = total_estimated - refunded_total
     if refundable_remaining < Decimal('0'):
@@ -152,6 +240,63 @@ def validate_refund_limit(order: Order, current_refunded_total: Decimal, pending
         )
 
 
+def shortage_item_state(item: OrderItem) -> dict:
+    return {
+        'item_status': item.item_status,
+        'qty_fulfilled': item.qty_fulfilled,
+        'line_final': str(item.line_final) if item.line_final is not None else None,
+        'substitution_product_id': item.substitution_product_id,
+    }
+
+
+def apply_shortage_action(
+    order: Order,
+    item: OrderItem,
+    payload: ShortageActionInput,
+    substitution: Product | None,
+) -> Decimal:
+    # Validates one shortage report and applies it to the order item. Returns
+    # the amount to refund; consuming the substitute's stock is left to the caller.
+    if item.item_status in {'SUBSTITUTED', 'PARTIAL_CANCELED', 'OUT_OF_STOCK'}:
+        raise HTTPException(
+            status_code=400,
+            detail={'code': 'ITEM_ALREADY_PROCESSED', 'message': '이미 처리 완료된 주문 상품입니다.'},
+        )
+
+    if payload.action == 'SUBSTITUTE':
+        if not order.allow_substitution:
+            raise HTTPException(status_code=400, detail={'code': 'SUBSTITUTE_NOT_ALLOWED', 'message': '대체상품 비허용 주문입니다.'})
+        if payload.substitution_product_id is None or payload.substitution_qty is None:
+            raise HTTPException(status_code=400, detail={'code': 'INVALID_REQUEST', 'message': '대체 상품/수량이 필요합니다.'})
+        if not substitution or substitution.status != ProductStatus.ACTIVE:
+            raise HTTPException(status_code=400, detail={'code': 'INVALID_SUBSTITUTION', 'message': '대체 가능한 상품이 아닙니다.'})
+
+        unit_final = to_decimal(effective_price(substitution))
+        line_final = unit_final * payload.substitution_qty
+
+        item.substitution_product_id = substitution.id
+        item.qty_fulfilled = payload.substitution_qty
+        item.unit_price_final = unit_final
+        item.line_final = line_final
+        item.item_status = 'SUBSTITUTED'
+        item.note = payload.reason
+    else:
+        fulfilled_qty = payload.fulfilled_qty if payload.fulfilled_qty is not None else 0
+        if fulfilled_qty > item.qty_ordered:
+            raise HTTPException(status_code=400, detail={'code': 'INVALID_QTY', 'message': '처리 수량이 주문 수량을 초과합니다.'})
+
+        unit_final = to_decimal(item.unit_price_estimated)
+        line_final = unit_final * fulfilled_qty
+
+        item.qty_fulfilled = fulfilled_qty
+        item.unit_price_final = unit_final
+        item.line_final = line_final
+        item.item_status = 'OUT_OF_STOCK' if payload.action == 'OUT_OF_STOCK' or fulfilled_qty == 0 else 'PARTIAL_CANCELED'
+        item.note = payload.reason
+
+    return to_decimal(item.line_estimated) - line_final
+
+
 def refund_to_schema(refund: Refund, summary: OrderRefundSummaryOut | None = None) -> RefundOut:
     return RefundOut(
         id=refund.id,
@@ -293,6 +438,30 @@ def holiday_to_schema(holiday: Holiday) -> HolidayOut:
     )
 
 
+def wave_to_schema(wave: PickWave) -> PickWaveOut:
+    return PickWaveOut(
+        id=wave.id,
+        status=wave.status,
+        slot_start=wave.slot_start,
+        delivery_zone_id=wave.delivery_zone_id,
+        order_count=wave.order_count,
+        item_count=wave.item_count,
+        tote_count=wave.tote_count,
+        created_by=wave.created_by,
+        created_at=wave.created_at,
+    )
+
+
+def parse_wave_statuses(statuses: str | None) -> list[WaveStatus]:
+    try:
+        return [WaveStatus(value.strip()) for value in (statuses or '').split(',') if value.strip()]
+    except ValueError:
+        raise HTTPException(
+            status_code=400,
+            detail={'code': 'INVALID_WAVE_STATUS', 'message': '유효하지 않은 웨이브 상태값입니다.'},
+        )
+
+
 def validate_delivery_zone_fields(
     zone_type: ZoneType,
     dong_code: str | None,
@@ -371,20 +540,42 @@ async def admin_login(request: Request, db: Session = Depends(get_db)) -> AdminL
     return AdminLoginResponse(access_token=f'admin-{admin.id}', role=admin.role)
 
 
-@router.get('/orders')
+@router.get('/metrics')
+def admin_get_metrics(
+    x_admin_token: str | None = Header(default=None),
+    db: Session = Depends(get_db),
+) -> dict:
+    require_admin_token(db, x_admin_token)
+    return {
+        'catalog_cache': catalog_cache.stats(),
+        'user_auth_cache': user_auth_cache.stats(),
+        'admin_auth_cache': admin_auth_cache.stats(),
+        'radius_zone_index': radius_zone_index.stats(),
+        'product_search_index': product_search_index.stats(),
+        'promotion_prices': promotion_price_scheduler.stats(),
+        'password_hasher': password_hasher.stats(),
+        'compression': compression_stats.stats(),
+        'db_pool': pool_stats(),
+    }
+
+
+@router.get('/orders', response_model=list[OrderOut])
 def admin_orders(
     status: str | None = None,
+    cursor: str | None = None,
+    limit: int = Query(default=ORDER_PAGE_LIMIT, ge=1, le=ORDER_PAGE_LIMIT),
     x_admin_token: str | None = Header(default=None),
     db: Session = Depends(get_db),
-) -> list:
+):
     require_admin_token(db, x_admin_token)
 
-    stmt = select(Order).order_by(Order.ordered_at.desc())
+    stmt = select_orders_with_items()
     if status:
         stmt = stmt.where(Order.status == status)
 
-    orders = list(db.scalars(stmt.limit(200)))
-    return [order_to_schema(order) for order in orders]
+    orders, next_cursor = split_page(list(db.scalars(paginate(stmt, ORDER_SORT, cursor, limit))), ORDER_SORT, limit)
+    headers = {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None
+    return trusted_json(list[OrderOut], [order_to_schema(order) for order in orders], headers)
 
 
 @router.get('/orders/{order_id}')
@@ -395,7 +586,7 @@ def admin_order_detail(
 ):
     require_admin_token(db, x_admin_token)
 
-    order = db.get(Order, order_id)
+    order = get_order_with_items(db, order_id)
     if not order:
         raise HTTPException(status_code=404, detail={'code': 'ORDER_NOT_FOUND', 'message': '주문을 찾을 수 없습니다.'})
 
@@ -408,92 +599,164 @@ def admin_get_picking_list(
     keyword: str | None = Query(default=None),
     x_admin_token: str | None = Header(default=None),
     db: Session = Depends(get_db),
-) -> PickingListOut:
+):
     require_admin_token(db, x_admin_token)
     target_statuses = parse_order_statuses(statuses)
 
-    stmt = (
-        select(Order, OrderItem, Product)
-        .join(OrderItem, OrderItem.order_id == Order.id)
-        .outerjoin(Product, Product.id == OrderItem.product_id)
-        .where(Order.status.in_(target_statuses))
-        .order_by(Order.ordered_at.asc(), Order.id.asc(), OrderItem.id.asc())
-    )
+    picking_list = build_picking_list(db.execute(picking_list_query(target_statuses, keyword)))
+    return trusted_json(PickingListOut, picking_list)
 
-    if keyword and keyword.strip():
-        pattern = f"%{keyword.strip()}%"
-        stmt = stmt.where(
-            or_(
-                Order.order_no.ilike(pattern),
-                OrderItem.product_name_snapshot.ilike(pattern),
-                Product.name.ilike(pattern),
-                Product.pick_location.ilike(pattern),
-            )
-        )
 
-    rows = list(db.execute(stmt).all())
-    items: list[PickingListItemOut] = []
-    summary_map: dict[int, dict] = {}
-    order_ids: set[int] = set()
-
-    for order, order_item, product in rows:
-        product_name = product.name if product else order_item.product_name_snapshot
-        unit_label = product.unit_label if product else order_item.unit_snapshot
-        pick_location = product.pick_location if product else None
-
-        items.append(
-            PickingListItemOut(
-                order_id=order.id,
-                order_no=order.order_no,
-                order_status=order.status,
-                ordered_at=order.ordered_at,
-                requested_slot_start=order.requested_slot_start,
-                order_item_id=order_item.id,
-                product_id=order_item.product_id,
-                product_name=product_name,
-                unit_label=unit_label,
-                qty_ordered=order_item.qty_ordered,
-                qty_fulfilled=order_item.qty_fulfilled,
-                pick_location=pick_location,
+@router.get('/picking-list/route', response_model=PickRouteOut)
+def admin_get_pick_route(
+    statuses: str | None = Query(default='RECEIVED,PICKING'),
+    keyword: str | None = Query(default=None),
+    strategy: str | None = Query(default=None, pattern='^(serpentine|nearest)$', description='기본값: PICK_ROUTE_STRATEGY'),
+    x_admin_token: str | None = Header(default=None),
+    db: Session = Depends(get_db),
+):
+    require_admin_token(db, x_admin_token)
+    target_statuses = parse_order_statuses(statuses)
+
+    items = [picking_item(*row) for row in db.execute(picking_list_query(target_statuses, keyword))]
+    pick_route = pick_route_to_schema(items, store_layout, strategy)
+    return trusted_json(PickRouteOut, pick_route)
+
+
+@router.post('/waves', response_model=list[PickWaveOut])
+def admin_plan_waves(
+    payload: WavePlanInput,
+    x_admin_token: str | None = Header(default=None),
+    db: Session = Depends(get_db),
+):
+    admin = require_admin_token(db, x_admin_token)
+    limits = replace(WaveLimits.from_settings(), **payload.model_dump(exclude_none=True))
+
+    try:
+        waves = plan_waves(db, limits, created_by=admin.username)
+        for wave in waves:
+            add_audit(
+                db,
+                admin,
+                'PICK_WAVE',
+                str(wave.id),
+                'PICK_WAVE_PLANNED',
+                after_json={
+                    'order_ids': [wave_order.order_id for wave_order in wave.orders],
+                    'tote_count': wave.tote_count,
+                },
             )
+        db.commit()
+    except IntegrityError:
+        # Another planning run took some of these orders first; the unique
+        # order_id fires on plan_waves' flush or on commit.
+        db.rollback()
+        raise HTTPException(
+            status_code=409,
+            detail={'code': 'WAVE_PLAN_CONFLICT', 'message': '동시에 실행된 웨이브 계획과 충돌했습니다. 다시 시도해 주세요.'},
         )
-        order_ids.add(order.id)
-
-        summary = summary_map.get(order_item.product_id)
-        if not summary:
-            summary = {
-                'product_id': order_item.product_id,
-                'product_name': product_name,
-                'unit_label': unit_label,
-                'pick_location': pick_location,
-                'total_qty_ordered': 0,
-                'order_ids': set(),
-            }
-            summary_map[order_item.product_id] = summary
-
-        summary['total_qty_ordered'] += order_item.qty_ordered
-        summary['order_ids'].add(order.id)
-
-    summary_rows = [
-        PickingListSummaryOut(
-            product_id=entry['product_id'],
-            product_name=entry['product_name'],
-            unit_label=entry['unit_label'],
-            pick_location=entry['pick_location'],
-            total_qty_ordered=entry['total_qty_ordered'],
-            order_count=len(entry['order_ids']),
+    return trusted_json(list[PickWaveOut], [wave_to_schema(wave) for wave in waves])
+
+
+@router.get('/waves', response_model=list[PickWaveOut])
+def admin_get_waves(
+    statuses: str | None = Query(default='PLANNED,PICKING'),
+    x_admin_token: str | None = Header(default=None),
+    db: Session = Depends(get_db),
+):
+    require_admin_token(db, x_admin_token)
+    stmt = select(PickWave).where(PickWave.status.in_(parse_wave_statuses(statuses))).order_by(PickWave.id.asc())
+    return trusted_json(list[PickWaveOut], [wave_to_schema(wave) for wave in db.scalars(stmt)])
+
+
+@router.get('/waves/{wave_id}', response_model=PickWaveDetailOut)
+def admin_get_wave(
+    wave_id: int,
+    strategy: str | None = Query(default=None, pattern='^(serpentine|nearest)$', description='기본값: PICK_ROUTE_STRATEGY'),
+    x_admin_token: str | None = Header(default=None),
+    db: Session = Depends(get_db),
+):
+    # Everything a handheld needs for one wave: order-to-tote assignments and
+    # the pick route over only this wave's lines.
+    require_admin_token(db, x_admin_token)
+    wave = db.get(PickWave, wave_id)
+    if not wave:
+        raise HTTPException(status_code=404, detail={'code': 'WAVE_NOT_FOUND', 'message': '웨이브를 찾을 수 없습니다.'})
+
+    order_rows = db.execute(
+        select(PickWaveOrder, Order.order_no, Order.status)
+        .join(Order, Order.id == PickWaveOrder.order_id)
+        .where(PickWaveOrder.wave_id == wave_id)
+        .order_by(PickWaveOrder.first_tote.asc())
+    )
+    orders = [
+        PickWaveOrderOut(
+            order_id=wave_order.order_id,
+            order_no=order_no,
+            order_status=order_status,
+            first_tote=wave_order.first_tote,
+            tote_count=wave_order.tote_count,
+            item_count=wave_order.item_count,
         )
-        for entry in summary_map.values()
+        for wave_order, order_no, order_status in order_rows
     ]
-    summary_rows.sort(key=lambda row: ((row.pick_location or 'ZZZZ'), row.product_name))
-
-    return PickingListOut(
-        generated_at=datetime.now(timezone.utc),
-        order_count=len(order_ids),
-        line_count=len(items),
-        items=items,
-        summary=summary_rows,
+    items = [picking_item(*row) for row in db.execute(picking_list_query(WAVE_PICK_STATUSES, wave_id=wave_id))]
+    detail = PickWaveDetailOut(
+        **wave_to_schema(wave).model_dump(),
+        orders=orders,
+        route=pick_route_to_schema(items, store_layout, strategy),
     )
+    return trusted_json(PickWaveDetailOut, detail)
+
+
+@router.patch('/waves/{wave_id}/status', response_model=PickWaveOut)
+def admin_update_wave_status(
+    wave_id: int,
+    payload: WaveStatusUpdate,
+    x_admin_token: str | None = Header(default=None),
+    db: Session = Depends(get_db),
+) -> PickWaveOut:
+    admin = require_admin_token(db, x_admin_token)
+    wave = db.get(PickWave, wave_id)
+    if not wave:
+        raise HTTPException(status_code=404, detail={'code': 'WAVE_NOT_FOUND', 'message': '웨이브를 찾을 수 없습니다.'})
+
+    before_status = wave.status
+    try:
+        changed = update_wave_status(wave, payload.status)
+    except DomainError as exc:
+        raise HTTPException(status_code=400, detail={'code': exc.code, 'message': exc.message})
+
+    if changed:
+        add_audit(
+            db,
+            admin,
+            'PICK_WAVE',
+            str(wave.id),
+            'PICK_WAVE_STATUS_UPDATED',
+            before_json={'status': before_status.value},
+            after_json={'status': payload.status.value},
+        )
+    db.commit()
+    db.refresh(wave)
+    return wave_to_schema(wave)
+
+
+@router.get('/picking-list/export')
+def admin_export_picking_list(
+    statuses: str | None = Query(default='RECEIVED,PICKING'),
+    keyword: str | None = Query(default=None),
+    output_format: str = Query(default='ndjson', alias='format', pattern='^(ndjson|csv)$'),
+    x_admin_token: str | None = Header(default=None),
+    db: Session = Depends(get_db),
+) -> StreamingResponse:
+    # Same lines as /picking-list, streamed as they are read, followed by the
+    # per-product summary. Each record carries record_type 'item' or 'summary'.
+    require_admin_token(db, x_admin_token)
+    records = iter_picking_records(picking_list_query(parse_order_statuses(statuses), keyword))
+    if output_format == 'csv':
+        return StreamingResponse(iter_picking_csv(records), media_type='text/csv')
+    return StreamingResponse(iter_picking_ndjson(records), media_type='application/x-ndjson')
 
 
 @router.patch('/orders/{order_id}/status')
@@ -543,6 +806,59 @@ def admin_update_order_status(
     return order_to_schema(order)
 
 
+@router.post('/orders/bulk-status', response_model=BulkOrderStatusUpdateOut)
+def admin_bulk_update_order_status(
+    payload: AdminBulkOrderStatusUpdate,
+    x_admin_token: str | None = Header(default=None),
+    db: Session = Depends(get_db),
+):
+    admin = require_admin_token(db, x_admin_token)
+
+    outcomes = bulk_update_order_status(
+        db,
+        payload.order_ids,
+        payload.status,
+        changed_by=admin.username,
+        reason=payload.reason,
+    )
+    changed = [outcome for outcome in outcomes if outcome.changed]
+    if changed:
+        db.execute(
+            insert(AuditLog),
+            [
+                audit_row(
+                    admin,
+                    'ORDER',
+                    str(outcome.order_id),
+                    'ORDER_STATUS_UPDATED',
+                    before_json={'status': outcome.from_status.value},
+                    after_json={'status': payload.status.value},
+                )
+                for outcome in changed
+            ],
+        )
+    db.commit()
+
+    results = [
+        BulkOrderStatusResultOut(
+            order_id=outcome.order_id,
+            ok=outcome.error is None,
+            changed=outcome.changed,
+            from_status=outcome.from_status,
+            status=payload.status if outcome.error is None else outcome.from_status,
+            error_code=outcome.error.code if outcome.error else None,
+            error_message=outcome.error.message if outcome.error else None,
+        )
+        for outcome in outcomes
+    ]
+    return BulkOrderStatusUpdateOut(
+        requested_count=len(results),
+        changed_count=len(changed),
+        failed_count=sum(1 for result in results if not result.ok),
+        results=results,
+    )
+
+
 @router.post('/orders/{order_id}/shortage-actions')
 def admin_shortage_action(
     order_id: int,
@@ -560,66 +876,21 @@ def admin_shortage_action(
     if not item or item.order_id != order_id:
         raise HTTPException(status_code=404, detail={'code': 'ORDER_ITEM_NOT_FOUND', 'message': '주문 상품을 찾을 수 없습니다.'})
 
-    if item.item_status in {'SUBSTITUTED', 'PARTIAL_CANCELED', 'OUT_OF_STOCK'}:
-        raise HTTPException(
-            status_code=400,
-            detail={'code': 'ITEM_ALREADY_PROCESSED', 'message': '이미 처리 완료된 주문 상품입니다.'},
-        )
-
-    before_state = {
-        'item_status': item.item_status,
-        'qty_fulfilled': item.qty_fulfilled,
-        'line_final': str(item.line_final) if item.line_final is not None else None,
-        'substitution_product_id': item.substitution_product_id,
-    }
-
-    refund_amount = Decimal('0')
+    before_state = shortage_item_state(item)
     action = payload.action
-
-    if action == 'SUBSTITUTE':
-        if not order.allow_substitution:
-            raise HTTPException(status_code=400, detail={'code': 'SUBSTITUTE_NOT_ALLOWED', 'message': '대체상품 비허용 주문입니다.'})
-        if payload.substitution_product_id is None or payload.substitution_qty is None:
-            raise HTTPException(status_code=400, detail={'code': 'INVALID_REQUEST', 'message': '대체 상품/수량이 필요합니다.'})
-
+    substitution = None
+    if action == 'SUBSTITUTE' and payload.substitution_product_id is not None:
         substitution = db.get(Product, payload.substitution_product_id)
-        if not substitution or substitution.status != ProductStatus.ACTIVE:
-            raise HTTPException(status_code=400, detail={'code': 'INVALID_SUBSTITUTION', 'message': '대체 가능한 상품이 아닙니다.'})
+    refund_amount = apply_shortage_action(order, item, payload, substitution)
 
-        available = substitution.stock_qty - substitution.reserved_qty
-        if available < payload.substitution_qty:
+    if action == 'SUBSTITUTE':
+        try:
+            consume_stock(db, {substitution.id: payload.substitution_qty})
+        except StockReservationError:
             raise HTTPException(status_code=400, detail={'code': 'INSUFFICIENT_STOCK', 'message': '대체상품 재고가 부족합니다.'})
 
-        substitution.stock_qty -= payload.substitution_qty
-        unit_final = to_decimal(effective_price(substitution))
-        line_final = unit_final * payload.substitution_qty
-
-        item.substitution_product_id = substitution.id
-        item.qty_fulfilled = payload.substitution_qty
-        item.unit_price_final = unit_final
-        item.line_final = line_final
-        item.item_status = 'SUBSTITUTED'
-        item.note = payload.reason
-        refund_amount = to_decimal(item.line_estimated) - line_final
-    else:
-        fulfilled_qty = payload.fulfilled_qty if payload.fulfilled_qty is not None else 0
-        if fulfilled_qty > item.qty_ordered:
-            raise HTTPException(status_code=400, detail={'code': 'INVALID_QTY', 'message': '처리 수량이 주문 수량을 초과합니다.'})
-
-        unit_final = to_decimal(item.unit_price_estimated)
-        line_final = unit_final * fulfilled_qty
-
-        item.qty_fulfilled = fulfilled_qty
-        item.unit_price_final = unit_final
-        item.line_final = line_final
-        item.item_status = 'OUT_OF_STOCK' if action == 'OUT_OF_STOCK' or fulfilled_qty == 0 else 'PARTIAL_CANCELED'
-        item.note = payload.reason
-
-        refund_amount = to_decimal(item.line_estimated) - line_final
-
-    current_refunded_total = sum_approved_refunds(db, order.id)
     if refund_amount > Decimal('0'):
-        validate_refund_limit(order, current_refunded_total, refund_amount)
+        validate_refund_limit(order, to_decimal(order.refunded_total), refund_amount)
 
     created_refund = None
     if refund_amount > Decimal('0'):
@@ -632,6 +903,9 @@ def admin_shortage_action(
             processed_by=admin.username,
         )
         db.add(created_refund)
+        record_refunded_totals(db, {order.id: refund_amount})
+    else:
+        refresh_order_final_total(order)
 
     if order.status == OrderStatus.RECEIVED:
         update_order_status(
@@ -642,9 +916,7 @@ def admin_shortage_action(
             reason='SHORTAGE_ACTION',
         )
 
-    refresh_order_final_total(db, order)
-    refunded_total_after = sum_approved_refunds(db, order.id)
-    summary_after = get_order_refund_summary(order, refunded_total_after)
+    summary_after = get_order_refund_summary(order)
     add_audit(
         db,
         admin,
@@ -672,6 +944,126 @@ def admin_shortage_action(
     }
 
 
+@router.post('/orders/shortage-actions')
+def admin_batch_shortage_action(
+    payload: ShortageBatchInput,
+    x_admin_token: str | None = Header(default=None),
+    db: Session = Depends(get_db),
+):
+    # A picking session's shortages in one transaction. Orders, items,
+    # substitutes and refund totals are loaded up front, every action is
+    # checked and applied in memory, and the first failure rejects the whole
+    # batch, its detail carrying the action's index. Refund limits are checked
+    # per order against the refunds already approved plus the earlier
+    # actions of the same batch.
+    admin = require_admin_token(db, x_admin_token)
+    actions = payload.actions
+
+    order_ids = list(dict.fromkeys(action.order_id for action in actions))
+    orders = {order.id: order for order in db.scalars(select(Order).where(Order.id.in_(order_ids)))}
+    items = {
+        item.id: item
+        for item in db.scalars(select(OrderItem).where(OrderItem.id.in_([action.order_item_id for action in actions])))
+    }
+    substitution_ids = {action.substitution_product_id for action in actions if action.action == 'SUBSTITUTE'}
+    substitution_ids.discard(None)
+    substitutions = (
+        {product.id: product for product in db.scalars(select(Product).where(Product.id.in_(substitution_ids)))}
+        if substitution_ids
+        else {}
+    )
+    refunded_totals = {order_id: to_decimal(order.refunded_total) for order_id, order in orders.items()}
+    refund_amounts: dict[int, Decimal] = {}
+
+    refund_rows: list[dict] = []
+    audit_rows: list[dict] = []
+    substitution_qty: dict[int, int] = {}
+    for index, action in enumerate(actions):
+        try:
+            order = orders.get(action.order_id)
+            if not order:
+                raise HTTPException(status_code=404, detail={'code': 'ORDER_NOT_FOUND', 'message': '주문을 찾을 수 없습니다.'})
+            item = items.get(action.order_item_id)
+            if not item or item.order_id != order.id:
+                raise HTTPException(
+                    status_code=404,
+                    detail={'code': 'ORDER_ITEM_NOT_FOUND', 'message': '주문 상품을 찾을 수 없습니다.'},
+                )
+
+            before_state = shortage_item_state(item)
+            refund_amount = apply_shortage_action(order, item, action, substitutions.get(action.substitution_product_id))
+            if refund_amount > Decimal('0'):
+                validate_refund_limit(order, refunded_totals[order.id], refund_amount)
+        except HTTPException as exc:
+            raise HTTPException(status_code=exc.status_code, detail={**exc.detail, 'index': index})
+
+        if action.action == 'SUBSTITUTE':
+            substitution_qty[item.substitution_product_id] = (
+                substitution_qty.get(item.substitution_product_id, 0) + action.substitution_qty
+            )
+        if refund_amount > Decimal('0'):
+            refunded_totals[order.id] += refund_amount
+            refund_amounts[order.id] = refund_amounts.get(order.id, Decimal('0')) + refund_amount
+            refund_rows.append(
+                {
+                    'order_id': order.id,
+                    'amount': refund_amount,
+                    'reason': action.reason or f'SHORTAGE_{action.action}',
+                    'method': 'COD_ADJUSTMENT',
+                    'status': 'APPROVED',
+                    'processed_by': admin.username,
+                }
+            )
+        summary = get_order_refund_summary(order, refunded_totals[order.id])
+        audit_rows.append(
+            audit_row(
+                admin,
+                'ORDER_ITEM',
+                str(item.id),
+                f'SHORTAGE_{action.action}',
+                before_json=before_state,
+                after_json={
+                    'order_id': order.id,
+                    'item_status': item.item_status,
+                    'refund_amount': str(refund_amount),
+                    'refundable_remaining': str(summary.refundable_remaining),
+                },
+            )
+        )
+
+    try:
+        consume_stock(db, substitution_qty)
+    except StockReservationError:
+        raise HTTPException(status_code=400, detail={'code': 'INSUFFICIENT_STOCK', 'message': '대체상품 재고가 부족합니다.'})
+
+    created_refunds = (
+        list(db.scalars(insert(Refund).returning(Refund, sort_by_parameter_order=True), refund_rows))
+        if refund_rows
+        else []
+    )
+    db.execute(insert(AuditLog), audit_rows)
+    received_ids = [order_id for order_id in order_ids if orders[order_id].status == OrderStatus.RECEIVED]
+    if received_ids:
+        bulk_update_order_status(db, received_ids, OrderStatus.PICKING, changed_by=admin.username, reason='SHORTAGE_ACTION')
+    record_refunded_totals(db, refund_amounts)
+    for order_id in order_ids:
+        if order_id not in refund_amounts:
+            refresh_order_final_total(orders[order_id])
+    refund_ids = [refund.id for refund in created_refunds]
+    db.commit()
+
+    # Reload what commit expired in two queries rather than one per row.
+    db.scalars(select_orders_with_items().where(Order.id.in_(order_ids))).all()
+    if refund_ids:
+        db.scalars(select(Refund).where(Refund.id.in_(refund_ids))).all()
+    summaries = {order_id: get_order_refund_summary(orders[order_id]) for order_id in order_ids}
+    return {
+        'orders': [order_to_schema(orders[order_id]) for order_id in order_ids],
+        'refunds': [refund_to_schema(refund, summaries[refund.order_id]) for refund in created_refunds],
+        'summaries': list(summaries.values()),
+    }
+
+
 @router.get('/orders/{order_id}/status-logs', response_model=list[OrderStatusLogOut])
 def admin_get_order_status_logs(
     order_id: int,
@@ -706,8 +1098,7 @@ def admin_get_refund_summary(
     if not order:
         raise HTTPException(status_code=404, detail={'code': 'ORDER_NOT_FOUND', 'message': '주문을 찾을 수 없습니다.'})
 
-    refunded_total = sum_approved_refunds(db, order.id)
-    return get_order_refund_summary(order, refunded_total)
+    return get_order_refund_summary(order)
 
 
 @router.get('/orders/{order_id}/refunds', response_model=list[RefundOut])
@@ -722,8 +1113,7 @@ def admin_get_refunds(
     if not order:
         raise HTTPException(status_code=404, detail={'code': 'ORDER_NOT_FOUND', 'message': '주문을 찾을 수 없습니다.'})
 
-    refunded_total = sum_approved_refunds(db, order.id)
-    summary = get_order_refund_summary(order, refunded_total)
+    summary = get_order_refund_summary(order)
     rows = list(
         db.scalars(
             select(Refund).where(Refund.order_id == order_id).order_by(Refund.processed_at.desc(), Refund.id.desc())
@@ -745,7 +1135,7 @@ def admin_create_refund(
     if not order:
         raise HTTPException(status_code=404, detail={'code': 'ORDER_NOT_FOUND', 'message': '주문을 찾을 수 없습니다.'})
 
-    refunded_before = sum_approved_refunds(db, order.id)
+    refunded_before = to_decimal(order.refunded_total)
     validate_refund_limit(order, refunded_before, to_decimal(payload.amount))
 
     refund = Refund(
@@ -757,8 +1147,7 @@ def admin_create_refund(
         processed_by=admin.username,
     )
     db.add(refund)
-
-    refresh_order_final_total(db, order)
+    record_refunded_totals(db, {order.id: to_decimal(payload.amount)})
     add_audit(
         db,
         admin,
@@ -771,27 +1160,25 @@ def admin_create_refund(
 
     db.commit()
     db.refresh(refund)
-    refunded_total = sum_approved_refunds(db, order.id)
-    summary = get_order_refund_summary(order, refunded_total)
+    summary = get_order_refund_summary(order)
 
     return refund_to_schema(refund, summary)
 
 
 @router.get('/products', response_model=list[ProductOut])
 def admin_get_products(
+    cursor: str | None = None,
+    limit: int = Query(default=PRODUCT_PAGE_LIMIT, ge=1, le=PRODUCT_PAGE_LIMIT),
     x_admin_token: str | None = Header(default=None),
     db: Session = Depends(get_db),
 ):
     require_admin_token(db, x_admin_token)
-    products = list(
-        db.scalars(
-            select(Product)
-            .where(Product.is_visible.is_(True))
-            .order_by(Product.id.asc())
-            .limit(500)
-        )
+    stmt = select(Product).where(Product.is_visible.is_(True))
+    products, next_cursor = split_page(
+        list(db.scalars(paginate(stmt, PRODUCT_SORT, cursor, limit))), PRODUCT_SORT, limit
     )
-    return [product_to_schema(product) for product in products]
+    headers = {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None
+    return trusted_json(list[ProductOut], [product_to_schema(product) for product in products], headers)
 
 
 @router.post('/products', response_model=ProductOut)
@@ -827,6 +1214,7 @@ def admin_create_product(
     add_audit(db, admin, 'PRODUCT', payload.sku, 'PRODUCT_CREATED', {'name': payload.name})
 
     db.commit()
+    catalog_cache.bump_version()
     db.refresh(product)
 
     return product_to_schema(product)
@@ -876,7 +1264,7 @@ def admin_patch_product(
     if 'is_visible' in payload_fields and payload.is_visible is not None:
         product.is_visible = payload.is_visible
     if 'stock_qty' in payload_fields and payload.stock_qty is not None:
-        product.stock_qty = payload.stock_qty
+        product.stock_qty = Product.reserved_qty + payload.stock_qty
     if 'max_per_order' in payload_fields and payload.max_per_order is not None:
         product.max_per_order = payload.max_per_order
     if 'pick_location' in payload_fields:
@@ -898,10 +1286,14 @@ def admin_patch_product(
         'PRODUCT',
         str(product_id),
         'PRODUCT_UPDATED',
-        {field: to_audit_value(getattr(product, field)) for field in payload_fields},
+        {
+            field: to_audit_value(payload.stock_qty if field == 'stock_qty' else getattr(product, field))
+            for field in payload_fields
+        },
     )
 
     db.commit()
+    catalog_cache.bump_version()
     db.refresh(product)
 
     return product_to_schema(product)
@@ -931,6 +1323,7 @@ def admin_delete_product(
     )
 
     db.commit()
+    catalog_cache.bump_version()
 
     return {'ok': True, 'product_id': product_id, 'status': product.status.value, 'is_visible': product.is_visible}
 
@@ -947,11 +1340,20 @@ def admin_update_inventory(
     if not product:
         raise HTTPException(status_code=404, detail={'code': 'PRODUCT_NOT_FOUND', 'message': '상품을 찾을 수 없습니다.'})
 
-    product.stock_qty = payload.stock_qty
+    # Evaluated in the UPDATE so a reservation committed meanwhile is not lost.
+    product.stock_qty = Product.reserved_qty + payload.stock_qty
     product.max_per_order = payload.max_per_order
-    add_audit(db, admin, 'PRODUCT', str(product_id), 'INVENTORY_UPDATED', {'stock_qty': payload.stock_qty})
+    add_audit(
+        db,
+        admin,
+        'PRODUCT',
+        str(product_id),
+        'INVENTORY_UPDATED',
+        {'stock_qty': payload.stock_qty, 'reserved_qty': product.reserved_qty},
+    )
 
     db.commit()
+    catalog_cache.bump_version()
     db.refresh(product)
 
     return product_to_schema(product)
@@ -998,8 +1400,10 @@ def admin_create_promotion(
             )
         )
 
+    refresh_promotion_prices(db, payload.product_ids)
     add_audit(db, admin, 'PROMOTION', str(promotion.id), 'PROMOTION_CREATED', {'title': payload.title})
     db.commit()
+    catalog_cache.bump_version()
     db.refresh(promotion)
 
     return promotion_to_schema(db, promotion)
@@ -1018,6 +1422,9 @@ def admin_patch_promotion(
     if not promotion:
         raise HTTPException(status_code=404, detail={'code': 'PROMOTION_NOT_FOUND', 'message': '행사를 찾을 수 없습니다.'})
 
+    affected_product_ids = set(
+        db.scalars(select(PromotionProduct.product_id).where(PromotionProduct.promotion_id == promotion.id))
+    )
     if payload.title is not None:
         promotion.title = payload.title
     if payload.promo_type is not None:
@@ -1047,8 +1454,10 @@ def admin_patch_promotion(
                 )
             )
 
+    refresh_promotion_prices(db, affected_product_ids | set(payload.product_ids or []))
     add_audit(db, admin, 'PROMOTION', str(promotion.id), 'PROMOTION_UPDATED')
     db.commit()
+    catalog_cache.bump_version()
     db.refresh(promotion)
 
     return promotion_to_schema(db, promotion)
@@ -1100,6 +1509,7 @@ def admin_create_banner(
     add_audit(db, admin, 'BANNER', 'new', 'BANNER_CREATED', {'title': payload.title})
 
     db.commit()
+    catalog_cache.bump_version()
     db.refresh(banner)
 
     return BannerOut(
@@ -1147,6 +1557,7 @@ def admin_patch_banner(
 
     add_audit(db, admin, 'BANNER', str(banner_id), 'BANNER_UPDATED')
     db.commit()
+    catalog_cache.bump_version()
     db.refresh(banner)
 
     return BannerOut(
@@ -1204,6 +1615,7 @@ def admin_create_notice(
     add_audit(db, admin, 'NOTICE', 'new', 'NOTICE_CREATED', {'title': payload.title})
 
     db.commit()
+    catalog_cache.bump_version()
     db.refresh(notice)
 
     return NoticeOut(
@@ -1245,6 +1657,7 @@ def admin_patch_notice(
 
     add_audit(db, admin, 'NOTICE', str(notice_id), 'NOTICE_UPDATED')
     db.commit()
+    catalog_cache.bump_version()
     db.refresh(notice)
 
     return NoticeOut(
@@ -1355,6 +1768,40 @@ def admin_get_delivery_zones(
     return [delivery_zone_to_schema(row) for row in rows]
 
 
+def prepare_delivery_zone_coverage(
+    db: Session,
+    body: bytes,
+    content_type: str,
+) -> tuple[CoverageMatcher, list[CoverageAddress]]:
+    try:
+        text = body.decode('utf-8-sig')
+        addresses = parse_json(text) if 'application/json' in content_type else list(parse_csv(text))
+    except (CoverageInputError, UnicodeDecodeError) as exc:
+        raise HTTPException(status_code=400, detail={'code': 'INVALID_COVERAGE_INPUT', 'message': str(exc)}) from exc
+    return CoverageMatcher.load(db), addresses
+
+
+@router.post('/delivery-zones/coverage')
+async def admin_check_delivery_zone_coverage(
+    request: Request,
+    output_format: str = Query(default='ndjson', alias='format', pattern='^(ndjson|csv)$'),
+    x_admin_token: str | None = Header(default=None),
+    db: Session = Depends(get_db),
+) -> StreamingResponse:
+    # The handler is async only to read the raw body; session work and parsing
+    # stay off the event loop.
+    await run_in_threadpool(require_admin_token, db, x_admin_token)
+    body = await request.body()
+    matcher, addresses = await run_in_threadpool(
+        prepare_delivery_zone_coverage, db, body, request.headers.get('content-type', '')
+    )
+
+    results = matcher.iter_matches(addresses)
+    if output_format == 'csv':
+        return StreamingResponse(iter_csv(results), media_type='text/csv')
+    return StreamingResponse(iter_ndjson(results), media_type='application/x-ndjson')
+
+
 @router.post('/delivery-zones', response_model=DeliveryZoneOut)
 def admin_create_delivery_zone(
     payload: DeliveryZoneUpsertInput,
@@ -1389,6 +1836,7 @@ def admin_create_delivery_zone(
     db.flush()
     add_audit(db, admin, 'DELIVERY_ZONE', str(zone.id), 'ZONE_CREATED', {'zone_type': zone.zone_type.value})
     db.commit()
+    radius_zone_index.invalidate()
     db.refresh(zone)
     return delivery_zone_to_schema(zone)
 
@@ -1447,6 +1895,7 @@ def admin_patch_delivery_zone(
         {'zone_type': zone.zone_type.value, 'is_active': zone.is_active},
     )
     db.commit()
+    radius_zone_index.invalidate()
     db.refresh(zone)
     return delivery_zone_to_schema(zone)
 
@@ -1465,6 +1914,7 @@ def admin_delete_delivery_zone(
     zone.is_active = False
     add_audit(db, admin, 'DELIVERY_ZONE', str(zone.id), 'ZONE_DEACTIVATED', {'is_active': False})
     db.commit()
+    radius_zone_index.invalidate()
     return {'ok': True, 'zone_id': zone.id, 'is_active': zone.is_active}
 
 
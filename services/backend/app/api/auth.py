@@ -7,13 +7,13 @@ from sqlalchemy.orm import Session
 from app.api.utils import order_to_schema
 from app.auth import (
     decode_token,
-    hash_password,
     hash_token,
     issue_access_token,
     issue_refresh_token,
-    verify_password,
+    password_needs_rehash,
 )
-from app.db import get_db
+from app.cache import attach_cached_row, snapshot_row, user_auth_cache
+from app.db import AsyncDb, get_async_db, get_db
 from app.models import CancellationRequest, Order, OrderStatus, User, UserAddress, UserRefreshToken
 from app.schemas import (
     CancelRequestInput,
@@ -28,7 +28,8 @@ from app.schemas import (
     UserRefreshInput,
     UserSignupInput,
 )
-from app.services import get_or_create_cart, to_decimal, update_order_status
+from app.passwords import PasswordHasherBusy, password_hasher
+from app.services import get_or_create_cart, select_orders_with_items, to_decimal, update_order_status
 
 router = APIRouter(tags=['auth'])
 
@@ -62,6 +63,10 @@ def parse_bearer_token(authorization: str | None) -> str:
 
 
 def resolve_user_from_access_token(db: Session, token: str) -> User:
+    cached = user_auth_cache.get(token)
+    if cached is not None:
+        return attach_cached_row(db, User, cached)
+
     try:
         payload = decode_token(token, expected_type='access')
         user_id = int(payload.get('sub'))
@@ -71,6 +76,7 @@ def resolve_user_from_access_token(db: Session, token: str) -> User:
     user = db.get(User, user_id)
     if not user or not user.is_active:
         raise HTTPException(status_code=401, detail={'code': 'UNAUTHORIZED', 'message': '유효하지 않은 사용자입니다.'})
+    user_auth_cache.set(token, user.id, snapshot_row(user), token_expires_at=payload['exp'])
     return user
 
 
@@ -92,6 +98,16 @@ def get_current_user_optional(
     return resolve_user_from_access_token(db, token)
 
 
+async def get_current_user_optional_async(
+    db: AsyncDb = Depends(get_async_db),
+    authorization: str | None = Header(default=None),
+) -> User | None:
+    if not authorization:
+        return None
+    token = parse_bearer_token(authorization)
+    return await db.run_sync(resolve_user_from_access_token, token)
+
+
 def issue_user_tokens(db: Session, user: User) -> tuple[str, str, int]:
     access_token, expires_in = issue_access_token(user.id)
     refresh_token, refresh_expires_at = issue_refresh_token(user.id)
@@ -126,6 +142,14 @@ def user_address_to_schema(address: UserAddress) -> UserAddressOut:
     )
 
 
+def raise_auth_busy() -> None:
+    raise HTTPException(
+        status_code=503,
+        detail={'code': 'AUTH_BUSY', 'message': '요청이 많아 잠시 후 다시 시도해주세요.'},
+        headers={'Retry-After': '1'},
+    )
+
+
 def clear_default_user_address(db: Session, user_id: int) -> None:
     rows = list(db.scalars(select(UserAddress).where(UserAddress.user_id == user_id)))
     for row in rows:
@@ -139,10 +163,15 @@ def signup(payload: UserSignupInput, db: Session = Depends(get_db)) -> UserAuthR
     if duplicate:
         raise HTTPException(status_code=409, detail={'code': 'DUPLICATE_PHONE', 'message': '이미 가입된 전화번호입니다.'})
 
+    try:
+        password_hash = password_hasher.hash(payload.password)
+    except PasswordHasherBusy:
+        raise_auth_busy()
+
     user = User(
         phone=phone,
         name=payload.name.strip(),
-        password_hash=hash_password(payload.password),
+        password_hash=password_hash,
         is_active=True,
     )
     db.add(user)
@@ -167,9 +196,20 @@ def signup(payload: UserSignupInput, db: Session = Depends(get_db)) -> UserAuthR
 def login(payload: UserLoginInput, db: Session = Depends(get_db)) -> UserAuthResponse:
     phone = normalize_phone(payload.phone)
     user = db.scalar(select(User).where(and_(User.phone == phone, User.is_active.is_(True))))
-    if not user or not verify_password(payload.password, user.password_hash):
+    try:
+        verified = user is not None and password_hasher.verify(payload.password, user.password_hash)
+    except PasswordHasherBusy:
+        raise_auth_busy()
+    if not verified:
         raise HTTPException(status_code=401, detail={'code': 'INVALID_CREDENTIALS', 'message': '로그인에 실패했습니다.'})
 
+    if password_needs_rehash(user.password_hash):
+        try:
+            user.password_hash = password_hasher.hash(payload.password)
+        except PasswordHasherBusy:
+            # Optional: the old hash still verifies, and a later login upgrades it.
+            pass
+
     user.last_login_at = datetime.now(timezone.utc)
     if payload.session_key and payload.session_key.strip():
         get_or_create_cart(db, payload.session_key.strip(), user_id=user.id)
@@ -248,6 +288,7 @@ def logout(payload: UserLogoutInput, db: Session = Depends(get_db)) -> dict:
     if token_row:
         token_row.revoked_at = now
         db.commit()
+    user_auth_cache.invalidate_principal(user_id)
 
     return {'ok': True}
 
@@ -401,7 +442,7 @@ def get_my_orders(
 ) -> list[OrderOut]:
     rows = list(
         db.scalars(
-            select(Order)
+            select_orders_with_items()
             .where(Order.user_id == user.id)
             .order_by(Order.ordered_at.desc(), Order.id.desc())
             .limit(100)
@@ -416,7 +457,7 @@ def get_my_order(
     user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ) -> OrderOut:
-    row = db.scalar(select(Order).where(and_(Order.user_id == user.id, Order.order_no == order_no)))
+    row = db.scalar(select_orders_with_items().where(and_(Order.user_id == user.id, Order.order_no == order_no)))
     if not row:
         raise HTTPException(status_code=404, detail={'code': 'ORDER_NOT_FOUND', 'message': '주문을 찾을 수 없습니다.'})
     return order_to_schema(row)
@@ -2,9 +2,9 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy import and_, select
 from sqlalchemy.orm import Session
 
-from app.api.auth import get_current_user_optional
+from app.api.auth import get_current_user_optional_async
 from app.api.utils import cart_to_schema
-from app.db import get_db
+from app.db import AsyncDb, get_async_db
 from app.models import CartItem, Product, ProductStatus, User
 from app.schemas import CartItemInput, CartItemQtyUpdate, CartOut
 from app.services import effective_price, fetch_cart_items, generate_session_key, get_or_create_cart
@@ -19,26 +19,34 @@ def resolve_session_key(session_key: str | None) -> str:
 
 
 @router.get('', response_model=CartOut)
-def get_cart(
+async def get_cart(
     session_key: str | None = Query(default=None, description='비회원 장바구니 세션키'),
-    current_user: User | None = Depends(get_current_user_optional),
-    db: Session = Depends(get_db),
+    current_user: User | None = Depends(get_current_user_optional_async),
+    db: AsyncDb = Depends(get_async_db),
 ) -> CartOut:
     key = resolve_session_key(session_key)
-    cart = get_or_create_cart(db, key, user_id=current_user.id if current_user else None)
+    return await db.run_sync(load_cart, key, current_user.id if current_user else None)
+
+
+def load_cart(db: Session, session_key: str, user_id: int | None) -> CartOut:
+    cart = get_or_create_cart(db, session_key, user_id=user_id)
     items = fetch_cart_items(db, cart.id)
     return cart_to_schema(cart, items)
 
 
 @router.post('/items', response_model=CartOut)
-def add_cart_item(
+async def add_cart_item(
     payload: CartItemInput,
     session_key: str | None = Query(default=None),
-    current_user: User | None = Depends(get_current_user_optional),
-    db: Session = Depends(get_db),
+    current_user: User | None = Depends(get_current_user_optional_async),
+    db: AsyncDb = Depends(get_async_db),
 ) -> CartOut:
     key = resolve_session_key(session_key)
-    cart = get_or_create_cart(db, key, user_id=current_user.id if current_user else None)
+    return await db.run_sync(add_item_to_cart, key, current_user.id if current_user else None, payload)
+
+
+def add_item_to_cart(db: Session, session_key: str, user_id: int | None, payload: CartItemInput) -> CartOut:
+    cart = get_or_create_cart(db, session_key, user_id=user_id)
 
     product = db.get(Product, payload.product_id)
     if product is None or product.status != ProductStatus.ACTIVE or not product.is_visible:
@@ -60,6 +68,7 @@ def add_cart_item(
         if new_qty > product.stock_qty - product.reserved_qty:
             raise HTTPException(status_code=400, detail={'code': 'INSUFFICIENT_STOCK', 'message': '재고가 부족합니다.'})
         existing.qty = new_qty
+        existing.unit_snapshot_price = effective_price(product)
     else:
         db.add(
             CartItem(
@@ -78,14 +87,24 @@ def add_cart_item(
 
 
 @router.patch('/items/{item_id}', response_model=CartOut)
-def update_cart_item_qty(
+async def update_cart_item_qty(
     item_id: int,
     payload: CartItemQtyUpdate,
     session_key: str = Query(...),
-    current_user: User | None = Depends(get_current_user_optional),
-    db: Session = Depends(get_db),
+    current_user: User | None = Depends(get_current_user_optional_async),
+    db: AsyncDb = Depends(get_async_db),
 ) -> CartOut:
-    cart = get_or_create_cart(db, session_key, user_id=current_user.id if current_user else None)
+    return await db.run_sync(set_cart_item_qty, session_key, current_user.id if current_user else None, item_id, payload)
+
+
+def set_cart_item_qty(
+    db: Session,
+    session_key: str,
+    user_id: int | None,
+    item_id: int,
+    payload: CartItemQtyUpdate,
+) -> CartOut:
+    cart = get_or_create_cart(db, session_key, user_id=user_id)
     item = db.scalar(select(CartItem).where(and_(CartItem.id == item_id, CartItem.cart_id == cart.id)))
     if not item:
         raise HTTPException(status_code=404, detail={'code': 'CART_ITEM_NOT_FOUND', 'message': '장바구니 항목을 찾을 수 없습니다.'})
@@ -111,13 +130,17 @@ def update_cart_item_qty(
 
 
 @router.delete('/items/{item_id}', response_model=CartOut)
-def delete_cart_item(
+async def delete_cart_item(
     item_id: int,
     session_key: str = Query(...),
-    current_user: User | None = Depends(get_current_user_optional),
-    db: Session = Depends(get_db),
+    current_user: User | None = Depends(get_current_user_optional_async),
+    db: AsyncDb = Depends(get_async_db),
 ) -> CartOut:
-    cart = get_or_create_cart(db, session_key, user_id=current_user.id if current_user else None)
+    return await db.run_sync(remove_cart_item, session_key, current_user.id if current_user else None, item_id)
+
+
+def remove_cart_item(db: Session, session_key: str, user_id: int | None, item_id: int) -> CartOut:
+    cart = get_or_create_cart(db, session_key, user_id=user_id)
     item = db.scalar(select(CartItem).where(and_(CartItem.id == item_id, CartItem.cart_id == cart.id)))
     if not item:
         raise HTTPException(status_code=404, detail={'code': 'CART_ITEM_NOT_FOUND', 'message': '장바구니 항목을 찾을 수 없습니다.'})
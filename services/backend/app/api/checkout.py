@@ -1,23 +1,18 @@
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
 
-from app.api.auth import get_current_user_optional
-from app.db import get_db
+from app.api.auth import get_current_user_optional_async
+from app.db import AsyncDb, get_async_db
 from app.models import User
 from app.schemas import CheckoutQuoteResponse, CheckoutRequest, CheckoutValidateResponse
-from app.services import get_or_create_cart, validate_checkout
+from app.services import ValidationResult, get_or_create_cart, validate_checkout
 
 router = APIRouter(prefix='/checkout', tags=['checkout'])
 
 
-@router.post('/validate', response_model=CheckoutValidateResponse)
-def validate(
-    payload: CheckoutRequest,
-    current_user: User | None = Depends(get_current_user_optional),
-    db: Session = Depends(get_db),
-) -> CheckoutValidateResponse:
-    cart = get_or_create_cart(db, payload.session_key, user_id=current_user.id if current_user else None)
-    result = validate_checkout(
+def validate_cart_checkout(db: Session, payload: CheckoutRequest, user_id: int | None) -> ValidationResult:
+    cart = get_or_create_cart(db, payload.session_key, user_id=user_id)
+    return validate_checkout(
         db,
         cart,
         payload.dong_code,
@@ -26,25 +21,25 @@ def validate(
         payload.longitude,
         payload.requested_slot_start,
     )
+
+
+@router.post('/validate', response_model=CheckoutValidateResponse)
+async def validate(
+    payload: CheckoutRequest,
+    current_user: User | None = Depends(get_current_user_optional_async),
+    db: AsyncDb = Depends(get_async_db),
+) -> CheckoutValidateResponse:
+    result = await db.run_sync(validate_cart_checkout, payload, current_user.id if current_user else None)
     return CheckoutValidateResponse(valid=result.valid, errors=result.errors)
 
 
 @router.post('/quote', response_model=CheckoutQuoteResponse)
-def quote(
+async def quote(
     payload: CheckoutRequest,
-    current_user: User | None = Depends(get_current_user_optional),
-    db: Session = Depends(get_db),
+    current_user: User | None = Depends(get_current_user_optional_async),
+    db: AsyncDb = Depends(get_async_db),
 ) -> CheckoutQuoteResponse:
-    cart = get_or_create_cart(db, payload.session_key, user_id=current_user.id if current_user else None)
-    result = validate_checkout(
-        db,
-        cart,
-        payload.dong_code,
-        payload.apartment_name,
-        payload.latitude,
-        payload.longitude,
-        payload.requested_slot_start,
-    )
+    result = await db.run_sync(validate_cart_checkout, payload, current_user.id if current_user else None)
     return CheckoutQuoteResponse(
         valid=result.valid,
         errors=result.errors,
@@ -9,7 +9,13 @@ from app.api.utils import order_to_schema
 from app.db import get_db
 from app.models import CancellationRequest, Order, OrderStatus, User
 from app.schemas import CancelRequestInput, OrderCreateRequest, OrderOut
-from app.services import create_order, get_or_create_cart, update_order_status, validate_checkout
+from app.services import (
+    create_order,
+    get_or_create_cart,
+    select_orders_with_items,
+    update_order_status,
+    validate_checkout,
+)
 
 router = APIRouter(prefix='/orders', tags=['orders'])
 
@@ -68,9 +74,9 @@ def lookup_order(
     db: Session = Depends(get_db),
 ) -> OrderOut:
     if current_user:
-        order = db.scalar(select(Order).where(and_(Order.order_no == order_no, Order.user_id == current_user.id)))
+        order = db.scalar(select_orders_with_items().where(and_(Order.order_no == order_no, Order.user_id == current_user.id)))
     elif phone:
-        order = db.scalar(select(Order).where(and_(Order.order_no == order_no, Order.customer_phone == phone)))
+        order = db.scalar(select_orders_with_items().where(and_(Order.order_no == order_no, Order.customer_phone == phone)))
     else:
         raise HTTPException(status_code=400, detail={'code': 'INVALID_REQUEST', 'message': 'phone 또는 로그인 인증이 필요합니다.'})
 
@@ -87,9 +93,9 @@ def get_order(
     db: Session = Depends(get_db),
 ) -> OrderOut:
     if current_user:
-        order = db.scalar(select(Order).where(and_(Order.order_no == order_no, Order.user_id == current_user.id)))
+        order = db.scalar(select_orders_with_items().where(and_(Order.order_no == order_no, Order.user_id == current_user.id)))
     elif phone:
-        order = db.scalar(select(Order).where(and_(Order.order_no == order_no, Order.customer_phone == phone)))
+        order = db.scalar(select_orders_with_items().where(and_(Order.order_no == order_no, Order.customer_phone == phone)))
     else:
         raise HTTPException(status_code=400, detail={'code': 'INVALID_REQUEST', 'message': 'phone 또는 로그인 인증이 필요합니다.'})
 
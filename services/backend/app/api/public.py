@@ -1,19 +1,106 @@
 from datetime import datetime, timezone
+from decimal import Decimal
 
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy import and_, desc, func, or_, select
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import and_, case, func, literal, select, true
 from sqlalchemy.orm import Session
 
 from app.api.utils import product_to_schema
-from app.db import get_db
-from app.models import Category, Notice, Product, ProductStatus, Promotion, PromotionProduct
-from app.schemas import CategoryOut, HomeResponse, ProductOut, PromotionOut
+from app.cache import catalog_cache
+from app.conditional import Validator, fingerprint, is_not_modified, not_modified
+from app.db import AsyncDb, get_async_db
+from app.models import Category, Notice, Product, ProductStatus, Promotion
+from app.pagination import NEXT_CURSOR_HEADER, KeysetColumn, KeysetSort, paginate, split_page
+from app.responses import trusted_json
+from app.schemas import (
+    CategoryFacet,
+    CategoryOut,
+    HomeResponse,
+    PriceRangeFacet,
+    ProductFacets,
+    ProductListResponse,
+    ProductOut,
+    ProductSuggestionOut,
+    PromotionOut,
+)
+from app.search import search_products, suggest_products
 
 router = APIRouter(prefix='/public', tags=['public'])
 
+PRODUCT_PAGE_LIMIT = 100
+SUGGEST_LIMIT = 10
+# Lower bounds of the price facet buckets, in won.
+PRICE_BUCKETS = (0, 5000, 10000, 20000, 50000)
+
+# Persisted column covered by ix_products_listing_price, so price filters and
+# price sorts are index range scans.
+effective_price_expr = Product.effective_price
+product_id_column = KeysetColumn(Product.id, False, lambda product: product.id)
+product_price_column = KeysetColumn(effective_price_expr, False, lambda product: product.effective_price, Decimal)
+PRODUCT_SORTS = {
+    'popular': KeysetSort(
+        'popular',
+        [KeysetColumn(Product.popularity, True, lambda product: product.popularity), product_id_column],
+    ),
+    'new': KeysetSort(
+        'new',
+        [KeysetColumn(Product.created_at, True, lambda product: product.created_at, datetime), product_id_column],
+    ),
+    'priceAsc': KeysetSort('priceAsc', [product_price_column, product_id_column]),
+    'priceDesc': KeysetSort(
+        'priceDesc',
+        [KeysetColumn(effective_price_expr, True, product_price_column.value, Decimal), product_id_column],
+    ),
+}
+
+
+def relevance_sort(scores: dict[int, float]) -> KeysetSort:
+    # Scores come from the search backend, so they are bound into the query as
+    # a CASE over the (capped) candidate ids and keyset-paginated like a column.
+    score_expr = case(scores, value=Product.id, else_=0.0) if scores else literal(0.0)
+    return KeysetSort(
+        'relevance',
+        [KeysetColumn(score_expr, True, lambda product: scores.get(product.id, 0.0), float), product_id_column],
+    )
+
+
+def live_promotion_conditions(now: datetime) -> list:
+    return [Promotion.is_active.is_(True), Promotion.start_at <= now, Promotion.end_at >= now]
+
+
+def sellable_stock_total(*conditions):
+    # Stock moves through set-based UPDATEs that can share one updated_at value.
+    return select(func.coalesce(func.sum(Product.stock_qty - Product.reserved_qty), 0)).where(*conditions).scalar_subquery()
+
 
 @router.get('/home', response_model=HomeResponse)
-def get_home(db: Session = Depends(get_db)) -> HomeResponse:
+async def get_home(request: Request, response: Response, db: AsyncDb = Depends(get_async_db)) -> HomeResponse:
+    # The validator is cached with the body it describes, so a 304 never
+    # vouches for a body other than the one this worker would send.
+    validator, home = await catalog_cache.aget_or_set(('home',), lambda: db.run_sync(load_home_with_validator))
+    if is_not_modified(request, validator):
+        return not_modified(validator)
+    response.headers.update(validator.headers())
+    return home
+
+
+def load_home_with_validator(db: Session) -> tuple[Validator, HomeResponse]:
+    now = datetime.now(timezone.utc)
+    visible_products = [Product.is_visible.is_(True), Product.status == ProductStatus.ACTIVE]
+    validator = fingerprint(
+        db,
+        [
+            (Category, [Category.is_active.is_(True)]),
+            (Product, visible_products),
+            (Promotion, live_promotion_conditions(now)),
+            (Notice, [Notice.is_active.is_(True), Notice.start_at <= now, Notice.end_at >= now]),
+        ],
+        extra=[sellable_stock_total(*visible_products)],
+    )
+    return validator, load_home(db)
+
+
+def load_home(db: Session) -> HomeResponse:
     now = datetime.now(timezone.utc)
 
     categories = list(
@@ -86,7 +173,19 @@ def get_home(db: Session = Depends(get_db)) -> HomeResponse:
 
 
 @router.get('/categories', response_model=list[CategoryOut])
-def get_categories(db: Session = Depends(get_db)) -> list[CategoryOut]:
+async def get_categories(
+    request: Request,
+    response: Response,
+    db: AsyncDb = Depends(get_async_db),
+) -> list[CategoryOut]:
+    validator = await db.run_sync(fingerprint, [(Category, [Category.is_active.is_(True)])])
+    if is_not_modified(request, validator):
+        return not_modified(validator)
+    response.headers.update(validator.headers())
+    return await db.run_sync(load_categories)
+
+
+def load_categories(db: Session) -> list[CategoryOut]:
     categories = list(
         db.scalars(
             select(Category)
@@ -97,68 +196,230 @@ def get_categories(db: Session = Depends(get_db)) -> list[CategoryOut]:
     return [CategoryOut(id=c.id, name=c.name, display_order=c.display_order) for c in categories]
 
 
-@router.get('/products', response_model=list[ProductOut])
-def get_products(
+@router.get('/products', response_model=list[ProductOut] | ProductListResponse)
+async def get_products(
     category_id: int | None = None,
     q: str | None = None,
     min_price: int | None = Query(default=None, ge=0),
     max_price: int | None = Query(default=None, ge=0),
     promo: bool | None = None,
-    sort: str = Query(default='popular', pattern='^(popular|new|priceAsc|priceDesc)$'),
-    db: Session = Depends(get_db),
-) -> list[ProductOut]:
-    stmt = select(Product).where(and_(Product.is_visible.is_(True), Product.status == ProductStatus.ACTIVE))
+    sort: str | None = Query(
+        default=None,
+        pattern='^(relevance|popular|new|priceAsc|priceDesc)$',
+        description='기본값: 검색어가 있으면 relevance, 없으면 popular',
+    ),
+    cursor: str | None = Query(default=None, description='이전 페이지 응답의 X-Next-Cursor 값'),
+    limit: int = Query(default=PRODUCT_PAGE_LIMIT, ge=1, le=PRODUCT_PAGE_LIMIT),
+    facets: bool = Query(default=False, description='true면 {products, facets} 형태로 필터 집계를 함께 반환'),
+    db: AsyncDb = Depends(get_async_db),
+):
+    keyword = q.strip() if q else None
+    sort = sort or ('relevance' if keyword else 'popular')
+    cache_key = ('products', category_id, keyword, min_price, max_price, promo, sort, cursor, limit)
+    products, next_cursor = await catalog_cache.aget_or_set(
+        cache_key,
+        lambda: db.run_sync(load_products, category_id, keyword, min_price, max_price, promo, sort, cursor, limit),
+    )
+    headers = {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None
+    if not facets:
+        return trusted_json(list[ProductOut], products, headers)
+
+    # Facets do not depend on sort or page, so every page shares one entry.
+    product_facets = await catalog_cache.aget_or_set(
+        ('product_facets', category_id, keyword, min_price, max_price, promo),
+        lambda: db.run_sync(load_product_facets, category_id, keyword, min_price, max_price, promo),
+    )
+    return trusted_json(ProductListResponse, ProductListResponse(products=products, facets=product_facets), headers)
 
-    if category_id:
-        stmt = stmt.where(Product.category_id == category_id)
 
+def catalog_conditions(db: Session, q: str | None) -> tuple[list, dict[int, float]]:
+    conditions = [Product.is_visible.is_(True), Product.status == ProductStatus.ACTIVE]
+    scores: dict[int, float] = {}
     if q:
-        pattern = f'%{q.strip()}%'
-        stmt = stmt.where(or_(Product.name.ilike(pattern), Product.description.ilike(pattern)))
+        scores = search_products(db, q)
+        conditions.append(Product.id.in_(list(scores)))
+    return conditions, scores
 
-    effective_price_expr = func.coalesce(Product.sale_price, Product.base_price)
+
+def price_range_condition(min_price: int | None, max_price: int | None):
+    conditions = []
     if min_price is not None:
-        stmt = stmt.where(effective_price_expr >= min_price)
+        conditions.append(effective_price_expr >= min_price)
     if max_price is not None:
-        stmt = stmt.where(effective_price_expr <= max_price)
+        conditions.append(effective_price_expr <= max_price)
+    return and_(true(), *conditions)
+
+
+def load_products(
+    db: Session,
+    category_id: int | None,
+    q: str | None,
+    min_price: int | None,
+    max_price: int | None,
+    promo: bool | None,
+    sort: str,
+    cursor: str | None = None,
+    limit: int = PRODUCT_PAGE_LIMIT,
+) -> tuple[list[ProductOut], str | None]:
+    conditions, scores = catalog_conditions(db, q)
+    stmt = select(Product).where(*conditions, price_range_condition(min_price, max_price))
+
+    if category_id:
+        stmt = stmt.where(Product.category_id == category_id)
 
     if promo is True:
-        now = datetime.now(timezone.utc)
-        stmt = stmt.join(PromotionProduct, PromotionProduct.product_id == Product.id).join(
-            Promotion,
-            and_(Promotion.id == PromotionProduct.promotion_id, Promotion.start_at <= now, Promotion.end_at >= now),
+        stmt = stmt.where(Product.on_promotion.is_(True))
+
+    keyset = relevance_sort(scores) if sort == 'relevance' else PRODUCT_SORTS[sort]
+    products, next_cursor = split_page(list(db.scalars(paginate(stmt, keyset, cursor, limit))), keyset, limit)
+    return [product_to_schema(product) for product in products], next_cursor
+
+
+def load_product_facets(
+    db: Session,
+    category_id: int | None,
+    q: str | None,
+    min_price: int | None,
+    max_price: int | None,
+    promo: bool | None,
+) -> ProductFacets:
+    # One GROUP BY over (category, price bucket, on promotion, inside the
+    # requested price range). Each facet is then rolled up from those groups
+    # with every filter applied except its own, so a sidebar option's count is
+    # what the listing would return if the shopper picked it.
+    conditions, _ = catalog_conditions(db, q)
+    price_bucket = case(
+        *((effective_price_expr >= lower, lower) for lower in reversed(PRICE_BUCKETS[1:])),
+        else_=PRICE_BUCKETS[0],
+    )
+    rows = (
+        select(
+            Product.category_id.label('category_id'),
+            price_bucket.label('price_bucket'),
+            Product.on_promotion.label('on_promo'),
+            price_range_condition(min_price, max_price).label('in_price_range'),
         )
+        .where(*conditions)
+        .subquery()
+    )
+    groups = db.execute(
+        select(
+            rows.c.category_id,
+            Category.name,
+            Category.display_order,
+            rows.c.price_bucket,
+            rows.c.on_promo,
+            rows.c.in_price_range,
+            func.count().label('count'),
+        )
+        .outerjoin(Category, Category.id == rows.c.category_id)
+        .group_by(
+            rows.c.category_id,
+            Category.name,
+            Category.display_order,
+            rows.c.price_bucket,
+            rows.c.on_promo,
+            rows.c.in_price_range,
+        )
+    ).all()
 
-    if sort == 'popular':
-        stmt = stmt.order_by(desc(Product.popularity), Product.id.asc())
-    elif sort == 'new':
-        stmt = stmt.order_by(desc(Product.created_at), Product.id.asc())
-    elif sort == 'priceAsc':
-        stmt = stmt.order_by(effective_price_expr.asc(), Product.id.asc())
-    else:
-        stmt = stmt.order_by(effective_price_expr.desc(), Product.id.asc())
+    categories: dict[int | None, CategoryFacet] = {}
+    category_order: dict[int | None, tuple] = {}
+    buckets = {lower: 0 for lower in PRICE_BUCKETS}
+    promo_count = 0
+    total = 0
+    for group in groups:
+        category_ok = not category_id or group.category_id == category_id
+        promo_ok = promo is not True or bool(group.on_promo)
+        price_ok = bool(group.in_price_range)
+        if price_ok and promo_ok:
+            facet = categories.setdefault(
+                group.category_id,
+                CategoryFacet(category_id=group.category_id, category_name=group.name, count=0),
+            )
+            facet.count += group.count
+            category_order[group.category_id] = (group.display_order is None, group.display_order, group.category_id or 0)
+        if category_ok and promo_ok:
+            buckets[group.price_bucket] += group.count
+        if category_ok and price_ok:
+            promo_count += group.count if group.on_promo else 0
+            total += group.count if promo_ok else 0
 
-    products = list(db.scalars(stmt.limit(100)))
-    return [product_to_schema(product) for product in products]
+    return ProductFacets(
+        total=total,
+        categories=sorted(categories.values(), key=lambda facet: category_order[facet.category_id]),
+        price_ranges=[
+            PriceRangeFacet(min_price=lower, max_price=upper, count=buckets[lower])
+            for lower, upper in zip(PRICE_BUCKETS, [*PRICE_BUCKETS[1:], None])
+        ],
+        promo_count=promo_count,
+    )
+
+
+@router.get('/search/suggest', response_model=list[ProductSuggestionOut])
+async def get_search_suggestions(
+    q: str = Query(min_length=1, max_length=50),
+    limit: int = Query(default=SUGGEST_LIMIT, ge=1, le=SUGGEST_LIMIT),
+    db: AsyncDb = Depends(get_async_db),
+) -> list[ProductSuggestionOut]:
+    return await db.run_sync(load_search_suggestions, q, limit)
+
+
+def load_search_suggestions(db: Session, q: str, limit: int) -> list[ProductSuggestionOut]:
+    return [ProductSuggestionOut(id=doc.product_id, name=doc.name) for doc in suggest_products(db, q, limit)]
 
 
 @router.get('/products/{product_id}', response_model=ProductOut)
-def get_product_detail(product_id: int, db: Session = Depends(get_db)) -> ProductOut:
+async def get_product_detail(
+    product_id: int,
+    request: Request,
+    response: Response,
+    db: AsyncDb = Depends(get_async_db),
+) -> ProductOut:
+    validator = await db.run_sync(product_detail_validator, product_id)
+    if is_not_modified(request, validator):
+        return not_modified(validator)
+    product = await db.run_sync(load_product_detail, product_id)
+    response.headers.update(validator.headers())
+    return product
+
+
+def product_detail_validator(db: Session, product_id: int) -> Validator:
+    category_id = select(Product.category_id).where(Product.id == product_id).scalar_subquery()
+    return fingerprint(
+        db,
+        [(Product, [Product.id == product_id, Product.is_visible.is_(True)]), (Category, [Category.id == category_id])],
+        extra=[sellable_stock_total(Product.id == product_id)],
+    )
+
+
+def load_product_detail(db: Session, product_id: int) -> ProductOut:
     product = db.get(Product, product_id)
     if product is None or not product.is_visible:
-        from fastapi import HTTPException
-
         raise HTTPException(status_code=404, detail={'code': 'PRODUCT_NOT_FOUND', 'message': '상품을 찾을 수 없습니다.'})
     return product_to_schema(product)
 
 
 @router.get('/promotions/current', response_model=list[PromotionOut])
-def get_current_promotions(db: Session = Depends(get_db)) -> list[PromotionOut]:
+async def get_current_promotions(
+    request: Request,
+    response: Response,
+    db: AsyncDb = Depends(get_async_db),
+) -> list[PromotionOut]:
     now = datetime.now(timezone.utc)
+    validator = await db.run_sync(fingerprint, [(Promotion, live_promotion_conditions(now))])
+    if is_not_modified(request, validator):
+        return not_modified(validator)
+    response.headers.update(validator.headers())
+    return await db.run_sync(load_current_promotions, now)
+
+
+def load_current_promotions(db: Session, now: datetime | None = None) -> list[PromotionOut]:
+    now = now or datetime.now(timezone.utc)
     promotions = list(
         db.scalars(
             select(Promotion)
-            .where(and_(Promotion.is_active.is_(True), Promotion.start_at <= now, Promotion.end_at >= now))
+            .where(and_(*live_promotion_conditions(now)))
             .order_by(Promotion.start_at.desc())
         )
     )
@@ -2,7 +2,7 @@ from decimal import Decimal
 
 from app.models import Cart, CartItem, Order, Product
 from app.schemas import CartItemOut, CartOut, OrderItemOut, OrderOut, ProductOut
-from app.services import effective_price, to_decimal
+from app.services import available_stock, effective_price, to_decimal
 
 
 def product_to_schema(product: Product) -> ProductOut:
@@ -19,9 +19,11 @@ def product_to_schema(product: Product) -> ProductOut:
         is_weight_item=product.is_weight_item,
         base_price=to_decimal(product.base_price),
         sale_price=to_decimal(product.sale_price) if product.sale_price is not None else None,
+        promo_price=to_decimal(product.promo_price) if product.promo_price is not None else None,
         effective_price=effective_price(product),
         status=product.status,
-        stock_qty=product.stock_qty,
+        stock_qty=available_stock(product),
+        reserved_qty=product.reserved_qty,
         max_per_order=product.max_per_order,
         pick_location=product.pick_location,
     )
@@ -42,7 +44,7 @@ def cart_to_schema(cart: Cart, items: list[CartItem]) -> CartOut:
                 qty=item.qty,
                 unit_price=to_decimal(item.unit_snapshot_price),
                 line_total=line_total,
-                stock_qty=item.product.stock_qty if item.product else 0,
+                stock_qty=available_stock(item.product) if item.product else 0,
                 is_weight_item=item.product.is_weight_item if item.product else False,
             )
         )
@@ -9,7 +9,7 @@ from app.core import get_settings
 
 settings = get_settings()
 
-PBKDF2_ITERATIONS = 390000
+PBKDF2_ITERATIONS = settings.pbkdf2_iterations
 
 
 def _b64url_encode(raw: bytes) -> str:
@@ -21,15 +21,23 @@ def _b64url_decode(encoded: str) -> bytes:
     return base64.urlsafe_b64decode(encoded + ('=' * padding_len))
 
 
-def hash_password(password: str) -> str:
+def hash_password(password: str, iterations: int = PBKDF2_ITERATIONS) -> str:
     salt = secrets.token_bytes(16)
     digest = hashlib.pbkdf2_hmac(
         'sha256',
         password.encode('utf-8'),
         salt,
-        PBKDF2_ITERATIONS,
+        iterations,
     )
-    return f'pbkdf2_sha256${PBKDF2_ITERATIONS}${_b64url_encode(salt)}${_b64url_encode(digest)}'
+    return f'pbkdf2_sha256${iterations}${_b64url_encode(salt)}${_b64url_encode(digest)}'
+
+
+def password_needs_rehash(encoded_hash: str) -> bool:
+    try:
+        algorithm, iterations_raw, _ = encoded_hash.split('$', maxsplit=2)
+        return algorithm != 'pbkdf2_sha256' or int(iterations_raw) != PBKDF2_ITERATIONS
+    except Exception:
+        return True
 
 
 def verify_password(password: str, encoded_hash: str) -> bool:
@@ -1,3 +1,4 @@
+import argparse
 from pathlib import Path
 
 from alembic import command
@@ -5,6 +6,8 @@ from alembic.config import Config
 from sqlalchemy.orm import Session
 
 from app.db import SessionLocal
+from app.query_plans import explain_hot_queries
+from app.refunds import reconcile_refunded_totals
 from app.seed import seed_if_empty
 
 
@@ -27,5 +30,55 @@ def bootstrap() -> None:
     run_seed()
 
 
+def run_explain(verbose: bool = False) -> int:
+    with SessionLocal() as db:  # type: Session
+        reports = explain_hot_queries(db)
+    for report in reports:
+        status = 'SEQ SCAN ' + ', '.join(report.seq_scans) if report.seq_scans else 'ok'
+        print(f'{report.name}: {status}')
+        if verbose or report.seq_scans:
+            for line in report.plan:
+                print(f'    {line}')
+    return 1 if any(report.seq_scans for report in reports) else 0
+
+
+def run_reconcile_refunds(repair: bool = False) -> int:
+    with SessionLocal() as db:  # type: Session
+        drift = reconcile_refunded_totals(db, repair=repair)
+        db.commit()
+    for row in drift:
+        print(f'order {row.order_id}: refunded_total={row.recorded} refunds={row.actual}')
+    print(f"{len(drift)} order(s) {'repaired' if repair else 'drifted'}")
+    return 1 if drift and not repair else 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        description='Migrate and seed the database, check hot query plans or reconcile refund totals.'
+    )
+    commands = parser.add_subparsers(dest='command')
+    commands.add_parser('migrate', help='apply migrations only')
+    commands.add_parser('seed', help='seed an empty database only')
+    explain = commands.add_parser('explain', help='EXPLAIN the hot queries; exit 1 if any uses a sequential scan')
+    explain.add_argument('--verbose', action='store_true', help='print every plan, not only failing ones')
+    reconcile = commands.add_parser(
+        'reconcile-refunds', help='compare orders.refunded_total with the refunds table; exit 1 on drift'
+    )
+    reconcile.add_argument('--repair', action='store_true', help='reset drifted totals from the refunds table')
+    args = parser.parse_args(argv)
+
+    if args.command == 'explain':
+        return run_explain(args.verbose)
+    if args.command == 'reconcile-refunds':
+        return run_reconcile_refunds(args.repair)
+    if args.command == 'migrate':
+        run_migrations()
+    elif args.command == 'seed':
+        run_seed()
+    else:
+        bootstrap()
+    return 0
+
+
 if __name__ == '__main__':
-    bootstrap()
+    raise SystemExit(main())
@@ -0,0 +1,225 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any, TypeVar
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from app.core import get_settings
+from app.models import AdminUser, User
+
+settings = get_settings()
+
+T = TypeVar('T')
+
+
+class CatalogCache:
+    # TTL + LRU cache for public catalog responses. Admin writes bump the version,
+    # which drops every entry at once; the TTL bounds staleness for changes this
+    # process does not see (other workers, stock moved by orders, promotion windows).
+    def __init__(self, max_entries: int, ttl_seconds: float, enabled: bool = True):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.enabled = enabled
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._version = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def _lookup(self, key: Hashable) -> tuple[bool, Any, int]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return True, value, self._version
+                del self._entries[key]
+                self.expirations += 1
+            self.misses += 1
+            return False, None, self._version
+
+    def _store(self, key: Hashable, value: Any, version: int) -> None:
+        with self._lock:
+            # A bump while the loader ran means the value may predate the write.
+            if version == self._version:
+                self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+
+    def get_or_set(self, key: Hashable, loader: Callable[[], T]) -> T:
+        if not self.enabled:
+            return loader()
+        found, value, version = self._lookup(key)
+        if found:
+            return value
+        value = loader()
+        self._store(key, value, version)
+        return value
+
+    async def aget_or_set(self, key: Hashable, loader: Callable[[], Awaitable[T]]) -> T:
+        if not self.enabled:
+            return await loader()
+        found, value, version = self._lookup(key)
+        if found:
+            return value
+        value = await loader()
+        self._store(key, value, version)
+        return value
+
+    def bump_version(self) -> int:
+        with self._lock:
+            self._version += 1
+            self._entries.clear()
+            self.invalidations += 1
+            return self._version
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'enabled': self.enabled,
+                'version': self._version,
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl_seconds,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations,
+            }
+
+
+class AuthCache:
+    # Verified token -> principal row snapshot. The key is the whole token, which
+    # embeds the jti and signature, so a hit needs neither HMAC nor a SELECT.
+    # Entries never outlive the token, and any UPDATE of the principal row
+    # (deactivation included) or a logout drops every token of that principal.
+    def __init__(self, max_entries: int, ttl_seconds: float, enabled: bool = True):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.enabled = enabled
+        self._entries: OrderedDict[str, tuple[float, int, dict[str, Any]]] = OrderedDict()
+        self._tokens_by_principal: dict[int, set[str]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, token: str) -> dict[str, Any] | None:
+        if not self.enabled:
+            return None
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is not None:
+                expires_at, principal_id, values = entry
+                if expires_at > now:
+                    self._entries.move_to_end(token)
+                    self.hits += 1
+                    return values
+                self._discard(token, principal_id)
+            self.misses += 1
+            return None
+
+    def set(self, token: str, principal_id: int, values: dict[str, Any], token_expires_at: float | None = None) -> None:
+        if not self.enabled:
+            return
+        expires_at = time.time() + self.ttl_seconds
+        if token_expires_at is not None:
+            expires_at = min(expires_at, token_expires_at)
+        with self._lock:
+            self._entries[token] = (expires_at, principal_id, values)
+            self._entries.move_to_end(token)
+            self._tokens_by_principal.setdefault(principal_id, set()).add(token)
+            while len(self._entries) > self.max_entries:
+                evicted, (_, evicted_principal_id, _) = self._entries.popitem(last=False)
+                self._forget(evicted, evicted_principal_id)
+
+    def _forget(self, token: str, principal_id: int) -> None:
+        tokens = self._tokens_by_principal.get(principal_id)
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._tokens_by_principal[principal_id]
+
+    def _discard(self, token: str, principal_id: int) -> None:
+        self._entries.pop(token, None)
+        self._forget(token, principal_id)
+
+    def invalidate_principal(self, principal_id: int) -> None:
+        with self._lock:
+            for token in self._tokens_by_principal.pop(principal_id, set()):
+                self._entries.pop(token, None)
+            self.invalidations += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'enabled': self.enabled,
+                'entries': len(self._entries),
+                'ttl_seconds': self.ttl_seconds,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0,
+                'invalidations': self.invalidations,
+            }
+
+
+def snapshot_row(row: Any) -> dict[str, Any]:
+    return {attr.key: getattr(row, attr.key) for attr in inspect(type(row)).column_attrs}
+
+
+def attach_cached_row(db: Session, model: type[T], values: dict[str, Any]) -> T:
+    # Rebuild the row as if loaded by this session, without emitting a SELECT.
+    row = model(**values)
+    make_transient_to_detached(row)
+    return db.merge(row, load=False)
+
+
+catalog_cache = CatalogCache(
+    max_entries=settings.catalog_cache_max_entries,
+    ttl_seconds=settings.catalog_cache_ttl_seconds,
+    enabled=settings.catalog_cache_enabled,
+)
+
+user_auth_cache = AuthCache(
+    max_entries=settings.auth_cache_max_entries,
+    ttl_seconds=settings.auth_cache_ttl_seconds,
+    enabled=settings.auth_cache_enabled,
+)
+
+admin_auth_cache = AuthCache(
+    max_entries=settings.auth_cache_max_entries,
+    ttl_seconds=settings.auth_cache_ttl_seconds,
+    enabled=settings.auth_cache_enabled,
+)
+
+
+@event.listens_for(User, 'after_update')
+def _invalidate_cached_user(mapper, connection, target: User) -> None:
+    user_auth_cache.invalidate_principal(target.id)
+
+
+@event.listens_for(AdminUser, 'after_update')
+def _invalidate_cached_admin(mapper, connection, target: AdminUser) -> None:
+    admin_auth_cache.invalidate_principal(target.id)
@@ -0,0 +1,227 @@
+from __future__ import annotations
+
+import threading
+import zlib
+from collections.abc import Iterable
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core import get_settings
+
+try:  # optional: brotli is preferred when installed, gzip otherwise
+    import brotli
+except ImportError:  # pragma: no cover - depends on the environment
+    brotli = None
+
+settings = get_settings()
+
+
+def split_setting(value: str) -> list[str]:
+    return [item.strip() for item in value.split(',') if item.strip()]
+
+
+def accepted_encodings(header: str) -> set[str]:
+    # Accept-Encoding tokens with a non-zero q value, e.g. 'br;q=1.0, gzip'.
+    accepted = set()
+    for part in header.split(','):
+        token, _, params = part.partition(';')
+        token = token.strip().lower()
+        quality = 1.0
+        for param in params.split(';'):
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if token and quality > 0:
+            accepted.add(token)
+    return accepted
+
+
+class GzipCompressor:
+    def __init__(self, level: int):
+        # wbits=31 writes the gzip header and trailer.
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class BrotliCompressor:
+    def __init__(self, quality: int):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class CompressionStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.compressed = 0
+        self.skipped_small = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def record(self, bytes_in: int, bytes_out: int) -> None:
+        with self._lock:
+            self.compressed += 1
+            self.bytes_in += bytes_in
+            self.bytes_out += bytes_out
+
+    def record_small(self) -> None:
+        with self._lock:
+            self.skipped_small += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'enabled': settings.compression_enabled,
+                'brotli_available': brotli is not None,
+                'compressed': self.compressed,
+                'skipped_small': self.skipped_small,
+                'bytes_in': self.bytes_in,
+                'bytes_out': self.bytes_out,
+                'ratio': round(self.bytes_out / self.bytes_in, 4) if self.bytes_in else 0.0,
+            }
+
+
+compression_stats = CompressionStats()
+
+
+class CompressionMiddleware:
+    # Compresses responses whose media type is on the allowlist, with brotli
+    # when the client accepts it and the module is installed, gzip otherwise.
+    # A single-chunk body shorter than minimum_size is sent as is, since the
+    # headers and framing would eat the saving. Streaming bodies (CSV/NDJSON
+    # exports) are compressed chunk by chunk and flushed so rows keep flowing.
+    # Excluded path prefixes are never touched: health checks are tiny, and
+    # auth responses carry tokens that must not share a compression context
+    # with attacker-influenced input.
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        content_types: Iterable[str] = ('application/json',),
+        exclude_paths: Iterable[str] = (),
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+        stats: CompressionStats | None = None,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.content_types = {content_type.lower() for content_type in content_types}
+        self.exclude_paths = tuple(exclude_paths)
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.stats = stats or compression_stats
+
+    def choose_encoding(self, scope: Scope) -> str | None:
+        accepted = accepted_encodings(Headers(scope=scope).get('accept-encoding', ''))
+        if brotli is not None and 'br' in accepted:
+            return 'br'
+        if 'gzip' in accepted:
+            return 'gzip'
+        return None
+
+    def new_compressor(self, encoding: str) -> GzipCompressor | BrotliCompressor:
+        if encoding == 'br':
+            return BrotliCompressor(self.brotli_quality)
+        return GzipCompressor(self.gzip_level)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http' or scope['path'].startswith(self.exclude_paths):
+            await self.app(scope, receive, send)
+            return
+        encoding = self.choose_encoding(scope)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        await CompressedResponder(self, encoding, send).run(scope, receive)
+
+
+class CompressedResponder:
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send: Send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self.send = send
+        self.start: Message | None = None
+        self.compressor: GzipCompressor | BrotliCompressor | None = None
+        self.passthrough = False
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    async def run(self, scope: Scope, receive: Receive) -> None:
+        await self.middleware.app(scope, receive, self.send_wrapper)
+
+    def eligible(self, headers: MutableHeaders) -> bool:
+        if 'content-encoding' in headers or self.start['status'] in (204, 304):
+            return False
+        media_type = headers.get('content-type', '').split(';')[0].strip().lower()
+        return media_type in self.middleware.content_types
+
+    async def send_wrapper(self, message: Message) -> None:
+        if message['type'] == 'http.response.start':
+            # Hold the headers until the first body chunk shows the size.
+            self.start = message
+            return
+        if message['type'] != 'http.response.body':
+            await self.send(message)
+            return
+
+        if self.passthrough:
+            await self.send(message)
+            return
+
+        body = message.get('body', b'')
+        more_body = message.get('more_body', False)
+
+        if self.compressor is None:
+            headers = MutableHeaders(raw=self.start['headers'])
+            if not self.eligible(headers):
+                self.passthrough = True
+                await self.send(self.start)
+                await self.send(message)
+                return
+            headers.add_vary_header('Accept-Encoding')
+            if not more_body and len(body) < self.middleware.minimum_size:
+                self.passthrough = True
+                self.middleware.stats.record_small()
+                await self.send(self.start)
+                await self.send(message)
+                return
+
+            self.compressor = self.middleware.new_compressor(self.encoding)
+            headers['Content-Encoding'] = self.encoding
+            if more_body:
+                del headers['Content-Length']
+            else:
+                compressed = self.compressor.compress(body) + self.compressor.finish()
+                headers['Content-Length'] = str(len(compressed))
+                self.middleware.stats.record(len(body), len(compressed))
+                await self.send(self.start)
+                await self.send({'type': 'http.response.body', 'body': compressed})
+                return
+            await self.send(self.start)
+
+        self.bytes_in += len(body)
+        chunk = self.compressor.compress(body)
+        chunk += self.compressor.flush() if more_body else self.compressor.finish()
+        self.bytes_out += len(chunk)
+        if not more_body:
+            self.middleware.stats.record(self.bytes_in, self.bytes_out)
+        await self.send({'type': 'http.response.body', 'body': chunk, 'more_body': more_body})
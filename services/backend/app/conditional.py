@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import hashlib
+from collections.abc import Sequence
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import format_datetime
+
+from fastapi import Request, Response
+from sqlalchemy import func, select, true
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import ColumnElement
+
+CACHE_CONTROL = 'no-cache'
+
+
+@dataclass(frozen=True)
+class Validator:
+    etag: str
+    last_modified: datetime | None
+
+    def headers(self) -> dict[str, str]:
+        # no-cache: clients may keep the body but must revalidate before reuse.
+        headers = {'ETag': self.etag, 'Cache-Control': CACHE_CONTROL}
+        if self.last_modified is not None:
+            headers['Last-Modified'] = format_datetime(self.last_modified, usegmt=True)
+        return headers
+
+
+def _as_utc(value: datetime) -> datetime:
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+def fingerprint(
+    db: Session,
+    sources: Sequence[tuple[type, Sequence[ColumnElement]]],
+    extra: Sequence[ColumnElement] = (),
+) -> Validator:
+    # Row count, latest updated_at and id sum of each (model, conditions) source,
+    # all in one round trip. Edits move updated_at, and rows entering or leaving
+    # a time window (promotions, notices) move the count or the id sum, so any
+    # change to what the endpoint would return changes the ETag. `extra` adds
+    # scalar expressions for columns bulk UPDATEs change within one timestamp.
+    summaries = []
+    for model, conditions in sources:
+        summary = (
+            select(
+                func.count(model.id).label('rows'),
+                func.max(model.updated_at).label('updated_at'),
+                func.coalesce(func.sum(model.id), 0).label('ids'),
+            )
+            .where(*conditions)
+            .subquery()
+        )
+        summaries.append(summary)
+    # Each summary is a single aggregate row, so the cross join is one row too.
+    joined = summaries[0]
+    for summary in summaries[1:]:
+        joined = joined.join(summary, true())
+    columns = [column for summary in summaries for column in summary.c]
+    row = db.execute(select(*columns, *extra).select_from(joined)).one()
+
+    digest = hashlib.sha256(repr(tuple(row)).encode('utf-8')).hexdigest()[:32]
+    updated = [_as_utc(value) for value in row if isinstance(value, datetime)]
+    return Validator(etag=f'"{digest}"', last_modified=max(updated) if updated else None)
+
+
+def is_not_modified(request: Request, validator: Validator) -> bool:
+    header = request.headers.get('if-none-match')
+    if not header:
+        return False
+    if header.strip() == '*':
+        return True
+    # Weak comparison, as RFC 9110 requires for If-None-Match.
+    candidates = {tag.strip().removeprefix('W/') for tag in header.split(',')}
+    return validator.etag in candidates
+
+
+def not_modified(validator: Validator) -> Response:
+    return Response(status_code=304, headers=validator.headers())
@@ -10,12 +10,59 @@ class Settings(BaseSettings):
     env: str = 'dev'
     api_prefix: str = '/api/v1'
     database_url: str = 'postgresql+psycopg://postgres:postgres@db:5432/market'
+    async_db_enabled: bool = False
+    async_database_url: str | None = None
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout_seconds: float = 30.0
+    db_pool_recycle_seconds: int = 1800
+    db_pool_pre_ping: bool = True
+    db_pgbouncer_mode: bool = False
     cors_origins: str = '*'
     same_day_cutoff_hour: int = 19
     time_zone: str = 'Asia/Seoul'
     auth_secret_key: str = 'change-me-in-production'
     auth_access_token_minutes: int = 60
     auth_refresh_token_days: int = 14
+    catalog_cache_enabled: bool = True
+    catalog_cache_ttl_seconds: float = 30.0
+    catalog_cache_max_entries: int = 512
+    auth_cache_enabled: bool = True
+    auth_cache_ttl_seconds: float = 30.0
+    auth_cache_max_entries: int = 10000
+    zone_index_cell_deg: float = 0.01
+    zone_index_ttl_seconds: float = 60.0
+    search_backend: str = 'auto'
+    search_max_candidates: int = 500
+    search_min_relevance: float = 0.5
+    search_popularity_weight: float = 0.3
+    search_index_ttl_seconds: float = 60.0
+    search_index_rebuild_interval_seconds: float = 5.0
+    search_suggest_max: int = 20
+    search_suggest_memo_keys: int = 1000
+    promotion_price_scheduler_enabled: bool = True
+    promotion_price_refresh_max_seconds: float = 300.0
+    pick_layout_pattern: str = r'^(?P<aisle>[A-Z]+)-?(?P<bay>\d+)(?:-(?P<shelf>\d+))?$'
+    pick_layout_aisles: str = ''
+    pick_layout_aisle_spacing_m: float = 3.0
+    pick_layout_bay_spacing_m: float = 1.0
+    pick_layout_bays_per_aisle: int = 20
+    pick_route_strategy: str = 'serpentine'
+    wave_slot_window_minutes: int = 60
+    wave_max_items: int = 120
+    wave_tote_capacity: int = 20
+    wave_max_totes: int = 8
+    compression_enabled: bool = True
+    compression_minimum_size: int = 1024
+    compression_content_types: str = 'application/json,application/x-ndjson,text/csv,text/plain'
+    compression_exclude_paths: str = '/healthz,/api/v1/auth,/api/v1/admin/auth'
+    compression_gzip_level: int = 6
+    compression_brotli_quality: int = 4
+    pbkdf2_iterations: int = 390000
+    password_hash_executor: str = 'process'
+    password_hash_workers: int = 0
+    password_hash_max_pending: int = 16
+    password_hash_timeout_seconds: float = 10.0
 
 
 @lru_cache(maxsize=1)
@@ -0,0 +1,242 @@
+from __future__ import annotations
+
+import argparse
+import csv
+import io
+import json
+import sys
+from collections.abc import Iterable, Iterator
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.db import SessionLocal
+from app.models import DeliveryZone, ZoneType
+from app.zones import EARTH_RADIUS_M, radius_zone_precedence
+
+DEFAULT_CHUNK_SIZE = 4096
+
+
+class CoverageInputError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class CoverageAddress:
+    row: int
+    ref: str | None = None
+    dong_code: str | None = None
+    apartment_name: str | None = None
+    latitude: float | None = None
+    longitude: float | None = None
+
+
+@dataclass(frozen=True)
+class CoverageResult:
+    row: int
+    ref: str | None
+    zone_id: int | None
+    zone_type: str | None
+    distance_m: float | None
+
+
+def _blank_to_none(value) -> str | None:
+    if value is None:
+        return None
+    value = str(value).strip()
+    return value or None
+
+
+def _to_float(value, field: str, row: int) -> float | None:
+    value = _blank_to_none(value)
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError as exc:
+        raise CoverageInputError(f'row {row}: {field} must be a number') from exc
+
+
+def address_from_mapping(row: int, data: dict) -> CoverageAddress:
+    if not isinstance(data, dict):
+        raise CoverageInputError(f'row {row}: expected an object')
+    return CoverageAddress(
+        row=row,
+        ref=_blank_to_none(data.get('ref', data.get('id'))),
+        dong_code=_blank_to_none(data.get('dong_code')),
+        apartment_name=_blank_to_none(data.get('apartment_name')),
+        latitude=_to_float(data.get('latitude'), 'latitude', row),
+        longitude=_to_float(data.get('longitude'), 'longitude', row),
+    )
+
+
+def parse_csv(text: str) -> Iterator[CoverageAddress]:
+    reader = csv.DictReader(io.StringIO(text))
+    for row, data in enumerate(reader, start=1):
+        yield address_from_mapping(row, data)
+
+
+def parse_json(text: str) -> list[CoverageAddress]:
+    try:
+        payload = json.loads(text)
+    except json.JSONDecodeError as exc:
+        raise CoverageInputError('invalid JSON body') from exc
+    if isinstance(payload, dict):
+        payload = payload.get('addresses')
+    if not isinstance(payload, list):
+        raise CoverageInputError('expected a list of addresses')
+    return [address_from_mapping(row, data) for row, data in enumerate(payload, start=1)]
+
+
+class CoverageMatcher:
+    # Snapshot of the active zones laid out for batch lookups, applying the same
+    # precedence as match_delivery_zone: apartment, then dong (newest zone wins),
+    # then the smallest covering radius (newest zone on ties).
+    def __init__(self, zones: Iterable[DeliveryZone]):
+        self.apartment_zones: dict[str, int] = {}
+        self.dong_zones: dict[str, int] = {}
+        radius_zones = []
+        for zone in sorted(zones, key=lambda zone: zone.id):
+            if not zone.is_active:
+                continue
+            if zone.zone_type == ZoneType.APARTMENT and zone.apartment_name:
+                self.apartment_zones[zone.apartment_name] = zone.id
+            elif zone.zone_type == ZoneType.DONG and zone.dong_code:
+                self.dong_zones[zone.dong_code] = zone.id
+            elif (
+                zone.zone_type == ZoneType.RADIUS
+                and zone.center_lat is not None
+                and zone.center_lng is not None
+                and zone.radius_m is not None
+            ):
+                radius_zones.append((zone.id, float(zone.center_lat), float(zone.center_lng), zone.radius_m))
+
+        radius_zones.sort(key=lambda zone: radius_zone_precedence(zone[0], zone[3]))
+        self.radius_ids = np.array([zone[0] for zone in radius_zones], dtype=np.int64)
+        self.radius_lat = np.radians(np.array([zone[1] for zone in radius_zones], dtype=np.float64))
+        self.radius_lng = np.radians(np.array([zone[2] for zone in radius_zones], dtype=np.float64))
+        self.radius_m = np.array([zone[3] for zone in radius_zones], dtype=np.float64)
+
+    @classmethod
+    def load(cls, db: Session) -> CoverageMatcher:
+        return cls(db.scalars(select(DeliveryZone).where(DeliveryZone.is_active.is_(True))))
+
+    def _match_radius(self, lat: np.ndarray, lng: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        # Points x zones in one shot. Zones are pre-sorted by precedence, so the
+        # first covering column of each row is the zone match_delivery_zone picks.
+        phi = np.radians(lat)[:, None]
+        lam = np.radians(lng)[:, None]
+        a = (
+            np.sin((self.radius_lat - phi) / 2) ** 2
+            + np.cos(phi) * np.cos(self.radius_lat) * np.sin((self.radius_lng - lam) / 2) ** 2
+        )
+        distances = 2 * EARTH_RADIUS_M * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+        covered = distances <= self.radius_m
+        first = covered.argmax(axis=1)
+        matched = covered[np.arange(len(first)), first]
+        return np.where(matched, first, -1), distances[np.arange(len(first)), first]
+
+    def match_chunk(self, addresses: list[CoverageAddress]) -> list[CoverageResult]:
+        results: list[CoverageResult | None] = [None] * len(addresses)
+        pending: list[int] = []
+        for position, address in enumerate(addresses):
+            zone_id = None
+            zone_type = None
+            if address.apartment_name and address.apartment_name in self.apartment_zones:
+                zone_id, zone_type = self.apartment_zones[address.apartment_name], ZoneType.APARTMENT
+            elif address.dong_code and address.dong_code in self.dong_zones:
+                zone_id, zone_type = self.dong_zones[address.dong_code], ZoneType.DONG
+            elif address.latitude is not None and address.longitude is not None and len(self.radius_ids):
+                pending.append(position)
+                continue
+            results[position] = CoverageResult(
+                row=address.row,
+                ref=address.ref,
+                zone_id=zone_id,
+                zone_type=zone_type.value if zone_type else None,
+                distance_m=None,
+            )
+
+        if pending:
+            lat = np.array([addresses[position].latitude for position in pending], dtype=np.float64)
+            lng = np.array([addresses[position].longitude for position in pending], dtype=np.float64)
+            columns, distances = self._match_radius(lat, lng)
+            for position, column, distance in zip(pending, columns.tolist(), distances.tolist()):
+                address = addresses[position]
+                matched = column >= 0
+                results[position] = CoverageResult(
+                    row=address.row,
+                    ref=address.ref,
+                    zone_id=int(self.radius_ids[column]) if matched else None,
+                    zone_type=ZoneType.RADIUS.value if matched else None,
+                    distance_m=round(distance, 1) if matched else None,
+                )
+
+        return results  # type: ignore[return-value]
+
+    def iter_matches(
+        self,
+        addresses: Iterable[CoverageAddress],
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> Iterator[CoverageResult]:
+        chunk: list[CoverageAddress] = []
+        for address in addresses:
+            chunk.append(address)
+            if len(chunk) >= chunk_size:
+                yield from self.match_chunk(chunk)
+                chunk = []
+        if chunk:
+            yield from self.match_chunk(chunk)
+
+
+def iter_ndjson(results: Iterable[CoverageResult]) -> Iterator[str]:
+    for result in results:
+        yield json.dumps(asdict(result), ensure_ascii=False) + '\n'
+
+
+def iter_csv(results: Iterable[CoverageResult]) -> Iterator[str]:
+    fields = list(CoverageResult.__dataclass_fields__)
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fields)
+    writer.writeheader()
+    for result in results:
+        writer.writerow(asdict(result))
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description='Check an address list against the active delivery zones.')
+    parser.add_argument('input', help='CSV or JSON file of addresses, or - for stdin')
+    parser.add_argument('--input-format', choices=['csv', 'json'], help='defaults to the file extension, else csv')
+    parser.add_argument('--output-format', choices=['ndjson', 'csv'], default='ndjson')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args(argv)
+
+    if args.input == '-':
+        text = sys.stdin.read()
+        input_format = args.input_format or 'csv'
+    else:
+        path = Path(args.input)
+        text = path.read_text(encoding='utf-8-sig')
+        input_format = args.input_format or ('json' if path.suffix.lower() == '.json' else 'csv')
+
+    with SessionLocal() as db:
+        matcher = CoverageMatcher.load(db)
+
+    try:
+        addresses = parse_json(text) if input_format == 'json' else parse_csv(text)
+        results = matcher.iter_matches(addresses, chunk_size=args.chunk_size)
+        lines = iter_csv(results) if args.output_format == 'csv' else iter_ndjson(results)
+        for line in lines:
+            sys.stdout.write(line)
+    except CoverageInputError as exc:
+        parser.exit(2, f'error: {exc}\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,22 +1,182 @@
-from collections.abc import Generator
+import threading
+import time
+from collections import deque
+from collections.abc import AsyncGenerator, Callable, Generator
+from typing import Any, TypeVar
 
-from sqlalchemy import create_engine
+from sqlalchemy import Engine, create_engine, event, exc, make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
+from starlette.concurrency import run_in_threadpool
 
 from app.core import get_settings
 
 settings = get_settings()
 
-engine = create_engine(
-    settings.database_url,
-    pool_pre_ping=True,
-)
+T = TypeVar('T')
+
+WAIT_SAMPLES = 1024
+
+
+class PoolMetrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._waits: deque[float] = deque(maxlen=WAIT_SAMPLES)
+        self.checkouts = 0
+        self.wait_timeouts = 0
+        self.max_wait_ms = 0.0
+
+    def record_wait(self, elapsed_ms: float, timed_out: bool) -> None:
+        with self._lock:
+            self._waits.append(elapsed_ms)
+            self.max_wait_ms = max(self.max_wait_ms, elapsed_ms)
+            self.wait_timeouts += int(timed_out)
+
+    def record_checkout(self) -> None:
+        with self._lock:
+            self.checkouts += 1
+
+    def stats(self, pool: Pool) -> dict:
+        with self._lock:
+            waits = sorted(self._waits)
+            stats = {
+                'pool': type(pool).__name__,
+                'checkouts': self.checkouts,
+                'wait_timeouts': self.wait_timeouts,
+                'wait_p50_ms': round(waits[len(waits) // 2], 2) if waits else 0.0,
+                'wait_p99_ms': round(waits[min(len(waits) - 1, int(len(waits) * 0.99))], 2) if waits else 0.0,
+                'wait_max_ms': round(self.max_wait_ms, 2),
+            }
+        if isinstance(pool, QueuePool):
+            stats.update(
+                size=pool.size(),
+                in_use=pool.checkedout(),
+                idle=pool.checkedin(),
+                overflow=pool.overflow(),
+            )
+        return stats
+
+
+class _TimedCheckoutMixin:
+    # Times how long a checkout waits for a free connection (pool exhaustion),
+    # which pool events cannot see: 'checkout' fires only once one is handed out.
+    metrics: PoolMetrics | None = None
+
+    def _do_get(self):
+        started = time.perf_counter()
+        timed_out = False
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            timed_out = True
+            raise
+        finally:
+            if self.metrics is not None:
+                self.metrics.record_wait((time.perf_counter() - started) * 1000, timed_out)
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+class TimedQueuePool(_TimedCheckoutMixin, QueuePool):
+    pass
+
+
+class TimedAsyncAdaptedQueuePool(_TimedCheckoutMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def engine_options(url: str, poolclass: type[Pool]) -> dict[str, Any]:
+    options: dict[str, Any] = {'pool_pre_ping': settings.db_pool_pre_ping}
+    parsed = make_url(url)
+    if parsed.get_backend_name() == 'sqlite':
+        return options
+
+    options.update(
+        poolclass=poolclass,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout_seconds,
+        pool_recycle=settings.db_pool_recycle_seconds,
+    )
+    if settings.db_pgbouncer_mode and parsed.get_driver_name() == 'psycopg':
+        # PgBouncer transaction pooling hands each transaction to any server
+        # connection, so server-side prepared statements cannot be reused.
+        options['connect_args'] = {'prepare_threshold': None}
+    return options
+
+
+def instrument_pool(sync_engine: Engine) -> PoolMetrics:
+    metrics = PoolMetrics()
+    pool = sync_engine.pool
+    if isinstance(pool, _TimedCheckoutMixin):
+        pool.metrics = metrics
+
+    @event.listens_for(sync_engine, 'checkout')
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy) -> None:
+        metrics.record_checkout()
+
+    return metrics
+
+
+engine = create_engine(settings.database_url, **engine_options(settings.database_url, TimedQueuePool))
+engine_metrics = instrument_pool(engine)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Opt-in (ASYNC_DB_ENABLED). postgresql+psycopg URLs work for both engines.
+async_database_url = settings.async_database_url or settings.database_url
+async_engine = (
+    create_async_engine(async_database_url, **engine_options(async_database_url, TimedAsyncAdaptedQueuePool))
+    if settings.async_db_enabled
+    else None
+)
+async_engine_metrics = instrument_pool(async_engine.sync_engine) if async_engine is not None else None
+AsyncSessionLocal = (
+    async_sessionmaker(autocommit=False, autoflush=False, bind=async_engine) if async_engine is not None else None
+)
+
+
+def pool_stats() -> dict:
+    stats = {'sync': engine_metrics.stats(engine.pool)}
+    if async_engine is not None and async_engine_metrics is not None:
+        stats['async'] = async_engine_metrics.stats(async_engine.sync_engine.pool)
+    return stats
+
+
+class ThreadedSession:
+    # Stand-in for AsyncSession while the async engine is disabled: the same
+    # run_sync() contract, executed on a sync session in the worker thread pool.
+    def __init__(self, session: Session):
+        self.sync_session = session
+
+    async def run_sync(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        return await run_in_threadpool(fn, self.sync_session, *args, **kwargs)
+
+
+AsyncDb = AsyncSession | ThreadedSession
+
 
 def get_db() -> Generator[Session, None, None]:
+    # FastAPI caches dependencies per request, so get_current_user_optional and
+    # the route body receive this same session (and one pooled connection).
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+async def get_async_db() -> AsyncGenerator[AsyncDb, None]:
+    if AsyncSessionLocal is None:
+        db = SessionLocal()
+        try:
+            yield ThreadedSession(db)
+        finally:
+            await run_in_threadpool(db.close)
+        return
+
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from collections.abc import Iterable
+
+from sqlalchemy import and_, case, select, update
+from sqlalchemy.orm import Session
+
+from app.models import OrderItem, Product
+
+
+class StockReservationError(Exception):
+    def __init__(self, product_ids: list[int]):
+        super().__init__(f'insufficient stock for products {product_ids}')
+        self.product_ids = product_ids
+
+
+def _delta_expr(deltas: dict[int, int]):
+    return case(deltas, value=Product.id, else_=0)
+
+
+def reserve_stock(db: Session, quantities: dict[int, int]) -> None:
+    # One conditional UPDATE per order: a row is only touched while
+    # stock_qty - reserved_qty still covers the request, so concurrent checkouts
+    # cannot oversell. Callers must roll back when any product falls short.
+    quantities = {product_id: qty for product_id, qty in quantities.items() if qty > 0}
+    if not quantities:
+        return
+
+    product_ids = sorted(quantities)
+    qty_expr = _delta_expr(quantities)
+    reserved_ids = set(
+        db.scalars(
+            update(Product)
+            .where(
+                and_(
+                    Product.id.in_(product_ids),
+                    Product.stock_qty - Product.reserved_qty >= qty_expr,
+                )
+            )
+            .values(reserved_qty=Product.reserved_qty + qty_expr)
+            .returning(Product.id)
+        )
+    )
+    missing = [product_id for product_id in product_ids if product_id not in reserved_ids]
+    if missing:
+        raise StockReservationError(missing)
+
+
+def consume_stock(db: Session, quantities: dict[int, int]) -> None:
+    quantities = {product_id: qty for product_id, qty in quantities.items() if qty > 0}
+    if not quantities:
+        return
+
+    product_ids = sorted(quantities)
+    qty_expr = _delta_expr(quantities)
+    consumed_ids = set(
+        db.scalars(
+            update(Product)
+            .where(
+                and_(
+                    Product.id.in_(product_ids),
+                    Product.stock_qty - Product.reserved_qty >= qty_expr,
+                )
+            )
+            .values(stock_qty=Product.stock_qty - qty_expr)
+            .returning(Product.id)
+        )
+    )
+    missing = [product_id for product_id in product_ids if product_id not in consumed_ids]
+    if missing:
+        raise StockReservationError(missing)
+
+
+def adjust_stock(
+    db: Session,
+    reserved_deltas: dict[int, int] | None = None,
+    stock_deltas: dict[int, int] | None = None,
+) -> None:
+    reserved_deltas = {key: value for key, value in (reserved_deltas or {}).items() if value}
+    stock_deltas = {key: value for key, value in (stock_deltas or {}).items() if value}
+    product_ids = sorted(set(reserved_deltas) | set(stock_deltas))
+    if not product_ids:
+        return
+
+    values = {}
+    if reserved_deltas:
+        values['reserved_qty'] = Product.reserved_qty + _delta_expr(reserved_deltas)
+    if stock_deltas:
+        values['stock_qty'] = Product.stock_qty + _delta_expr(stock_deltas)
+
+    db.execute(update(Product).where(Product.id.in_(product_ids)).values(**values))
+
+
+def _load_order_items(db: Session, order_ids: Iterable[int]) -> list[OrderItem]:
+    order_ids = list(order_ids)
+    if not order_ids:
+        return []
+    return list(db.scalars(select(OrderItem).where(OrderItem.order_id.in_(order_ids))))
+
+
+def settle_reserved_stock(db: Session, order_ids: Iterable[int]) -> None:
+    # Substituted lines already consumed the substitute at shortage time, so only
+    # their reservation is dropped here.
+    reserved_deltas: dict[int, int] = defaultdict(int)
+    stock_deltas: dict[int, int] = defaultdict(int)
+    for item in _load_order_items(db, order_ids):
+        reserved_deltas[item.product_id] -= item.qty_ordered
+        if item.substitution_product_id is None:
+            stock_deltas[item.product_id] -= item.qty_fulfilled
+    adjust_stock(db, reserved_deltas, stock_deltas)
+
+
+def release_reserved_stock(db: Session, order_ids: Iterable[int]) -> None:
+    reserved_deltas: dict[int, int] = defaultdict(int)
+    stock_deltas: dict[int, int] = defaultdict(int)
+    for item in _load_order_items(db, order_ids):
+        reserved_deltas[item.product_id] -= item.qty_ordered
+        if item.substitution_product_id is not None:
+            stock_deltas[item.substitution_product_id] += item.qty_fulfilled
+    adjust_stock(db, reserved_deltas, stock_deltas)
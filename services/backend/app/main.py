@@ -1,13 +1,34 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 
 from app.api import addresses, admin, auth, cart, checkout, orders, public
+from app.compression import CompressionMiddleware, split_setting
 from app.core import get_settings
+from app.db import async_engine
+from app.pagination import NEXT_CURSOR_HEADER
+from app.passwords import password_hasher
+from app.pricing import promotion_price_scheduler
 from app.services import DomainError
 
 settings = get_settings()
-app = FastAPI(title=settings.app_name, version='0.1.0')
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    if settings.promotion_price_scheduler_enabled:
+        promotion_price_scheduler.start()
+    yield
+    await promotion_price_scheduler.stop()
+    # Stop the password hashing worker processes with the app worker.
+    password_hasher.shutdown()
+    if async_engine is not None:
+        await async_engine.dispose()
+
+
+app = FastAPI(title=settings.app_name, version='0.1.0', lifespan=lifespan)
 
 origins = [item.strip() for item in settings.cors_origins.split(',')] if settings.cors_origins else ['*']
 app.add_middleware(
@@ -16,7 +37,17 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=['*'],
     allow_headers=['*'],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
+if settings.compression_enabled:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.compression_minimum_size,
+        content_types=split_setting(settings.compression_content_types),
+        exclude_paths=split_setting(settings.compression_exclude_paths),
+        gzip_level=settings.compression_gzip_level,
+        brotli_quality=settings.compression_brotli_quality,
+    )
 
 
 @app.exception_handler(DomainError)
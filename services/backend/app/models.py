@@ -9,12 +9,14 @@ from sqlalchemy import (
     DateTime,
     Enum,
     ForeignKey,
+    Index,
     Integer,
     Numeric,
     String,
     Text,
     Time,
     UniqueConstraint,
+    event,
     func,
 )
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
@@ -45,6 +47,13 @@ class OrderStatus(str, enum.Enum):
     CANCELED = 'CANCELED'
 
 
+class WaveStatus(str, enum.Enum):
+    PLANNED = 'PLANNED'
+    PICKING = 'PICKING'
+    COMPLETED = 'COMPLETED'
+    CANCELED = 'CANCELED'
+
+
 class PaymentMethod(str, enum.Enum):
     COD = 'COD'
 
@@ -76,6 +85,10 @@ class Category(TimestampMixin, Base):
 
 class Product(TimestampMixin, Base):
     __tablename__ = 'products'
+    __table_args__ = (
+        Index('ix_products_listing_price', 'is_visible', 'status', 'effective_price', 'id'),
+        Index('ix_products_listing_popularity', 'is_visible', 'status', 'popularity'),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     category_id: Mapped[int | None] = mapped_column(ForeignKey('categories.id'))
@@ -88,6 +101,11 @@ class Product(TimestampMixin, Base):
     is_weight_item: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
     base_price: Mapped[Decimal] = mapped_column(Numeric(12, 2), nullable=False)
     sale_price: Mapped[Decimal | None] = mapped_column(Numeric(12, 2))
+    # Best live promotion price and membership, maintained by app.pricing.
+    promo_price: Mapped[Decimal | None] = mapped_column(Numeric(12, 2))
+    on_promotion: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
+    # Price the listing filters and sorts on; kept in sync on every flush.
+    effective_price: Mapped[Decimal] = mapped_column(Numeric(12, 2), nullable=False)
     status: Mapped[ProductStatus] = mapped_column(Enum(ProductStatus), default=ProductStatus.ACTIVE, nullable=False)
     is_visible: Mapped[bool] = mapped_column(Boolean, default=True, nullable=False)
     pick_location: Mapped[str | None] = mapped_column(String(60))
@@ -99,8 +117,16 @@ class Product(TimestampMixin, Base):
     category: Mapped[Category | None] = relationship(back_populates='products')
 
 
+@event.listens_for(Product, 'before_insert')
+@event.listens_for(Product, 'before_update')
+def sync_effective_price(mapper, connection, target: Product) -> None:
+    prices = [price for price in (target.base_price, target.sale_price, target.promo_price) if price is not None]
+    target.effective_price = min(prices)
+
+
 class Promotion(TimestampMixin, Base):
     __tablename__ = 'promotions'
+    __table_args__ = (Index('ix_promotions_active_window', 'is_active', 'start_at', 'end_at'),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     title: Mapped[str] = mapped_column(String(200), nullable=False)
@@ -194,7 +220,7 @@ class CartItem(TimestampMixin, Base):
     __tablename__ = 'cart_items'
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    cart_id: Mapped[int] = mapped_column(ForeignKey('carts.id', ondelete='CASCADE'), nullable=False)
+    cart_id: Mapped[int] = mapped_column(ForeignKey('carts.id', ondelete='CASCADE'), nullable=False, index=True)
     product_id: Mapped[int] = mapped_column(ForeignKey('products.id'), nullable=False)
     qty: Mapped[int] = mapped_column(Integer, nullable=False)
     unit_snapshot_price: Mapped[Decimal] = mapped_column(Numeric(12, 2), nullable=False)
@@ -263,13 +289,14 @@ class Holiday(TimestampMixin, Base):
 
 class Order(TimestampMixin, Base):
     __tablename__ = 'orders'
+    __table_args__ = (Index('ix_orders_status_ordered_at', 'status', 'ordered_at'),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     order_no: Mapped[str] = mapped_column(String(40), unique=True, nullable=False)
     user_id: Mapped[int | None] = mapped_column(ForeignKey('users.id', ondelete='SET NULL'), index=True)
     order_source: Mapped[str] = mapped_column(String(20), nullable=False, default='GUEST')
     customer_name: Mapped[str] = mapped_column(String(100), nullable=False)
-    customer_phone: Mapped[str] = mapped_column(String(20), nullable=False)
+    customer_phone: Mapped[str] = mapped_column(String(20), nullable=False, index=True)
     phone_verified: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
     address_line1: Mapped[str] = mapped_column(String(200), nullable=False)
     address_line2: Mapped[str | None] = mapped_column(String(200))
@@ -285,6 +312,10 @@ class Order(TimestampMixin, Base):
     delivery_fee: Mapped[Decimal] = mapped_column(Numeric(12, 2), nullable=False)
     total_estimated: Mapped[Decimal] = mapped_column(Numeric(12, 2), nullable=False)
     total_final: Mapped[Decimal | None] = mapped_column(Numeric(12, 2))
+    # Sum of APPROVED/DONE refunds, kept up to date by app.refunds.add_refunded_totals.
+    refunded_total: Mapped[Decimal] = mapped_column(
+        Numeric(12, 2), default=Decimal('0'), server_default='0', nullable=False
+    )
     status: Mapped[OrderStatus] = mapped_column(Enum(OrderStatus), default=OrderStatus.RECEIVED, nullable=False)
     cancelable_until: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
     ordered_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
@@ -299,7 +330,7 @@ class OrderItem(Base):
     __tablename__ = 'order_items'
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    order_id: Mapped[int] = mapped_column(ForeignKey('orders.id', ondelete='CASCADE'), nullable=False)
+    order_id: Mapped[int] = mapped_column(ForeignKey('orders.id', ondelete='CASCADE'), nullable=False, index=True)
     product_id: Mapped[int] = mapped_column(ForeignKey('products.id'), nullable=False)
     product_name_snapshot: Mapped[str] = mapped_column(String(160), nullable=False)
     unit_snapshot: Mapped[str] = mapped_column(String(30), nullable=False)
@@ -323,7 +354,7 @@ class OrderStatusLog(Base):
     __tablename__ = 'order_status_logs'
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    order_id: Mapped[int] = mapped_column(ForeignKey('orders.id', ondelete='CASCADE'), nullable=False)
+    order_id: Mapped[int] = mapped_column(ForeignKey('orders.id', ondelete='CASCADE'), nullable=False, index=True)
     from_status: Mapped[str | None] = mapped_column(String(40))
     to_status: Mapped[str] = mapped_column(String(40), nullable=False)
     changed_by_type: Mapped[str] = mapped_column(String(30), nullable=False)
@@ -348,7 +379,7 @@ class Refund(Base):
     __tablename__ = 'refunds'
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    order_id: Mapped[int] = mapped_column(ForeignKey('orders.id', ondelete='CASCADE'), nullable=False)
+    order_id: Mapped[int] = mapped_column(ForeignKey('orders.id', ondelete='CASCADE'), nullable=False, index=True)
     amount: Mapped[Decimal] = mapped_column(Numeric(12, 2), nullable=False)
     reason: Mapped[str] = mapped_column(String(300), nullable=False)
     method: Mapped[str] = mapped_column(String(40), nullable=False, default='COD_ADJUSTMENT')
@@ -357,6 +388,39 @@ class Refund(Base):
     processed_by: Mapped[str | None] = mapped_column(String(60))
 
 
+class PickWave(TimestampMixin, Base):
+    __tablename__ = 'pick_waves'
+    __table_args__ = (Index('ix_pick_waves_status_slot', 'status', 'slot_start'),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    status: Mapped[WaveStatus] = mapped_column(Enum(WaveStatus), default=WaveStatus.PLANNED, nullable=False)
+    # Start of the requested-slot window the wave's orders fall in; None for orders without a slot.
+    slot_start: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+    delivery_zone_id: Mapped[int | None] = mapped_column(ForeignKey('delivery_zones.id'))
+    order_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    item_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    tote_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    created_by: Mapped[str | None] = mapped_column(String(60))
+
+    orders: Mapped[list['PickWaveOrder']] = relationship(back_populates='wave', cascade='all, delete-orphan')
+
+
+class PickWaveOrder(Base):
+    __tablename__ = 'pick_wave_orders'
+    # An order is in at most one wave; canceling a wave removes its rows.
+    __table_args__ = (UniqueConstraint('order_id', name='uq_pick_wave_orders_order_id'),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    wave_id: Mapped[int] = mapped_column(ForeignKey('pick_waves.id', ondelete='CASCADE'), nullable=False, index=True)
+    order_id: Mapped[int] = mapped_column(ForeignKey('orders.id', ondelete='CASCADE'), nullable=False)
+    # The order fills totes first_tote .. first_tote + tote_count - 1 of its wave.
+    first_tote: Mapped[int] = mapped_column(Integer, nullable=False)
+    tote_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    item_count: Mapped[int] = mapped_column(Integer, nullable=False)
+
+    wave: Mapped[PickWave] = relationship(back_populates='orders')
+
+
 class Notice(TimestampMixin, Base):
     __tablename__ = 'notices'
 
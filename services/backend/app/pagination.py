@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import base64
+import json
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+from typing import Any
+
+from sqlalchemy import DateTime, Select, and_, func, literal, or_
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.elements import ColumnElement
+from sqlalchemy.sql.functions import FunctionElement
+
+from app.services import DomainError
+
+
+NEXT_CURSOR_HEADER = 'X-Next-Cursor'
+
+
+class InvalidCursorError(DomainError):
+    def __init__(self, message: str):
+        super().__init__('INVALID_CURSOR', message)
+
+
+class sortable_timestamp(FunctionElement):
+    # SQLite stores timestamps as text and server_default rows omit the fraction
+    # that bound datetimes carry, so equal instants would not compare equal there.
+    # Other dialects compare the column itself and keep using its index.
+    type = DateTime(timezone=True)
+    inherit_cache = True
+
+
+@compiles(sortable_timestamp)
+def _compile_sortable_timestamp(element, compiler, **kw):
+    return compiler.process(list(element.clauses)[0], **kw)
+
+
+@compiles(sortable_timestamp, 'sqlite')
+def _compile_sortable_timestamp_sqlite(element, compiler, **kw):
+    return compiler.process(func.strftime('%Y-%m-%d %H:%M:%f', list(element.clauses)[0]), **kw)
+
+
+@dataclass(frozen=True)
+class KeysetColumn:
+    expr: ColumnElement
+    descending: bool
+    value: Callable[[Any], Any]
+    kind: type = int
+
+    def sql(self) -> ColumnElement:
+        return sortable_timestamp(self.expr) if self.kind is datetime else self.expr
+
+    def bind(self, value: Any) -> Any:
+        return sortable_timestamp(literal(value, self.expr.type)) if self.kind is datetime else value
+
+
+@dataclass(frozen=True)
+class KeysetSort:
+    # Ordered columns ending in a unique tie-breaker (the primary key), so every
+    # row has a distinct position and a page resumes right after the last row.
+    name: str
+    columns: Sequence[KeysetColumn]
+
+    def order_by(self) -> list[ColumnElement]:
+        return [column.sql().desc() if column.descending else column.sql().asc() for column in self.columns]
+
+    def after(self, values: Sequence[Any]) -> ColumnElement:
+        # (a, b, c) > (x, y, z) in sort order, spelled out per column so mixed
+        # ASC/DESC directions work and each prefix can use a composite index.
+        clauses = []
+        for index, column in enumerate(self.columns):
+            equal_prefix = [self.columns[i].sql() == self.columns[i].bind(values[i]) for i in range(index)]
+            bound = column.bind(values[index])
+            beyond = column.sql() < bound if column.descending else column.sql() > bound
+            clauses.append(and_(*equal_prefix, beyond))
+        return or_(*clauses)
+
+    def encode(self, row: Any) -> str:
+        payload = [self.name, *(_dump(column.value(row)) for column in self.columns)]
+        raw = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+        return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+    def decode(self, cursor: str) -> list[Any]:
+        try:
+            raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+            name, *values = json.loads(raw)
+        except Exception as exc:
+            raise InvalidCursorError('잘못된 커서입니다.') from exc
+        if name != self.name or len(values) != len(self.columns):
+            raise InvalidCursorError('다른 정렬의 커서입니다.')
+        try:
+            return [_load(value, column.kind) for value, column in zip(values, self.columns)]
+        except Exception as exc:
+            raise InvalidCursorError('잘못된 커서입니다.') from exc
+
+
+def _dump(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def _load(value: Any, kind: type) -> Any:
+    if kind is datetime:
+        return datetime.fromisoformat(value)
+    if kind is Decimal:
+        return Decimal(value)
+    return kind(value)
+
+
+def paginate(stmt: Select, sort: KeysetSort, cursor: str | None, limit: int) -> Select:
+    if cursor:
+        stmt = stmt.where(sort.after(sort.decode(cursor)))
+    return stmt.order_by(*sort.order_by()).limit(limit + 1)
+
+
+def split_page(rows: list, sort: KeysetSort, limit: int) -> tuple[list, str | None]:
+    # paginate() fetches one extra row; its presence means another page exists.
+    if len(rows) <= limit:
+        return rows, None
+    page = rows[:limit]
+    return page, sort.encode(page[-1])
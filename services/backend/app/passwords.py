@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import TypeVar
+
+from app.auth import hash_password, verify_password
+from app.core import get_settings
+
+settings = get_settings()
+
+T = TypeVar('T')
+
+LATENCY_SAMPLES = 1024
+
+
+class PasswordHasherBusy(Exception):
+    pass
+
+
+def _percentile(samples: list[float], ratio: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * ratio))]
+
+
+class PasswordHasher:
+    # PBKDF2 runs in a dedicated pool so a login burst cannot hold every request
+    # thread. At most max_pending calls may be queued or running; beyond that
+    # callers fail fast and the API answers 503 instead of piling up.
+    def __init__(self, mode: str, workers: int, max_pending: int, timeout_seconds: float):
+        self.mode = mode
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending
+        self.timeout_seconds = timeout_seconds
+        self._executor: Executor | None = None
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._pending = 0
+        self._latencies: dict[str, deque[float]] = {}
+        self._counts: dict[str, int] = {}
+        self.rejected = 0
+        self.timeouts = 0
+
+    def _get_executor(self) -> Executor:
+        with self._lock:
+            if self._executor is None:
+                if self.mode == 'thread':
+                    self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='password-hash')
+                else:
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=multiprocessing.get_context('spawn'),
+                    )
+            return self._executor
+
+    def _run(self, operation: str, fn: Callable[..., T], *args) -> T:
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise PasswordHasherBusy(operation)
+
+        started = time.perf_counter()
+        with self._lock:
+            self._pending += 1
+        try:
+            future = self._get_executor().submit(fn, *args)
+            try:
+                return future.result(timeout=self.timeout_seconds)
+            except FutureTimeoutError as exc:
+                future.cancel()
+                with self._lock:
+                    self.timeouts += 1
+                raise PasswordHasherBusy(operation) from exc
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            with self._lock:
+                self._pending -= 1
+                self._counts[operation] = self._counts.get(operation, 0) + 1
+                self._latencies.setdefault(operation, deque(maxlen=LATENCY_SAMPLES)).append(elapsed_ms)
+            self._slots.release()
+
+    def hash(self, password: str) -> str:
+        return self._run('hash', hash_password, password)
+
+    def verify(self, password: str, encoded_hash: str) -> bool:
+        return self._run('verify', verify_password, password, encoded_hash)
+
+    @property
+    def running(self) -> bool:
+        return self._executor is not None
+
+    def shutdown(self, wait: bool = True) -> None:
+        # The pool is rebuilt lazily on the next call, so this is safe to repeat.
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+
+    def stats(self) -> dict:
+        with self._lock:
+            latency = {}
+            for operation, samples in self._latencies.items():
+                values = list(samples)
+                latency[operation] = {
+                    'count': self._counts.get(operation, 0),
+                    'p50_ms': round(_percentile(values, 0.50), 1),
+                    'p99_ms': round(_percentile(values, 0.99), 1),
+                    'max_ms': round(max(values), 1) if values else 0.0,
+                }
+            return {
+                'mode': self.mode,
+                'workers': self.workers,
+                'max_pending': self.max_pending,
+                'pending': self._pending,
+                'rejected': self.rejected,
+                'timeouts': self.timeouts,
+                'latency': latency,
+            }
+
+
+password_hasher = PasswordHasher(
+    mode=settings.password_hash_executor,
+    workers=settings.password_hash_workers,
+    max_pending=settings.password_hash_max_pending,
+    timeout_seconds=settings.password_hash_timeout_seconds,
+)
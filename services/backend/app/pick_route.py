@@ -0,0 +1,262 @@
+from __future__ import annotations
+
+import re
+from bisect import bisect_left
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+
+from app.core import get_settings
+from app.schemas import PickingListItemOut, PickRouteOut, PickRouteStopOut
+
+settings = get_settings()
+
+ROUTE_STRATEGIES = ('serpentine', 'nearest')
+
+
+@dataclass(frozen=True)
+class PickLocation:
+    aisle: str
+    aisle_index: int
+    bay: int
+    shelf: int
+
+
+@dataclass
+class PickStop:
+    # One place to stand: every line at this aisle and bay, any shelf.
+    location: PickLocation
+    items: list[PickingListItemOut] = field(default_factory=list)
+    distance_m: float = 0.0
+
+
+@dataclass
+class PickRoute:
+    strategy: str
+    stops: list[PickStop]
+    unlocated: list[PickingListItemOut]
+    distance_m: float
+
+
+def aisle_number(aisle: str) -> int:
+    # Numbered aisles keep their number; lettered ones go spreadsheet-style, A=0 ... Z=25, AA=26.
+    if aisle.isdigit():
+        return int(aisle)
+    index = 0
+    for char in aisle:
+        index = index * 26 + ord(char) - ord('A') + 1
+    return index - 1
+
+
+class StoreLayout:
+    # Maps pick_location strings to positions in a store of parallel aisles.
+    # Aisles are aisle_spacing_m apart and bays bay_spacing_m apart along
+    # them; shelves are vertical and cost nothing to walk. Cross aisles run
+    # along the front (bay 0, where the depot is) and the back of every aisle,
+    # so moving between aisles means walking to one end or the other.
+    def __init__(
+        self,
+        pattern: str,
+        aisles: Sequence[str] = (),
+        aisle_spacing_m: float = 3.0,
+        bay_spacing_m: float = 1.0,
+        bays_per_aisle: int = 20,
+    ):
+        self.pattern = re.compile(pattern, re.IGNORECASE)
+        self.aisles = {aisle.upper(): index for index, aisle in enumerate(aisles)}
+        self.aisle_spacing_m = aisle_spacing_m
+        self.bay_spacing_m = bay_spacing_m
+        self.bays_per_aisle = bays_per_aisle
+        self._parsed: dict[str, PickLocation | None] = {}
+
+    def parse(self, pick_location: str | None) -> PickLocation | None:
+        if not pick_location:
+            return None
+        if pick_location in self._parsed:
+            return self._parsed[pick_location]
+        location = None
+        match = self.pattern.match(pick_location.strip())
+        if match:
+            aisle = match.group('aisle').upper()
+            # With an explicit aisle order, aisles outside it cannot be placed.
+            aisle_index = self.aisles.get(aisle) if self.aisles else aisle_number(aisle)
+            if aisle_index is not None:
+                shelf = match.groupdict().get('shelf')
+                location = PickLocation(aisle, aisle_index, int(match.group('bay')), int(shelf) if shelf else 0)
+        self._parsed[pick_location] = location
+        return location
+
+    def sort_key(self, pick_location: str | None) -> tuple:
+        # Walking order for listings: parsed locations by aisle, bay and
+        # shelf, then unparsed ones as text, then lines without a location.
+        location = self.parse(pick_location)
+        if location is not None:
+            return (0, location.aisle_index, location.bay, location.shelf, '')
+        return (1 if pick_location else 2, 0, 0, 0, pick_location or '')
+
+    def point(self, location: PickLocation) -> tuple[float, float]:
+        return location.aisle_index * self.aisle_spacing_m, location.bay * self.bay_spacing_m
+
+    def aisle_length(self, locations: Iterable[PickLocation]) -> float:
+        deepest = max((location.bay for location in locations), default=0)
+        return (max(self.bays_per_aisle, deepest) + 1) * self.bay_spacing_m
+
+
+def travel_m(a: tuple[float, float], b: tuple[float, float], aisle_length: float) -> float:
+    (ax, ay), (bx, by) = a, b
+    if ax == bx:
+        return abs(ay - by)
+    # Out of one aisle by the nearer useful end, across, and into the next.
+    return abs(ax - bx) + min(ay + by, 2 * aisle_length - ay - by)
+
+
+def path_distance_m(points: Iterable[tuple[float, float]], aisle_length: float) -> float:
+    # Depot -> each point in turn -> depot.
+    depot = current = (0.0, 0.0)
+    distance = 0.0
+    for point in points:
+        distance += travel_m(current, point, aisle_length)
+        current = point
+    return distance + travel_m(current, depot, aisle_length)
+
+
+def serpentine_order(points: list[tuple[float, float]]) -> list[int]:
+    # S-shape: aisles left to right, up the first, down the next, and so on.
+    by_aisle: dict[float, list[int]] = {}
+    for index, (x, _) in enumerate(points):
+        by_aisle.setdefault(x, []).append(index)
+    order: list[int] = []
+    for turn, x in enumerate(sorted(by_aisle)):
+        order.extend(sorted(by_aisle[x], key=lambda index: points[index][1], reverse=turn % 2 == 1))
+    return order
+
+
+def nearest_neighbour_order(points: list[tuple[float, float]], aisle_length: float) -> list[int]:
+    # Greedy: always walk to the closest remaining stop. Within the current
+    # aisle that is a neighbour in bay order; in any other aisle it is the
+    # stop closest to the front or the back, since the walk enters from an
+    # end. So each step checks two stops per aisle instead of every stop.
+    columns: dict[float, list[tuple[float, int]]] = {}
+    for index, (x, y) in enumerate(points):
+        columns.setdefault(x, []).append((y, index))
+    for column in columns.values():
+        column.sort()
+
+    cx, cy = 0.0, 0.0
+    order: list[int] = []
+    while columns:
+        best: tuple[float, float, float, int] | None = None
+        for x, column in columns.items():
+            if x == cx:
+                position = bisect_left(column, (cy, -1))
+                candidates = [p for p in (position - 1, position) if 0 <= p < len(column)]
+            else:
+                candidates = [0, len(column) - 1]
+            for p in candidates:
+                y = column[p][0]
+                distance = travel_m((cx, cy), (x, y), aisle_length)
+                if best is None or (distance, x, y) < best[:3]:
+                    best = (distance, x, y, p)
+        _, x, y, p = best
+        column = columns[x]
+        order.append(column.pop(p)[1])
+        if not column:
+            del columns[x]
+        cx, cy = x, y
+    return order
+
+
+def group_stops(
+    items: Iterable[PickingListItemOut], layout: StoreLayout
+) -> tuple[list[PickStop], list[PickingListItemOut]]:
+    stops: dict[tuple[int, int], PickStop] = {}
+    unlocated: list[PickingListItemOut] = []
+    for item in items:
+        location = layout.parse(item.pick_location)
+        if location is None:
+            unlocated.append(item)
+            continue
+        key = (location.aisle_index, location.bay)
+        stop = stops.get(key)
+        if stop is None:
+            stop = stops[key] = PickStop(PickLocation(location.aisle, location.aisle_index, location.bay, 0))
+        stop.items.append(item)
+    for stop in stops.values():
+        stop.items.sort(key=lambda item: layout.parse(item.pick_location).shelf)
+    return list(stops.values()), unlocated
+
+
+def plan_route(
+    items: Iterable[PickingListItemOut],
+    layout: StoreLayout,
+    strategy: str | None = None,
+) -> PickRoute:
+    # One walk that picks every located line of the wave. Lines whose
+    # location does not parse are returned separately, in their given order.
+    strategy = strategy or settings.pick_route_strategy
+    if strategy not in ROUTE_STRATEGIES:
+        raise ValueError(f'unknown pick route strategy: {strategy}')
+    stops, unlocated = group_stops(items, layout)
+    points = [layout.point(stop.location) for stop in stops]
+    aisle_length = layout.aisle_length(stop.location for stop in stops)
+    if strategy == 'nearest':
+        order = nearest_neighbour_order(points, aisle_length)
+    else:
+        order = serpentine_order(points)
+
+    current = (0.0, 0.0)
+    for index in order:
+        stops[index].distance_m = travel_m(current, points[index], aisle_length)
+        current = points[index]
+    return PickRoute(
+        strategy=strategy,
+        stops=[stops[index] for index in order],
+        unlocated=unlocated,
+        distance_m=path_distance_m((points[index] for index in order), aisle_length),
+    )
+
+
+def listed_order_distance_m(items: Iterable[PickingListItemOut], layout: StoreLayout) -> float:
+    # Walk length when lines are picked in the order given, e.g. the picking
+    # list's order-by-order listing.
+    locations = [location for item in items if (location := layout.parse(item.pick_location)) is not None]
+    aisle_length = layout.aisle_length(locations)
+    return path_distance_m((layout.point(location) for location in locations), aisle_length)
+
+
+def pick_route_to_schema(
+    items: list[PickingListItemOut],
+    layout: StoreLayout,
+    strategy: str | None = None,
+) -> PickRouteOut:
+    route = plan_route(items, layout, strategy)
+    stops = [
+        PickRouteStopOut(
+            sequence=sequence,
+            aisle=stop.location.aisle,
+            bay=stop.location.bay,
+            distance_m=round(stop.distance_m, 2),
+            items=stop.items,
+        )
+        for sequence, stop in enumerate(route.stops, start=1)
+    ]
+    return PickRouteOut(
+        generated_at=datetime.now(timezone.utc),
+        strategy=route.strategy,
+        order_count=len({item.order_id for item in items}),
+        line_count=len(items),
+        stop_count=len(stops),
+        distance_m=round(route.distance_m, 2),
+        listed_order_distance_m=round(listed_order_distance_m(items, layout), 2),
+        stops=stops,
+        unlocated_items=route.unlocated,
+    )
+
+
+store_layout = StoreLayout(
+    settings.pick_layout_pattern,
+    [aisle.strip() for aisle in settings.pick_layout_aisles.split(',') if aisle.strip()],
+    settings.pick_layout_aisle_spacing_m,
+    settings.pick_layout_bay_spacing_m,
+    settings.pick_layout_bays_per_aisle,
+)
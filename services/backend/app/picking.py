@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import csv
+import io
+import json
+from collections.abc import Iterable, Iterator
+from datetime import datetime, timezone
+
+from sqlalchemy import Select, and_, or_, select
+
+from app.db import SessionLocal
+from app.models import Order, OrderItem, OrderStatus, PickWaveOrder, Product
+from app.pick_route import store_layout
+from app.schemas import PickingListItemOut, PickingListOut, PickingListSummaryOut
+
+EXPORT_BATCH_SIZE = 500
+EXPORT_ITEM_FIELDS = list(PickingListItemOut.model_fields)
+EXPORT_CSV_FIELDS = ['record_type', *EXPORT_ITEM_FIELDS, 'total_qty_ordered', 'order_count']
+
+
+def picking_list_query(
+    statuses: list[OrderStatus],
+    keyword: str | None = None,
+    wave_id: int | None = None,
+) -> Select:
+    stmt = (
+        select(Order, OrderItem, Product)
+        .join(OrderItem, OrderItem.order_id == Order.id)
+        .outerjoin(Product, Product.id == OrderItem.product_id)
+        .where(Order.status.in_(statuses))
+        .order_by(Order.ordered_at.asc(), Order.id.asc(), OrderItem.id.asc())
+    )
+
+    if wave_id is not None:
+        stmt = stmt.join(PickWaveOrder, and_(PickWaveOrder.order_id == Order.id, PickWaveOrder.wave_id == wave_id))
+
+    if keyword and keyword.strip():
+        pattern = f"%{keyword.strip()}%"
+        stmt = stmt.where(
+            or_(
+                Order.order_no.ilike(pattern),
+                OrderItem.product_name_snapshot.ilike(pattern),
+                Product.name.ilike(pattern),
+                Product.pick_location.ilike(pattern),
+            )
+        )
+    return stmt
+
+
+def picking_item(order: Order, order_item: OrderItem, product: Product | None) -> PickingListItemOut:
+    return PickingListItemOut(
+        order_id=order.id,
+        order_no=order.order_no,
+        order_status=order.status,
+        ordered_at=order.ordered_at,
+        requested_slot_start=order.requested_slot_start,
+        order_item_id=order_item.id,
+        product_id=order_item.product_id,
+        product_name=product.name if product else order_item.product_name_snapshot,
+        unit_label=product.unit_label if product else order_item.unit_snapshot,
+        qty_ordered=order_item.qty_ordered,
+        qty_fulfilled=order_item.qty_fulfilled,
+        pick_location=product.pick_location if product else None,
+    )
+
+
+class PickingSummary:
+    # Per-product totals, accumulated one picking line at a time so the
+    # streaming export never holds the lines themselves.
+    def __init__(self):
+        self._products: dict[int, dict] = {}
+        self.order_ids: set[int] = set()
+        self.line_count = 0
+
+    def add(self, item: PickingListItemOut) -> None:
+        self.line_count += 1
+        self.order_ids.add(item.order_id)
+        entry = self._products.get(item.product_id)
+        if entry is None:
+            entry = {
+                'product_id': item.product_id,
+                'product_name': item.product_name,
+                'unit_label': item.unit_label,
+                'pick_location': item.pick_location,
+                'total_qty_ordered': 0,
+                'order_ids': set(),
+            }
+            self._products[item.product_id] = entry
+        entry['total_qty_ordered'] += item.qty_ordered
+        entry['order_ids'].add(item.order_id)
+
+    def rows(self) -> list[PickingListSummaryOut]:
+        rows = [
+            PickingListSummaryOut(
+                product_id=entry['product_id'],
+                product_name=entry['product_name'],
+                unit_label=entry['unit_label'],
+                pick_location=entry['pick_location'],
+                total_qty_ordered=entry['total_qty_ordered'],
+                order_count=len(entry['order_ids']),
+            )
+            for entry in self._products.values()
+        ]
+        rows.sort(key=lambda row: (store_layout.sort_key(row.pick_location), row.product_name))
+        return rows
+
+
+def build_picking_list(rows: Iterable[tuple[Order, OrderItem, Product | None]]) -> PickingListOut:
+    items: list[PickingListItemOut] = []
+    summary = PickingSummary()
+    for order, order_item, product in rows:
+        item = picking_item(order, order_item, product)
+        items.append(item)
+        summary.add(item)
+
+    return PickingListOut(
+        generated_at=datetime.now(timezone.utc),
+        order_count=len(summary.order_ids),
+        line_count=summary.line_count,
+        items=items,
+        summary=summary.rows(),
+    )
+
+
+def iter_picking_records(
+    stmt: Select,
+    batch_size: int = EXPORT_BATCH_SIZE,
+) -> Iterator[PickingListItemOut | PickingListSummaryOut]:
+    # Picking lines in list order, read through a server-side cursor
+    # batch_size rows at a time, then the per-product summary. The identity
+    # map holds rows weakly, so lines already sent can be collected. Uses its
+    # own session: the request's session is closed before a streamed body is sent.
+    summary = PickingSummary()
+    with SessionLocal() as db:
+        for order, order_item, product in db.execute(stmt.execution_options(yield_per=batch_size)):
+            item = picking_item(order, order_item, product)
+            summary.add(item)
+            yield item
+    yield from summary.rows()
+
+
+def iter_picking_ndjson(records: Iterable[PickingListItemOut | PickingListSummaryOut]) -> Iterator[str]:
+    for record in records:
+        record_type = 'item' if isinstance(record, PickingListItemOut) else 'summary'
+        yield json.dumps({'record_type': record_type, **record.model_dump(mode='json')}, ensure_ascii=False) + '\n'
+
+
+def iter_picking_csv(records: Iterable[PickingListItemOut | PickingListSummaryOut]) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_CSV_FIELDS)
+    writer.writeheader()
+    for record in records:
+        record_type = 'item' if isinstance(record, PickingListItemOut) else 'summary'
+        writer.writerow({'record_type': record_type, **record.model_dump(mode='json')})
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from collections.abc import Iterable
+from datetime import datetime, timezone
+from decimal import Decimal
+
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.core import get_settings
+from app.db import SessionLocal
+from app.models import Product, Promotion, PromotionProduct
+
+settings = get_settings()
+
+
+def _as_utc(value: datetime | None) -> datetime | None:
+    if value is None or value.tzinfo is not None:
+        return value
+    return value.replace(tzinfo=timezone.utc)
+
+
+def live_promotion_prices(
+    db: Session,
+    now: datetime,
+    product_ids: Iterable[int] | None = None,
+) -> dict[int, Decimal | None]:
+    # product id -> lowest promo_price among its live promotions (None when the
+    # product is in a live promotion without a promo price).
+    stmt = (
+        select(PromotionProduct.product_id, func.min(PromotionProduct.promo_price))
+        .join(Promotion, Promotion.id == PromotionProduct.promotion_id)
+        .where(and_(Promotion.is_active.is_(True), Promotion.start_at <= now, Promotion.end_at >= now))
+        .group_by(PromotionProduct.product_id)
+    )
+    if product_ids is not None:
+        stmt = stmt.where(PromotionProduct.product_id.in_(list(product_ids)))
+    return {product_id: promo_price for product_id, promo_price in db.execute(stmt)}
+
+
+def refresh_promotion_prices(
+    db: Session,
+    product_ids: Iterable[int] | None = None,
+    now: datetime | None = None,
+) -> int:
+    # Sets Product.promo_price/on_promotion from the promotions live at `now`;
+    # the Product flush hook then recomputes effective_price. Only products that
+    # are or were on promotion are loaded. The caller commits.
+    now = now or datetime.now(timezone.utc)
+    db.flush()  # sessions do not autoflush; pending promotion rows must count
+    if product_ids is not None:
+        product_ids = set(product_ids)
+        if not product_ids:
+            return 0
+    prices = live_promotion_prices(db, now, product_ids)
+
+    stmt = select(Product).where(or_(Product.on_promotion.is_(True), Product.id.in_(list(prices))))
+    if product_ids is not None:
+        stmt = stmt.where(Product.id.in_(list(product_ids)))
+
+    changed = 0
+    for product in db.scalars(stmt):
+        on_promotion = product.id in prices
+        promo_price = prices.get(product.id)
+        if product.on_promotion != on_promotion or product.promo_price != promo_price:
+            product.on_promotion = on_promotion
+            product.promo_price = promo_price
+            changed += 1
+    db.flush()
+    return changed
+
+
+def next_promotion_boundary(db: Session, now: datetime) -> datetime | None:
+    # The next instant a live price can change: an active promotion starting,
+    # or one ending (end_at is inclusive, so it stops being live just after).
+    next_start = db.scalar(
+        select(func.min(Promotion.start_at)).where(and_(Promotion.is_active.is_(True), Promotion.start_at > now))
+    )
+    next_end = db.scalar(
+        select(func.min(Promotion.end_at)).where(and_(Promotion.is_active.is_(True), Promotion.end_at >= now))
+    )
+    boundaries = [_as_utc(value) for value in (next_start, next_end) if value is not None]
+    return min(boundaries) if boundaries else None
+
+
+class PromotionPriceScheduler:
+    # Background task that re-applies promotion prices when a promotion starts
+    # or ends. Admin promotion writes refresh their own products immediately;
+    # this covers the boundaries nobody is editing at, waking at the next one
+    # and at least every max_interval_seconds. Running it in several workers is
+    # harmless: a refresh with nothing to change writes nothing.
+    def __init__(self, max_interval_seconds: float):
+        self.max_interval_seconds = max_interval_seconds
+        self._task: asyncio.Task | None = None
+        self._lock = threading.Lock()
+        self.refreshes = 0
+        self.changed = 0
+        self.errors = 0
+        self.last_error: str | None = None
+        self.last_refresh_at: datetime | None = None
+        self.next_boundary: datetime | None = None
+
+    def refresh_once(self) -> datetime | None:
+        from app.cache import catalog_cache
+
+        now = datetime.now(timezone.utc)
+        with SessionLocal() as db:
+            changed = refresh_promotion_prices(db, now=now)
+            db.commit()
+            boundary = next_promotion_boundary(db, now)
+        if changed:
+            catalog_cache.bump_version()
+        with self._lock:
+            self.refreshes += 1
+            self.changed += changed
+            self.last_refresh_at = now
+            self.next_boundary = boundary
+        return boundary
+
+    def _delay(self, boundary: datetime | None) -> float:
+        if boundary is None:
+            return self.max_interval_seconds
+        seconds = (boundary - datetime.now(timezone.utc)).total_seconds() + 1
+        return min(max(seconds, 1.0), self.max_interval_seconds)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                boundary = await run_in_threadpool(self.refresh_once)
+            except Exception as exc:  # keep the loop alive; retried on the next tick
+                with self._lock:
+                    self.errors += 1
+                    self.last_error = repr(exc)
+                boundary = None
+            await asyncio.sleep(self._delay(boundary))
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        if not self.running:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is None:
+            return
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'running': self.running,
+                'refreshes': self.refreshes,
+                'changed': self.changed,
+                'errors': self.errors,
+                'last_error': self.last_error,
+                'last_refresh_at': self.last_refresh_at.isoformat() if self.last_refresh_at else None,
+                'next_boundary': self.next_boundary.isoformat() if self.next_boundary else None,
+                'max_interval_seconds': self.max_interval_seconds,
+            }
+
+
+promotion_price_scheduler = PromotionPriceScheduler(settings.promotion_price_refresh_max_seconds)
@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import re
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from decimal import Decimal
+
+from sqlalchemy import Select, and_, select, text
+from sqlalchemy.orm import Session
+
+from app.models import (
+    CartItem,
+    Order,
+    OrderItem,
+    OrderStatus,
+    OrderStatusLog,
+    PickWaveOrder,
+    Product,
+    ProductStatus,
+    Promotion,
+    Refund,
+)
+
+SQLITE_TABLE_SCAN = re.compile(r'^SCAN (\w+)$')
+
+
+@dataclass(frozen=True)
+class HotQuery:
+    name: str
+    build: Callable[[], Select]
+
+
+@dataclass
+class PlanReport:
+    name: str
+    seq_scans: list[str] = field(default_factory=list)
+    plan: list[str] = field(default_factory=list)
+
+
+# Representative shapes of the queries behind the busiest endpoints, with fixed
+# sample parameters. Each should be answerable from an index.
+HOT_QUERIES = [
+    HotQuery('cart_items_by_cart', lambda: select(CartItem).where(CartItem.cart_id == 1)),
+    HotQuery('order_items_by_order', lambda: select(OrderItem).where(OrderItem.order_id == 1)),
+    HotQuery(
+        'order_status_logs_by_order',
+        lambda: select(OrderStatusLog).where(OrderStatusLog.order_id == 1).order_by(OrderStatusLog.created_at),
+    ),
+    HotQuery(
+        'refunds_by_order',
+        lambda: select(Refund).where(Refund.order_id == 1).order_by(Refund.processed_at.desc(), Refund.id.desc()),
+    ),
+    HotQuery('guest_orders_by_phone', lambda: select(Order).where(Order.customer_phone == '01000000000')),
+    HotQuery(
+        'picking_list',
+        lambda: select(Order.id)
+        .where(Order.status.in_([OrderStatus.RECEIVED, OrderStatus.PICKING]))
+        .order_by(Order.ordered_at.asc(), Order.id.asc()),
+    ),
+    HotQuery('pick_wave_orders', lambda: select(PickWaveOrder).where(PickWaveOrder.wave_id == 1)),
+    HotQuery(
+        'admin_order_board',
+        lambda: select(Order.id)
+        .where(Order.status == OrderStatus.RECEIVED)
+        .order_by(Order.ordered_at.desc(), Order.id.desc())
+        .limit(200),
+    ),
+    HotQuery(
+        'product_listing_popular',
+        lambda: select(Product.id)
+        .where(and_(Product.is_visible.is_(True), Product.status == ProductStatus.ACTIVE))
+        .order_by(Product.popularity.desc(), Product.id.asc())
+        .limit(100),
+    ),
+    HotQuery(
+        'product_listing_price',
+        lambda: select(Product.id)
+        .where(
+            and_(
+                Product.is_visible.is_(True),
+                Product.status == ProductStatus.ACTIVE,
+                Product.effective_price >= Decimal('1000'),
+                Product.effective_price <= Decimal('20000'),
+            )
+        )
+        .order_by(Product.effective_price.asc(), Product.id.asc())
+        .limit(100),
+    ),
+    HotQuery(
+        'current_promotions',
+        lambda: select(Promotion.id)
+        .where(
+            and_(
+                Promotion.is_active.is_(True),
+                Promotion.start_at <= datetime(2026, 1, 1, tzinfo=timezone.utc),
+                Promotion.end_at >= datetime(2026, 1, 1, tzinfo=timezone.utc),
+            )
+        )
+        .order_by(Promotion.start_at.desc()),
+    ),
+]
+
+
+def _postgres_nodes(plan: dict) -> Iterator[dict]:
+    yield plan
+    for child in plan.get('Plans', []):
+        yield from _postgres_nodes(child)
+
+
+def explain(db: Session, query: HotQuery) -> PlanReport:
+    bind = db.get_bind()
+    sql = str(query.build().compile(dialect=bind.dialect, compile_kwargs={'literal_binds': True}))
+    report = PlanReport(query.name)
+
+    if bind.dialect.name == 'postgresql':
+        # Small tables make the planner prefer a sequential scan even when a
+        # usable index exists; with seq scans disabled, one that still shows
+        # up means no index can serve the query. Rolling back resets the setting.
+        db.execute(text('SET LOCAL enable_seqscan = off'))
+        plan = db.execute(text(f'EXPLAIN (FORMAT JSON) {sql}')).scalar_one()[0]['Plan']
+        db.rollback()
+        for node in _postgres_nodes(plan):
+            relation = node.get('Relation Name')
+            report.plan.append(f"{node['Node Type']} {relation or ''}".strip())
+            if node['Node Type'] == 'Seq Scan':
+                report.seq_scans.append(relation)
+        return report
+
+    for row in db.execute(text(f'EXPLAIN QUERY PLAN {sql}')):
+        detail = row[-1]
+        report.plan.append(detail)
+        match = SQLITE_TABLE_SCAN.match(detail)
+        if match:
+            report.seq_scans.append(match.group(1))
+    return report
+
+
+def explain_hot_queries(db: Session, queries: list[HotQuery] | None = None) -> list[PlanReport]:
+    return [explain(db, query) for query in queries or HOT_QUERIES]
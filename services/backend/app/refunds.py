@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from decimal import Decimal
+
+from sqlalchemy import and_, case, func, select, update
+from sqlalchemy.orm import Session
+
+from app.models import Order, Refund
+from app.services import to_decimal
+
+# Refund statuses that count against an order's refundable amount.
+APPROVED_REFUND_STATUSES = ('APPROVED', 'DONE')
+
+
+@dataclass(frozen=True)
+class RefundedTotalDrift:
+    order_id: int
+    recorded: Decimal
+    actual: Decimal
+
+
+def add_refunded_totals(db: Session, amounts: dict[int, Decimal]) -> set[int]:
+    # Adds newly approved refunds to orders.refunded_total and re-derives
+    # total_final in one UPDATE, inside the caller's transaction so the totals
+    # commit or roll back with the refund rows. The WHERE re-checks each
+    # order's limit against the stored total, so two concurrent refunds
+    # cannot together go over it. Returns the ids of the orders updated; an
+    # order missing from the result was refunded by someone else first.
+    amounts = {order_id: amount for order_id, amount in amounts.items() if amount > Decimal('0')}
+    if not amounts:
+        return set()
+    refunded = Order.refunded_total + case(amounts, value=Order.id, else_=0)
+    stmt = (
+        update(Order)
+        .where(and_(Order.id.in_(sorted(amounts)), refunded <= Order.total_estimated))
+        .values(refunded_total=refunded, total_final=Order.total_estimated - refunded)
+        .returning(Order.id)
+        .execution_options(synchronize_session='fetch')
+    )
+    return set(db.scalars(stmt))
+
+
+def find_refunded_total_drift(db: Session) -> list[RefundedTotalDrift]:
+    # Orders whose stored refunded_total disagrees with their approved refunds.
+    actual = (
+        select(Refund.order_id, func.sum(Refund.amount).label('total'))
+        .where(Refund.status.in_(APPROVED_REFUND_STATUSES))
+        .group_by(Refund.order_id)
+        .subquery()
+    )
+    actual_total = func.coalesce(actual.c.total, 0)
+    rows = db.execute(
+        select(Order.id, Order.refunded_total, actual_total)
+        .outerjoin(actual, actual.c.order_id == Order.id)
+        .where(Order.refunded_total != actual_total)
+        .order_by(Order.id)
+    )
+    drift = []
+    for order_id, recorded, total in rows:
+        # Compared at the column's scale, so backends that sum NUMERIC as
+        # floating point do not report rounding noise.
+        recorded = to_decimal(recorded).quantize(Decimal('0.01'))
+        total = to_decimal(total).quantize(Decimal('0.01'))
+        if recorded != total:
+            drift.append(RefundedTotalDrift(order_id, recorded, total))
+    return drift
+
+
+def reconcile_refunded_totals(db: Session, repair: bool = False) -> list[RefundedTotalDrift]:
+    # Reports drift, and with repair resets the drifted orders' refunded_total
+    # and total_final from the refunds table. The caller commits.
+    drift = find_refunded_total_drift(db)
+    if repair and drift:
+        actual = case({row.order_id: row.actual for row in drift}, value=Order.id)
+        remaining = Order.total_estimated - actual
+        db.execute(
+            update(Order)
+            .where(Order.id.in_([row.order_id for row in drift]))
+            .values(refunded_total=actual, total_final=case((remaining < 0, 0), else_=remaining))
+            .execution_options(synchronize_session=False)
+        )
+    return drift
@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+from decimal import Decimal
+from functools import lru_cache
+from typing import Any
+
+import orjson
+from fastapi import Response
+from pydantic import BaseModel, TypeAdapter
+
+
+def _orjson_default(value: Any) -> Any:
+    # Same wire format as pydantic: Decimal as a string, models as their fields.
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, BaseModel):
+        return value.model_dump()
+    raise TypeError(f'{type(value).__name__} is not JSON serializable')
+
+
+class FastJSONResponse(Response):
+    # Opt-in replacement for JSONResponse. Content that is already encoded is
+    # sent as is; anything else goes through orjson instead of json.dumps.
+    media_type = 'application/json'
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return orjson.dumps(content, default=_orjson_default, option=orjson.OPT_UTC_Z)
+
+
+@lru_cache(maxsize=None)
+def _adapter(schema: Any) -> TypeAdapter:
+    return TypeAdapter(schema)
+
+
+def trusted_json(schema: Any, content: Any, headers: dict[str, str] | None = None) -> FastJSONResponse:
+    # For handlers whose output is built from ORM rows by the *_to_schema
+    # helpers: those objects were validated when constructed, so this dumps
+    # them straight to JSON with pydantic's serializer. Returning a Response
+    # makes FastAPI skip its own response_model pass, which would validate and
+    # encode every object a second time. The bytes are the same either way.
+    return FastJSONResponse(_adapter(schema).dump_json(content), headers=headers)
@@ -3,7 +3,7 @@ from decimal import Decimal
 
 from pydantic import BaseModel, Field
 
-from app.models import OrderStatus, ProductStatus, ZoneType
+from app.models import OrderStatus, ProductStatus, WaveStatus, ZoneType
 
 
 class CategoryOut(BaseModel):
@@ -25,13 +25,46 @@ class ProductOut(BaseModel):
     is_weight_item: bool
     base_price: Decimal
     sale_price: Decimal | None
+    promo_price: Decimal | None = None
     effective_price: Decimal
     status: ProductStatus
+    # Sellable quantity (on-hand minus reserved_qty held by open orders).
     stock_qty: int
+    reserved_qty: int = 0
     max_per_order: int
     pick_location: str | None
 
 
+class ProductSuggestionOut(BaseModel):
+    id: int
+    name: str
+
+
+class CategoryFacet(BaseModel):
+    category_id: int | None
+    category_name: str | None
+    count: int
+
+
+class PriceRangeFacet(BaseModel):
+    # Half-open [min_price, max_price); the top bucket has no max_price.
+    min_price: int
+    max_price: int | None
+    count: int
+
+
+class ProductFacets(BaseModel):
+    total: int
+    categories: list[CategoryFacet]
+    price_ranges: list[PriceRangeFacet]
+    promo_count: int
+
+
+class ProductListResponse(BaseModel):
+    products: list[ProductOut]
+    facets: ProductFacets
+
+
 class PromotionOut(BaseModel):
     id: int
     title: str
@@ -299,6 +332,29 @@ class AdminOrderStatusUpdate(BaseModel):
     reason: str | None = None
 
 
+class AdminBulkOrderStatusUpdate(BaseModel):
+    order_ids: list[int] = Field(min_length=1, max_length=500)
+    status: OrderStatus
+    reason: str | None = None
+
+
+class BulkOrderStatusResultOut(BaseModel):
+    order_id: int
+    ok: bool
+    changed: bool
+    from_status: OrderStatus | None
+    status: OrderStatus | None
+    error_code: str | None = None
+    error_message: str | None = None
+
+
+class BulkOrderStatusUpdateOut(BaseModel):
+    requested_count: int
+    changed_count: int
+    failed_count: int
+    results: list[BulkOrderStatusResultOut]
+
+
 class ProductCreateInput(BaseModel):
     category_id: int | None = None
     name: str
@@ -365,7 +421,69 @@ class PickingListOut(BaseModel):
     summary: list[PickingListSummaryOut]
 
 
+class PickRouteStopOut(BaseModel):
+    sequence: int
+    aisle: str
+    bay: int
+    # From the previous stop, or from the depot for the first one.
+    distance_m: float
+    items: list[PickingListItemOut]
+
+
+class PickRouteOut(BaseModel):
+    generated_at: datetime
+    strategy: str
+    order_count: int
+    line_count: int
+    stop_count: int
+    # Depot -> every stop -> depot, against the same lines walked in picking-list order.
+    distance_m: float
+    listed_order_distance_m: float
+    stops: list[PickRouteStopOut]
+    unlocated_items: list[PickingListItemOut]
+
+
+class WavePlanInput(BaseModel):
+    # Unset limits fall back to the WAVE_* settings.
+    slot_window_minutes: int | None = Field(default=None, ge=1, le=1440)
+    max_items: int | None = Field(default=None, ge=1)
+    tote_capacity: int | None = Field(default=None, ge=1)
+    max_totes: int | None = Field(default=None, ge=1)
+
+
+class WaveStatusUpdate(BaseModel):
+    status: WaveStatus
+
+
+class PickWaveOut(BaseModel):
+    id: int
+    status: WaveStatus
+    slot_start: datetime | None
+    delivery_zone_id: int | None
+    order_count: int
+    item_count: int
+    tote_count: int
+    created_by: str | None
+    created_at: datetime
+
+
+class PickWaveOrderOut(BaseModel):
+    order_id: int
+    order_no: str
+    order_status: OrderStatus
+    # Totes first_tote .. first_tote + tote_count - 1 of the wave hold this order.
+    first_tote: int
+    tote_count: int
+    item_count: int
+
+
+class PickWaveDetailOut(PickWaveOut):
+    orders: list[PickWaveOrderOut]
+    route: PickRouteOut
+
+
 class InventoryUpdateInput(BaseModel):
+    # Sellable quantity, like ProductOut.stock_qty; stock reserved by open orders is kept on top.
     stock_qty: int = Field(ge=0)
     max_per_order: int = Field(ge=1, le=99)
 
@@ -458,6 +576,14 @@ class ShortageActionInput(BaseModel):
     reason: str | None = None
 
 
+class ShortageBatchActionInput(ShortageActionInput):
+    order_id: int
+
+
+class ShortageBatchInput(BaseModel):
+    actions: list[ShortageBatchActionInput] = Field(min_length=1, max_length=200)
+
+
 class RefundCreateInput(BaseModel):
     amount: Decimal = Field(gt=0)
     reason: str = Field(min_length=2, max_length=300)
@@ -0,0 +1,297 @@
+from __future__ import annotations
+
+import bisect
+import heapq
+import math
+import re
+import threading
+import time
+import unicodedata
+from collections import defaultdict
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+from sqlalchemy import and_, func, literal, or_, select
+from sqlalchemy.orm import Session
+
+from app.core import get_settings
+from app.models import Product, ProductStatus
+
+settings = get_settings()
+
+WORD_RE = re.compile(r'\w+')
+DESCRIPTION_WEIGHT = 0.3
+PRECOMPUTED_PREFIX_LEN = 4
+PREFIX_END = '\U0010ffff'
+
+
+def normalize(text: str | None) -> str:
+    return unicodedata.normalize('NFKC', text or '').lower()
+
+
+def words(text: str | None) -> list[str]:
+    return WORD_RE.findall(normalize(text))
+
+
+def ngrams(text: str | None) -> set[str]:
+    # Unigrams plus in-word bigrams. Korean product names are short compounds
+    # without reliable word breaks ("돼지앞다리"), so bigrams match "앞다리" or
+    # "돼지" inside them the way a substring search would, without a full scan.
+    grams: set[str] = set()
+    for word in words(text):
+        grams.update(word)
+        grams.update(word[index : index + 2] for index in range(len(word) - 1))
+    return grams
+
+
+@dataclass(frozen=True)
+class SearchDocument:
+    product_id: int
+    name: str
+    description: str | None
+    popularity: int
+
+
+def blend_score(relevance: float, popularity: int, max_popularity: int) -> float:
+    popularity_boost = math.log1p(max(popularity, 0)) / math.log1p(max_popularity) if max_popularity > 0 else 0.0
+    return round(relevance + settings.search_popularity_weight * popularity_boost, 6)
+
+
+class ProductSearchIndex:
+    def __init__(self, documents: Iterable[SearchDocument]):
+        self.documents = {document.product_id: document for document in documents}
+        self.max_popularity = max((document.popularity for document in self.documents.values()), default=0)
+        self._names = {product_id: normalize(document.name) for product_id, document in self.documents.items()}
+        self._postings: dict[str, dict[int, float]] = defaultdict(dict)
+        for document in self.documents.values():
+            for gram in ngrams(document.description):
+                self._postings[gram][document.product_id] = DESCRIPTION_WEIGHT
+            for gram in ngrams(document.name):
+                self._postings[gram][document.product_id] = 1.0
+
+        # Typeahead: every word start and the full name, sorted for bisect.
+        # Prefixes up to PRECOMPUTED_PREFIX_LEN characters match too many keys
+        # to rank on each keystroke, so their top products are precomputed.
+        entries: set[tuple[str, int]] = set()
+        for product_id, name in self._names.items():
+            entries.add((name, product_id))
+            entries.update((word, product_id) for word in WORD_RE.findall(name))
+        self._prefix_keys = sorted(entries)
+        self._rank = {product_id: (-document.popularity, product_id) for product_id, document in self.documents.items()}
+        self._top_by_prefix: dict[str, list[int]] = defaultdict(list)
+        for document in sorted(self.documents.values(), key=lambda document: self._rank[document.product_id]):
+            name = self._names[document.product_id]
+            keys = [name, *WORD_RE.findall(name)]
+            starts = {key[:length] for key in keys for length in range(1, PRECOMPUTED_PREFIX_LEN + 1)}
+            for prefix in starts:
+                bucket = self._top_by_prefix[prefix]
+                if len(bucket) < settings.search_suggest_max:
+                    bucket.append(document.product_id)
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    def search(self, query: str, limit: int) -> dict[int, float]:
+        grams = ngrams(query)
+        if not grams:
+            return {}
+        phrase = normalize(query).strip()
+        matched: dict[int, float] = defaultdict(float)
+        for gram in grams:
+            for product_id, weight in self._postings.get(gram, {}).items():
+                matched[product_id] += weight
+
+        scores: dict[int, float] = {}
+        for product_id, weight in matched.items():
+            relevance = weight / len(grams)
+            if relevance < settings.search_min_relevance:
+                continue
+            if phrase and phrase in self._names[product_id]:
+                relevance += 1.0
+            scores[product_id] = blend_score(relevance, self.documents[product_id].popularity, self.max_popularity)
+
+        return dict(heapq.nsmallest(limit, scores.items(), key=lambda item: (-item[1], item[0])))
+
+    def suggest(self, prefix: str, limit: int) -> list[SearchDocument]:
+        prefix = normalize(prefix).strip()
+        if not prefix:
+            return []
+        if len(prefix) <= PRECOMPUTED_PREFIX_LEN:
+            return [self.documents[product_id] for product_id in self._top_by_prefix.get(prefix, [])[:limit]]
+        cached = self._top_by_prefix.get(prefix)
+        if cached is not None:
+            return [self.documents[product_id] for product_id in cached[:limit]]
+
+        start = bisect.bisect_left(self._prefix_keys, (prefix, -1))
+        end = bisect.bisect_left(self._prefix_keys, (prefix + PREFIX_END,), lo=start)
+        found = {product_id for _, product_id in self._prefix_keys[start:end]}
+        top = heapq.nsmallest(settings.search_suggest_max, found, key=self._rank.__getitem__)
+        if end - start > settings.search_suggest_memo_keys:
+            # A long but popular prefix ("돼지앞다리"): rank it once per index build.
+            self._top_by_prefix[prefix] = top
+        return [self.documents[product_id] for product_id in top[:limit]]
+
+
+def load_search_documents(db: Session) -> list[SearchDocument]:
+    rows = db.execute(
+        select(Product.id, Product.name, Product.description, Product.popularity).where(
+            and_(Product.is_visible.is_(True), Product.status == ProductStatus.ACTIVE)
+        )
+    )
+    return [SearchDocument(row.id, row.name, row.description, row.popularity) for row in rows]
+
+
+class ProductSearchIndexCache:
+    # Stale when the catalog cache version moves (admin product writes in
+    # this process) or after the TTL (writes in other workers). Only the first
+    # build runs in the request. After that a stale index keeps serving while
+    # one background thread rebuilds it, at most once per
+    # rebuild_interval_seconds, so a burst of catalog writes costs one rebuild
+    # and search never waits on one.
+    def __init__(self, ttl_seconds: float, rebuild_interval_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self.rebuild_interval_seconds = rebuild_interval_seconds
+        self._index: ProductSearchIndex | None = None
+        self._built_at = 0.0
+        self._version = -1
+        self._generation = 0
+        self._rebuilding = False
+        self._rebuild_started_at = -math.inf
+        self._lock = threading.Lock()
+        self.rebuilds = 0
+        self.errors = 0
+        self.last_error: str | None = None
+
+    def _fresh(self, version: int) -> bool:
+        return (
+            self._index is not None
+            and self._version == version
+            and time.monotonic() - self._built_at < self.ttl_seconds
+        )
+
+    def get(self, db: Session) -> ProductSearchIndex:
+        from app.cache import catalog_cache
+
+        version = catalog_cache.version
+        index = self._index
+        if index is None:
+            return self._build(db, version)
+        if not self._fresh(version):
+            self._start_rebuild()
+        return index
+
+    def _build(self, db: Session, version: int) -> ProductSearchIndex:
+        # Loaded outside the lock, for the same reason as RadiusZoneIndexCache:
+        # under run_sync the query awaits on the event loop thread.
+        generation = self._generation
+        index = ProductSearchIndex(load_search_documents(db))
+        with self._lock:
+            if self._generation == generation:
+                self._index = index
+                self._built_at = time.monotonic()
+                self._version = version
+            self.rebuilds += 1
+        return index
+
+    def _start_rebuild(self) -> None:
+        with self._lock:
+            if self._rebuilding or time.monotonic() - self._rebuild_started_at < self.rebuild_interval_seconds:
+                return
+            self._rebuilding = True
+            self._rebuild_started_at = time.monotonic()
+        threading.Thread(target=self._rebuild, name='product-search-index', daemon=True).start()
+
+    def _rebuild(self) -> None:
+        from app.cache import catalog_cache
+        from app.db import SessionLocal
+
+        try:
+            # Version read first: a write during the load leaves the new
+            # index stale, and the next search schedules another rebuild.
+            version = catalog_cache.version
+            with SessionLocal() as db:
+                self._build(db, version)
+        except Exception as exc:  # the stale index keeps serving; retried on a later search
+            with self._lock:
+                self.errors += 1
+                self.last_error = repr(exc)
+        finally:
+            with self._lock:
+                self._rebuilding = False
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._index = None
+            self._generation += 1
+
+    def stats(self) -> dict:
+        index = self._index
+        return {
+            'documents': len(index) if index is not None else None,
+            'rebuilds': self.rebuilds,
+            'rebuilding': self._rebuilding,
+            'errors': self.errors,
+            'last_error': self.last_error,
+            'ttl_seconds': self.ttl_seconds,
+            'rebuild_interval_seconds': self.rebuild_interval_seconds,
+        }
+
+
+product_search_index = ProductSearchIndexCache(
+    settings.search_index_ttl_seconds, settings.search_index_rebuild_interval_seconds
+)
+
+
+def search_backend(db: Session) -> str:
+    if settings.search_backend != 'auto':
+        return settings.search_backend
+    return 'postgres' if db.get_bind().dialect.name == 'postgresql' else 'memory'
+
+
+def search_postgres(db: Session, query: str, limit: int) -> dict[int, float]:
+    # Served by the pg_trgm GIN indexes on products.name/description: ILIKE for
+    # substrings and <% for typo-tolerant word similarity.
+    phrase = query.strip()
+    pattern = f'%{phrase}%'
+    name_similarity = func.word_similarity(literal(phrase), Product.name)
+    description_similarity = func.word_similarity(literal(phrase), func.coalesce(Product.description, ''))
+    rows = db.execute(
+        select(Product.id, Product.popularity, Product.name, name_similarity, description_similarity)
+        .where(
+            and_(
+                Product.is_visible.is_(True),
+                Product.status == ProductStatus.ACTIVE,
+                or_(
+                    Product.name.ilike(pattern),
+                    Product.description.ilike(pattern),
+                    literal(phrase).op('<%')(Product.name),
+                ),
+            )
+        )
+        .order_by(name_similarity.desc(), Product.id.asc())
+        .limit(limit)
+    ).all()
+    if not rows:
+        return {}
+
+    max_popularity = max(row.popularity for row in rows)
+    needle = normalize(phrase)
+    scores = {}
+    for product_id, popularity, name, name_score, description_score in rows:
+        relevance = max(float(name_score), DESCRIPTION_WEIGHT * float(description_score))
+        if needle in normalize(name):
+            relevance += 1.0
+        scores[product_id] = blend_score(relevance, popularity, max_popularity)
+    return scores
+
+
+def search_products(db: Session, query: str, limit: int | None = None) -> dict[int, float]:
+    # product id -> blended score (relevance + popularity), best first.
+    limit = limit or settings.search_max_candidates
+    if search_backend(db) == 'postgres':
+        return search_postgres(db, query, limit)
+    return product_search_index.get(db).search(query, limit)
+
+
+def suggest_products(db: Session, prefix: str, limit: int) -> list[SearchDocument]:
+    return product_search_index.get(db).suggest(prefix, limit)
@@ -16,6 +16,7 @@ from app.models import (
     StorePolicy,
     ZoneType,
 )
+from app.pricing import refresh_promotion_prices
 
 
 def seed_if_empty(db: Session) -> None:
@@ -189,4 +190,5 @@ def seed_if_empty(db: Session) -> None:
         )
     )
 
+    refresh_promotion_prices(db)
     db.commit()
@@ -1,15 +1,15 @@
 from __future__ import annotations
 
-import math
 import secrets
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta, timezone
 from decimal import Decimal
 from zoneinfo import ZoneInfo
 
-from sqlalchemy import and_, or_, select
-from sqlalchemy.orm import Session
+from sqlalchemy import Select, and_, insert, or_, select, update
+from sqlalchemy.orm import Session, joinedload, selectinload
 
+from app.inventory import StockReservationError, release_reserved_stock, reserve_stock, settle_reserved_stock
 from app.models import (
     AdminUser,
     CancellationRequest,
@@ -27,6 +27,7 @@ from app.models import (
     ZoneType,
 )
 from app.core import get_settings
+from app.zones import radius_zone_index
 
 settings = get_settings()
 LOCAL_TZ = ZoneInfo(settings.time_zone)
@@ -67,9 +68,18 @@ def is_order_status_transition_allowed(
 
 
 def effective_price(product: Product) -> Decimal:
+    # Best of base/sale/live promotion price (see app.pricing). The column is
+    # refreshed on flush; fall back for products not flushed yet.
+    if product.effective_price is not None:
+        return product.effective_price
     return product.sale_price if product.sale_price is not None else product.base_price
 
 
+def available_stock(product: Product) -> int:
+    # stock_qty is on-hand stock; open orders hold reserved_qty of it until dispatch.
+    return max(product.stock_qty - product.reserved_qty, 0)
+
+
 def to_decimal(value: float | Decimal | int | None) -> Decimal:
     if value is None:
         return Decimal('0')
@@ -128,15 +138,27 @@ def get_or_create_cart(db: Session, session_key: str, user_id: int | None = None
 
 
 def fetch_cart_items(db: Session, cart_id: int) -> list[CartItem]:
+    # Products are joined in the same round trip so callers can read item.product
+    # without issuing one SELECT per cart line.
     return list(
         db.scalars(
             select(CartItem)
+            .options(joinedload(CartItem.product))
             .where(CartItem.cart_id == cart_id)
-            .order_by(CartItem.created_at.asc())
+            .order_by(CartItem.created_at.asc(), CartItem.id.asc())
         )
     )
 
 
+def select_orders_with_items() -> Select[tuple[Order]]:
+    # order_to_schema walks order.items; prefetch them in one extra query per page.
+    return select(Order).options(selectinload(Order.items))
+
+
+def get_order_with_items(db: Session, order_id: int) -> Order | None:
+    return db.get(Order, order_id, options=[selectinload(Order.items)])
+
+
 def calculate_cart_subtotal(items: list[CartItem]) -> Decimal:
     subtotal = Decimal('0')
     for item in items:
@@ -144,16 +166,6 @@ def calculate_cart_subtotal(items: list[CartItem]) -> Decimal:
     return subtotal
 
 
-def haversine_m(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
-    r = 6371000
-    phi1, phi2 = math.radians(lat1), math.radians(lat2)
-    d_phi = math.radians(lat2 - lat1)
-    d_lam = math.radians(lng2 - lng1)
-
-    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lam / 2) ** 2
-    return 2 * r * math.atan2(math.sqrt(a), math.sqrt(1 - a))
-
-
 def match_delivery_zone(
     db: Session,
     dong_code: str | None,
@@ -188,20 +200,15 @@ def match_delivery_zone(
             return dong_zone
 
     if latitude is not None and longitude is not None:
-        radius_zones = list(
-            db.scalars(
-                base_query.where(DeliveryZone.zone_type == ZoneType.RADIUS).order_by(
-                    DeliveryZone.radius_m.asc(),
-                    DeliveryZone.id.desc(),
-                )
-            )
-        )
-        for zone in radius_zones:
-            if zone.center_lat is None or zone.center_lng is None or zone.radius_m is None:
-                continue
-            distance = haversine_m(float(zone.center_lat), float(zone.center_lng), latitude, longitude)
-            if distance <= zone.radius_m:
+        for _ in range(2):
+            matched = radius_zone_index.get(db).match(latitude, longitude)
+            if matched is None:
+                break
+            zone = db.get(DeliveryZone, matched[0].zone_id)
+            if zone is not None and zone.is_active and zone.zone_type == ZoneType.RADIUS:
                 return zone
+            # Zone changed in another worker since the index was built.
+            radius_zone_index.invalidate()
 
     return None
 
@@ -216,6 +223,7 @@ class ValidationResult:
     min_order_amount: Decimal
     free_delivery_threshold: Decimal
     zone: DeliveryZone | None
+    items: list[CartItem] = field(default_factory=list)
 
 
 def validate_checkout(
@@ -283,7 +291,7 @@ def validate_checkout(
 
     subtotal = Decimal('0')
     for item in items:
-        product = db.get(Product, item.product_id)
+        product = item.product
         if product is None or not product.is_visible or product.status != ProductStatus.ACTIVE:
             errors.append('OUT_OF_STOCK')
             continue
@@ -294,6 +302,11 @@ def validate_checkout(
         if available < item.qty:
             errors.append('INSUFFICIENT_STOCK')
             continue
+        # Charge the current price: a promotion may have started or ended since
+        # the item was added. create_order reads the refreshed snapshot.
+        current_price = effective_price(product)
+        if item.unit_snapshot_price != current_price:
+            item.unit_snapshot_price = current_price
         subtotal += to_decimal(item.unit_snapshot_price) * item.qty
 
     min_order = to_decimal(zone.min_order_amount if zone and zone.min_order_amount is not None else policy.min_order_amount_default)
@@ -313,6 +326,7 @@ def validate_checkout(
         min_order_amount=min_order,
         free_delivery_threshold=free_threshold,
         zone=zone,
+        items=items,
     )
 
 
@@ -368,30 +382,40 @@ def create_order(
     db.add(order)
     db.flush()
 
-    items = fetch_cart_items(db, cart.id)
+    # Reuse the cart snapshot loaded by validate_checkout instead of re-reading the cart.
+    items = quote.items
+    order_item_rows: list[dict] = []
+    reserve_quantities: dict[int, int] = {}
     for item in items:
-        product = db.get(Product, item.product_id)
+        product = item.product
         if product is None:
             raise DomainError('OUT_OF_STOCK', '상품을 찾을 수 없습니다.')
 
-        if product.stock_qty - product.reserved_qty < item.qty:
-            raise DomainError('INSUFFICIENT_STOCK', f'{product.name} 재고가 부족합니다.')
-
-        product.stock_qty -= item.qty
+        reserve_quantities[product.id] = reserve_quantities.get(product.id, 0) + item.qty
         line_estimated = to_decimal(item.unit_snapshot_price) * item.qty
 
-        order_item = OrderItem(
-            order_id=order.id,
-            product_id=product.id,
-            product_name_snapshot=product.name,
-            unit_snapshot=product.unit_label,
-            qty_ordered=item.qty,
-            qty_fulfilled=item.qty,
-            unit_price_estimated=item.unit_snapshot_price,
-            is_weight_item=product.is_weight_item,
-            line_estimated=line_estimated,
+        order_item_rows.append(
+            {
+                'order_id': order.id,
+                'product_id': product.id,
+                'product_name_snapshot': product.name,
+                'unit_snapshot': product.unit_label,
+                'qty_ordered': item.qty,
+                'qty_fulfilled': item.qty,
+                'unit_price_estimated': item.unit_snapshot_price,
+                'is_weight_item': product.is_weight_item,
+                'line_estimated': line_estimated,
+            }
         )
-        db.add(order_item)
+
+    try:
+        reserve_stock(db, reserve_quantities)
+    except StockReservationError as exc:
+        names = [item.product.name for item in items if item.product_id in exc.product_ids]
+        raise DomainError('INSUFFICIENT_STOCK', f"{', '.join(names)} 재고가 부족합니다.") from exc
+
+    if order_item_rows:
+        db.execute(insert(OrderItem), order_item_rows)
 
     status_log = OrderStatusLog(
         order_id=order.id,
@@ -430,6 +454,11 @@ def update_order_status(
 
     order.status = to_status
 
+    if to_status == OrderStatus.OUT_FOR_DELIVERY:
+        settle_reserved_stock(db, [order.id])
+    if to_status == OrderStatus.CANCELED:
+        release_reserved_stock(db, [order.id])
+
     now = datetime.now(timezone.utc)
     if to_status == OrderStatus.PICKING:
         order.picked_at = now
@@ -449,3 +478,100 @@ def update_order_status(
     )
     db.flush()
     return order, True
+
+
+@dataclass
+class OrderStatusOutcome:
+    order_id: int
+    from_status: OrderStatus | None = None
+    changed: bool = False
+    error: DomainError | None = None
+
+
+def bulk_update_order_status(
+    db: Session,
+    order_ids: list[int],
+    to_status: OrderStatus,
+    changed_by: str,
+    reason: str | None,
+    changed_by_type: str = 'ADMIN',
+) -> list[OrderStatusOutcome]:
+    # update_order_status for many orders at once: one read of the current
+    # statuses, transitions checked in memory, one conditional UPDATE per
+    # current status and one bulk status-log insert. An order that fails its
+    # check is reported and skipped; the rest still move. The UPDATE only
+    # matches orders still in the status that was checked, so one changed
+    # concurrently is reported instead of being moved from a status it was
+    # never checked against. The caller commits.
+    order_ids = list(dict.fromkeys(order_ids))
+    current = dict(db.execute(select(Order.id, Order.status).where(Order.id.in_(order_ids))).all())
+
+    outcomes: list[OrderStatusOutcome] = []
+    pending: dict[OrderStatus, list[int]] = {}
+    for order_id in order_ids:
+        outcome = OrderStatusOutcome(order_id, current.get(order_id))
+        outcomes.append(outcome)
+        from_status = outcome.from_status
+        if from_status is None:
+            outcome.error = DomainError('ORDER_NOT_FOUND', '주문을 찾을 수 없습니다.')
+        elif from_status == to_status:
+            continue
+        elif not is_order_status_transition_allowed(from_status, to_status):
+            allowed = [status.value for status in get_allowed_next_order_statuses(from_status)]
+            outcome.error = DomainError(
+                'INVALID_STATUS_TRANSITION',
+                f'허용되지 않은 상태 전이입니다: {from_status.value} -> {to_status.value} (allowed={allowed})',
+            )
+        else:
+            pending.setdefault(from_status, []).append(order_id)
+
+    now = datetime.now(timezone.utc)
+    values: dict = {'status': to_status}
+    if to_status == OrderStatus.PICKING:
+        values['picked_at'] = now
+    if to_status == OrderStatus.DELIVERED:
+        values['delivered_at'] = now
+        values['total_final'] = Order.total_estimated
+
+    moved: set[int] = set()
+    for from_status, ids in pending.items():
+        stmt = (
+            update(Order)
+            .where(Order.id.in_(ids), Order.status == from_status)
+            .values(**values)
+            .returning(Order.id)
+        )
+        moved.update(db.scalars(stmt))
+
+    for outcome in outcomes:
+        if outcome.order_id in moved:
+            outcome.changed = True
+        elif outcome.error is None and outcome.from_status != to_status:
+            outcome.error = DomainError('ORDER_STATUS_CONFLICT', '다른 요청에서 주문 상태가 변경되었습니다.')
+
+    changed = [outcome for outcome in outcomes if outcome.changed]
+    if not changed:
+        return outcomes
+
+    changed_ids = [outcome.order_id for outcome in changed]
+    if to_status == OrderStatus.OUT_FOR_DELIVERY:
+        settle_reserved_stock(db, changed_ids)
+    if to_status == OrderStatus.CANCELED:
+        release_reserved_stock(db, changed_ids)
+
+    db.execute(
+        insert(OrderStatusLog),
+        [
+            {
+                'order_id': outcome.order_id,
+                'from_status': outcome.from_status.value,
+                'to_status': to_status.value,
+                'changed_by_type': changed_by_type,
+                'changed_by_id': changed_by,
+                'reason': reason,
+            }
+            for outcome in changed
+        ],
+    )
+    db.flush()
+    return outcomes
@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+import math
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.core import get_settings
+from app.models import Order, OrderItem, OrderStatus, PickWave, PickWaveOrder, WaveStatus
+from app.services import DomainError
+
+settings = get_settings()
+
+# Orders planned into waves, and the ones a wave still picks (a substitution
+# in progress keeps its lines on the handheld; a cancellation drops them).
+WAVE_ORDER_STATUSES = [OrderStatus.RECEIVED, OrderStatus.PICKING]
+WAVE_PICK_STATUSES = [OrderStatus.RECEIVED, OrderStatus.PICKING, OrderStatus.SUBSTITUTION_PENDING]
+
+ALLOWED_WAVE_STATUS_TRANSITIONS: dict[WaveStatus, set[WaveStatus]] = {
+    WaveStatus.PLANNED: {WaveStatus.PICKING, WaveStatus.CANCELED},
+    WaveStatus.PICKING: {WaveStatus.COMPLETED, WaveStatus.CANCELED},
+    WaveStatus.COMPLETED: set(),
+    WaveStatus.CANCELED: set(),
+}
+
+
+@dataclass(frozen=True)
+class WaveLimits:
+    slot_window_minutes: int
+    max_items: int
+    tote_capacity: int
+    max_totes: int
+
+    @classmethod
+    def from_settings(cls) -> WaveLimits:
+        return cls(
+            slot_window_minutes=settings.wave_slot_window_minutes,
+            max_items=settings.wave_max_items,
+            tote_capacity=settings.wave_tote_capacity,
+            max_totes=settings.wave_max_totes,
+        )
+
+
+@dataclass(frozen=True)
+class WaveCandidate:
+    order_id: int
+    requested_slot_start: datetime | None
+    delivery_zone_id: int | None
+    ordered_at: datetime
+    item_count: int
+
+
+@dataclass
+class PlannedWave:
+    slot_start: datetime | None
+    delivery_zone_id: int | None
+    # (order, first tote, tote count); totes are numbered from 1 within the wave.
+    orders: list[tuple[WaveCandidate, int, int]] = field(default_factory=list)
+    item_count: int = 0
+    tote_count: int = 0
+
+    def add(self, candidate: WaveCandidate, totes: int) -> None:
+        self.orders.append((candidate, self.tote_count + 1, totes))
+        self.item_count += candidate.item_count
+        self.tote_count += totes
+
+
+def slot_window(slot_start: datetime | None, window_minutes: int) -> datetime | None:
+    # Floors a requested slot start to its window, counted from midnight.
+    if slot_start is None:
+        return None
+    minutes = (slot_start.hour * 60 + slot_start.minute) % window_minutes
+    return slot_start - timedelta(minutes=minutes, seconds=slot_start.second, microseconds=slot_start.microsecond)
+
+
+def group_waves(candidates: Iterable[WaveCandidate], limits: WaveLimits) -> list[PlannedWave]:
+    # Orders sharing a slot window and delivery zone go out together, so they
+    # are picked together. Each group is cut into waves in slot and order
+    # time order, a new wave starting when the next order would go over the
+    # item cap or the totes one cart holds. Orders are never split across
+    # waves and never share a tote; an order larger than the caps gets a wave
+    # of its own.
+    groups: dict[tuple[datetime | None, int | None], list[WaveCandidate]] = {}
+    for candidate in candidates:
+        key = (slot_window(candidate.requested_slot_start, limits.slot_window_minutes), candidate.delivery_zone_id)
+        groups.setdefault(key, []).append(candidate)
+
+    def group_order(key: tuple[datetime | None, int | None]) -> tuple:
+        window, zone_id = key
+        # Slotted windows first, earliest first; orders without a slot last.
+        return (window is None, window.timestamp() if window else 0.0, zone_id is None, zone_id or 0)
+
+    waves: list[PlannedWave] = []
+    for key in sorted(groups, key=group_order):
+        members = sorted(
+            groups[key],
+            key=lambda candidate: (
+                candidate.requested_slot_start.timestamp() if candidate.requested_slot_start else 0.0,
+                candidate.ordered_at.timestamp(),
+                candidate.order_id,
+            ),
+        )
+        wave: PlannedWave | None = None
+        for candidate in members:
+            totes = max(1, math.ceil(candidate.item_count / limits.tote_capacity))
+            if wave is not None and wave.orders and (
+                wave.item_count + candidate.item_count > limits.max_items
+                or wave.tote_count + totes > limits.max_totes
+            ):
+                wave = None
+            if wave is None:
+                wave = PlannedWave(slot_start=key[0], delivery_zone_id=key[1])
+                waves.append(wave)
+            wave.add(candidate, totes)
+    return waves
+
+
+def load_wave_candidates(db: Session) -> list[WaveCandidate]:
+    # Open orders not yet in a wave, with their unit counts, in one query.
+    stmt = (
+        select(
+            Order.id,
+            Order.requested_slot_start,
+            Order.delivery_zone_id,
+            Order.ordered_at,
+            func.coalesce(func.sum(OrderItem.qty_ordered), 0),
+        )
+        .join(OrderItem, OrderItem.order_id == Order.id)
+        .outerjoin(PickWaveOrder, PickWaveOrder.order_id == Order.id)
+        .where(Order.status.in_(WAVE_ORDER_STATUSES), PickWaveOrder.id.is_(None))
+        .group_by(Order.id, Order.requested_slot_start, Order.delivery_zone_id, Order.ordered_at)
+    )
+    return [WaveCandidate(*row) for row in db.execute(stmt)]
+
+
+def plan_waves(db: Session, limits: WaveLimits, created_by: str | None = None) -> list[PickWave]:
+    # Persists waves for every open order not yet in one. The unique
+    # order_id on pick_wave_orders makes a concurrent planner's commit fail
+    # instead of putting an order in two waves. The caller commits.
+    waves = []
+    for planned in group_waves(load_wave_candidates(db), limits):
+        wave = PickWave(
+            status=WaveStatus.PLANNED,
+            slot_start=planned.slot_start,
+            delivery_zone_id=planned.delivery_zone_id,
+            order_count=len(planned.orders),
+            item_count=planned.item_count,
+            tote_count=planned.tote_count,
+            created_by=created_by,
+        )
+        wave.orders = [
+            PickWaveOrder(
+                order_id=candidate.order_id,
+                first_tote=first_tote,
+                tote_count=tote_count,
+                item_count=candidate.item_count,
+            )
+            for candidate, first_tote, tote_count in planned.orders
+        ]
+        db.add(wave)
+        waves.append(wave)
+    db.flush()
+    return waves
+
+
+def update_wave_status(wave: PickWave, to_status: WaveStatus) -> bool:
+    if wave.status == to_status:
+        return False
+    if to_status not in ALLOWED_WAVE_STATUS_TRANSITIONS[wave.status]:
+        allowed = sorted(status.value for status in ALLOWED_WAVE_STATUS_TRANSITIONS[wave.status])
+        raise DomainError(
+            'INVALID_WAVE_STATUS_TRANSITION',
+            f'허용되지 않은 웨이브 상태 전이입니다: {wave.status.value} -> {to_status.value} (allowed={allowed})',
+        )
+    wave.status = to_status
+    if to_status == WaveStatus.CANCELED:
+        # Frees the orders for the next planning run.
+        wave.orders.clear()
+    return True
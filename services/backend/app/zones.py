@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+import math
+import threading
+import time
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+from sqlalchemy import and_, select
+from sqlalchemy.orm import Session
+
+from app.core import get_settings
+from app.models import DeliveryZone, ZoneType
+
+settings = get_settings()
+
+EARTH_RADIUS_M = 6371000
+# On the same sphere as haversine_m, so a zone's bounding box always contains
+# its circle; the margin covers float rounding at the edge.
+METERS_PER_DEGREE_LAT = math.pi * EARTH_RADIUS_M / 180
+BBOX_MARGIN = 1.001
+
+
+def haversine_m(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    r = EARTH_RADIUS_M
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = math.radians(lat2 - lat1)
+    d_lam = math.radians(lng2 - lng1)
+
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lam / 2) ** 2
+    return 2 * r * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+
+
+@dataclass(frozen=True)
+class RadiusZoneEntry:
+    zone_id: int
+    lat: float
+    lng: float
+    radius_m: int
+    min_lat: float
+    max_lat: float
+    min_lng: float
+    max_lng: float
+
+    @classmethod
+    def build(cls, zone_id: int, lat: float, lng: float, radius_m: int) -> RadiusZoneEntry:
+        d_lat = radius_m * BBOX_MARGIN / METERS_PER_DEGREE_LAT
+        widest_lat = min(abs(lat) + d_lat, 89.9)
+        d_lng = radius_m * BBOX_MARGIN / (METERS_PER_DEGREE_LAT * math.cos(math.radians(widest_lat)))
+        return cls(
+            zone_id=zone_id,
+            lat=lat,
+            lng=lng,
+            radius_m=radius_m,
+            min_lat=lat - d_lat,
+            max_lat=lat + d_lat,
+            min_lng=lng - d_lng,
+            max_lng=lng + d_lng,
+        )
+
+    def contains_bbox(self, lat: float, lng: float) -> bool:
+        return self.min_lat <= lat <= self.max_lat and self.min_lng <= lng <= self.max_lng
+
+
+def radius_zone_precedence(zone_id: int, radius_m: int) -> tuple[int, int]:
+    # Same precedence as the original scan: smallest radius first, newest zone on ties.
+    return radius_m, -zone_id
+
+
+class RadiusZoneIndex:
+    # Uniform lat/lng grid. Every zone is registered in each cell its bounding box
+    # touches, and each cell keeps its zones in precedence order, so a lookup only
+    # checks the handful of zones near the point and can stop at the first hit.
+    def __init__(self, entries: Iterable[RadiusZoneEntry], cell_deg: float):
+        self.cell_deg = cell_deg
+        self.entries = sorted(entries, key=lambda entry: radius_zone_precedence(entry.zone_id, entry.radius_m))
+        self._cells: dict[tuple[int, int], list[RadiusZoneEntry]] = {}
+        for entry in self.entries:
+            min_row, min_col = self._cell(entry.min_lat, entry.min_lng)
+            max_row, max_col = self._cell(entry.max_lat, entry.max_lng)
+            for row in range(min_row, max_row + 1):
+                for col in range(min_col, max_col + 1):
+                    self._cells.setdefault((row, col), []).append(entry)
+
+    @classmethod
+    def from_zones(cls, zones: Iterable[DeliveryZone], cell_deg: float | None = None) -> RadiusZoneIndex:
+        entries = [
+            RadiusZoneEntry.build(zone.id, float(zone.center_lat), float(zone.center_lng), zone.radius_m)
+            for zone in zones
+            if zone.center_lat is not None and zone.center_lng is not None and zone.radius_m is not None
+        ]
+        return cls(entries, cell_deg or settings.zone_index_cell_deg)
+
+    def _cell(self, lat: float, lng: float) -> tuple[int, int]:
+        return math.floor(lat / self.cell_deg), math.floor(lng / self.cell_deg)
+
+    def candidates(self, lat: float, lng: float) -> list[RadiusZoneEntry]:
+        return self._cells.get(self._cell(lat, lng), [])
+
+    def match(self, lat: float, lng: float) -> tuple[RadiusZoneEntry, float] | None:
+        for entry in self.candidates(lat, lng):
+            if not entry.contains_bbox(lat, lng):
+                continue
+            distance = haversine_m(entry.lat, entry.lng, lat, lng)
+            if distance <= entry.radius_m:
+                return entry, distance
+        return None
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+
+def load_active_radius_zones(db: Session) -> list[DeliveryZone]:
+    return list(
+        db.scalars(
+            select(DeliveryZone).where(
+                and_(DeliveryZone.is_active.is_(True), DeliveryZone.zone_type == ZoneType.RADIUS)
+            )
+        )
+    )
+
+
+class RadiusZoneIndexCache:
+    # Admin zone writes invalidate this process immediately; the TTL picks up
+    # writes served by other workers.
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._index: RadiusZoneIndex | None = None
+        self._built_at = 0.0
+        self._generation = 0
+        self._lock = threading.Lock()
+        self.rebuilds = 0
+
+    def get(self, db: Session) -> RadiusZoneIndex:
+        index = self._index
+        if index is not None and time.monotonic() - self._built_at < self.ttl_seconds:
+            return index
+
+        # Loaded outside the lock: through AsyncSession.run_sync this runs in a
+        # greenlet on the event loop, where a thread lock held across the
+        # awaited query would block every other request on that loop. Callers
+        # racing on a cold cache each load, and the last one swaps its index in.
+        generation = self._generation
+        index = RadiusZoneIndex.from_zones(load_active_radius_zones(db))
+        with self._lock:
+            # A load that overlapped an invalidation may predate the write; it
+            # still answers this call but is not kept.
+            if self._generation == generation:
+                self._index = index
+                self._built_at = time.monotonic()
+            self.rebuilds += 1
+        return index
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._index = None
+            self._generation += 1
+
+    def stats(self) -> dict:
+        index = self._index
+        return {
+            'zones': len(index) if index is not None else None,
+            'rebuilds': self.rebuilds,
+            'ttl_seconds': self.ttl_seconds,
+        }
+
+
+radius_zone_index = RadiusZoneIndexCache(settings.zone_index_ttl_seconds)
@@ -0,0 +1,57 @@
+import argparse
+import time
+
+from starlette.applications import Starlette
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from app.compression import CompressionMiddleware, brotli
+from app.responses import trusted_json
+from app.schemas import PickingListOut
+from benchmarks.json_serialization import synthetic_picking_list
+
+
+def picking_list_app(lines: int, gzip_level: int) -> Starlette:
+    # The /admin/picking-list body, served through the same middleware as app.main.
+    picking_list = synthetic_picking_list(lines)
+
+    async def endpoint(_):
+        return trusted_json(PickingListOut, picking_list)
+
+    app = Starlette(routes=[Route('/admin/picking-list', endpoint)])
+    app.add_middleware(CompressionMiddleware, gzip_level=gzip_level)
+    return app
+
+
+def measure(client: TestClient, encoding: str, requests: int) -> tuple[int, float]:
+    response = client.get('/admin/picking-list', headers={'Accept-Encoding': encoding})
+    assert response.headers.get('content-encoding', 'identity') == encoding
+    started = time.perf_counter()
+    for _ in range(requests):
+        client.get('/admin/picking-list', headers={'Accept-Encoding': encoding})
+    return response.num_bytes_downloaded, (time.perf_counter() - started) / requests * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Bytes on wire for /admin/picking-list with and without compression')
+    parser.add_argument('--lines', type=int, nargs='+', default=[50, 500, 2000])
+    parser.add_argument('--gzip-level', type=int, default=6)
+    parser.add_argument('--requests', type=int, default=20)
+    args = parser.parse_args()
+
+    encodings = ['identity', 'gzip'] + (['br'] if brotli is not None else [])
+    for lines in args.lines:
+        client = TestClient(picking_list_app(lines, args.gzip_level))
+        identity_bytes = None
+        print(f'picking-list lines={lines}')
+        for encoding in encodings:
+            size, latency = measure(client, encoding, args.requests)
+            identity_bytes = identity_bytes or size
+            print(
+                f'  {encoding:<8} bytes={size:>9} ({size / identity_bytes * 100:5.1f}% of identity)'
+                f' request={latency:.2f}ms'
+            )
+
+
+if __name__ == '__main__':
+    main()
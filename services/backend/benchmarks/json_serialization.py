@@ -0,0 +1,124 @@
+import argparse
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+from app.api.utils import product_to_schema
+from app.models import Category, Product, ProductStatus
+from app.responses import trusted_json
+from app.schemas import PickingListItemOut, PickingListOut, ProductOut
+
+
+def synthetic_products(count: int) -> list[Product]:
+    # Transient rows shaped like the seed data; product_to_schema only reads attributes.
+    category = Category(id=1, name='과일')
+    return [
+        Product(
+            id=product_id,
+            category_id=1,
+            category=category,
+            name=f'제주 감귤 1kg {product_id}',
+            sku=f'SKU-{product_id:06d}',
+            description='새콤달콤한 제철 감귤',
+            unit_label='1봉',
+            origin_country='대한민국',
+            storage_method='냉장',
+            is_weight_item=False,
+            base_price=Decimal('12900.00'),
+            sale_price=Decimal('9900.00') if product_id % 3 == 0 else None,
+            promo_price=None,
+            effective_price=Decimal('9900.00') if product_id % 3 == 0 else Decimal('12900.00'),
+            status=ProductStatus.ACTIVE,
+            stock_qty=40,
+            reserved_qty=2,
+            max_per_order=10,
+            pick_location=f'A-{product_id % 20:02d}-{product_id % 5:02d}',
+        )
+        for product_id in range(1, count + 1)
+    ]
+
+
+def synthetic_picking_list(lines: int) -> PickingListOut:
+    ordered_at = datetime(2026, 10, 17, 9, 0, tzinfo=timezone.utc)
+    items = [
+        PickingListItemOut(
+            order_id=line // 4 + 1,
+            order_no=f'ORD-20261017-{line // 4 + 1:05d}',
+            order_status='RECEIVED',
+            ordered_at=ordered_at + timedelta(seconds=line),
+            requested_slot_start=None,
+            order_item_id=line + 1,
+            product_id=line % 300 + 1,
+            product_name=f'제주 감귤 1kg {line % 300 + 1}',
+            unit_label='1봉',
+            qty_ordered=line % 3 + 1,
+            qty_fulfilled=0,
+            pick_location=f'A-{line % 20:02d}-{line % 5:02d}',
+        )
+        for line in range(lines)
+    ]
+    return PickingListOut(
+        generated_at=ordered_at, order_count=lines // 4 + 1, line_count=lines, items=items, summary=[]
+    )
+
+
+def default_path(loop: asyncio.AbstractEventLoop, field, content) -> bytes:
+    # What a route with response_model does: validate, serialize, then JSONResponse.
+    encoded = loop.run_until_complete(serialize_response(field=field, response_content=content, is_coroutine=True))
+    return JSONResponse(encoded).body
+
+
+def cpu_per_request(fn, requests: int) -> float:
+    fn()
+    started = time.process_time()
+    for _ in range(requests):
+        fn()
+    return (time.process_time() - started) / requests * 1000
+
+
+def report(label: str, default, trusted, requests: int) -> None:
+    assert default() == trusted(), f'{label}: response bodies differ'
+    before = cpu_per_request(default, requests)
+    after = cpu_per_request(trusted, requests)
+    print(f'{label}: bytes={len(trusted())}')
+    print(f'  default={before:.2f}ms trusted={after:.2f}ms cpu/request ({(1 - after / before) * 100:.0f}% less)')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='CPU per request of response_model encoding vs trusted_json')
+    parser.add_argument('--products', type=int, default=100)
+    parser.add_argument('--picking-lines', type=int, default=2000)
+    parser.add_argument('--requests', type=int, default=50)
+    args = parser.parse_args()
+
+    loop = asyncio.new_event_loop()
+    # FastAPI builds the response field once per route, at startup.
+    products_field = create_model_field(name='response', type_=list[ProductOut], mode='serialization')
+    picking_field = create_model_field(name='response', type_=PickingListOut, mode='serialization')
+    products = synthetic_products(args.products)
+    picking_list = synthetic_picking_list(args.picking_lines)
+
+    # Product listings build their schemas per request from ORM rows, so both
+    # paths include product_to_schema.
+    report(
+        f'products x{args.products}',
+        lambda: default_path(loop, products_field, [product_to_schema(product) for product in products]),
+        lambda: trusted_json(list[ProductOut], [product_to_schema(product) for product in products]).body,
+        args.requests,
+    )
+    report(
+        f'picking-list x{args.picking_lines}',
+        lambda: default_path(loop, picking_field, picking_list),
+        lambda: trusted_json(PickingListOut, picking_list).body,
+        args.requests,
+    )
+    loop.close()
+
+
+if __name__ == '__main__':
+    main()
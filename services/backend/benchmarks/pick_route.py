@@ -0,0 +1,70 @@
+import argparse
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+from app.pick_route import StoreLayout, listed_order_distance_m, plan_route
+from app.schemas import PickingListItemOut
+
+PATTERN = r'^(?P<aisle>[A-Z]+)-?(?P<bay>\d+)(?:-(?P<shelf>\d+))?$'
+
+
+def synthetic_wave(orders: int, lines_per_order: int, products: int, aisles: int, bays: int, seed: int):
+    rng = random.Random(seed)
+    locations = [
+        f'{chr(ord("A") + rng.randrange(aisles))}-{rng.randint(1, bays):02d}-{rng.randint(1, 4)}'
+        for _ in range(products)
+    ]
+    ordered_at = datetime(2026, 10, 17, 8, 0, tzinfo=timezone.utc)
+    items = []
+    for order_id in range(1, orders + 1):
+        for product_id in rng.sample(range(products), lines_per_order):
+            items.append(
+                PickingListItemOut(
+                    order_id=order_id,
+                    order_no=f'ORD-{order_id:05d}',
+                    order_status='RECEIVED',
+                    ordered_at=ordered_at + timedelta(minutes=order_id),
+                    requested_slot_start=None,
+                    order_item_id=len(items) + 1,
+                    product_id=product_id,
+                    product_name=f'상품 {product_id}',
+                    unit_label='개',
+                    qty_ordered=rng.randint(1, 3),
+                    qty_fulfilled=0,
+                    pick_location=locations[product_id],
+                )
+            )
+    return items
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Pick route length: listed order vs serpentine vs nearest neighbour')
+    parser.add_argument('--orders', type=int, nargs='+', default=[10, 300, 1000])
+    parser.add_argument('--lines-per-order', type=int, default=6)
+    parser.add_argument('--products', type=int, default=2000)
+    parser.add_argument('--aisles', type=int, default=12)
+    parser.add_argument('--bays', type=int, default=30)
+    parser.add_argument('--seed', type=int, default=5)
+    args = parser.parse_args()
+
+    layout = StoreLayout(PATTERN, bays_per_aisle=args.bays)
+    for orders in args.orders:
+        items = synthetic_wave(orders, args.lines_per_order, args.products, args.aisles, args.bays, args.seed)
+        # What pickers walk today: the summary, sorted by pick_location as text.
+        by_text = sorted(items, key=lambda item: (item.pick_location or 'ZZZZ', item.product_name))
+        print(f'wave: orders={orders} lines={len(items)}')
+        print(f'  listed order   distance={listed_order_distance_m(items, layout):>10.1f}m')
+        print(f'  location text  distance={listed_order_distance_m(by_text, layout):>10.1f}m')
+        for strategy in ['serpentine', 'nearest']:
+            started = time.perf_counter()
+            route = plan_route(items, layout, strategy)
+            elapsed = (time.perf_counter() - started) * 1000
+            print(
+                f'  {strategy:<14} distance={route.distance_m:>10.1f}m'
+                f' stops={len(route.stops)} plan={elapsed:.1f}ms'
+            )
+
+
+if __name__ == '__main__':
+    main()
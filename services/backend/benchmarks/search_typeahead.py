@@ -0,0 +1,59 @@
+import argparse
+import random
+import statistics
+import time
+
+from app.search import ProductSearchIndex, SearchDocument
+
+BRANDS = ['제주', '국내산', '청정', '해남', '무농약', '유기농', '프리미엄', '알뜰']
+ITEMS = ['감귤', '돼지앞다리', '한우등심', '냉동만두', '주방세제', '딸기', '고구마', '우유', '두부', '계란', '김치', '참기름']
+UNITS = ['1봉', '500g', '1kg', '1L', '10입', '(100g)', '2팩']
+
+
+def synthetic_documents(count: int, seed: int) -> list[SearchDocument]:
+    rng = random.Random(seed)
+    documents = []
+    for product_id in range(1, count + 1):
+        name = f'{rng.choice(BRANDS)} {rng.choice(ITEMS)} {rng.choice(UNITS)} {product_id}'
+        documents.append(SearchDocument(product_id, name, f'{rng.choice(ITEMS)} 상품', rng.randint(0, 100)))
+    return documents
+
+
+def measure(fn, queries: list[str]) -> list[float]:
+    latencies = []
+    for query in queries:
+        started = time.perf_counter()
+        fn(query)
+        latencies.append(time.perf_counter() - started)
+    return sorted(latencies)
+
+
+def report(label: str, latencies: list[float]) -> None:
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    print(f'{label}: queries={len(latencies)}')
+    print(f'  p50={statistics.median(latencies) * 1000:.3f}ms p99={p99 * 1000:.3f}ms max={latencies[-1] * 1000:.3f}ms')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='In-process product search and typeahead latency')
+    parser.add_argument('--products', type=int, default=100_000)
+    parser.add_argument('--queries', type=int, default=2000)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    index = ProductSearchIndex(synthetic_documents(args.products, args.seed))
+    print(f'index build: products={len(index)} {time.perf_counter() - started:.2f}s')
+
+    rng = random.Random(args.seed)
+    words = BRANDS + ITEMS
+    prefixes = []
+    for _ in range(args.queries):
+        word = rng.choice(words)
+        prefixes.append(word[: rng.randint(1, len(word))])
+    report('suggest', measure(lambda prefix: index.suggest(prefix, 10), prefixes))
+    report('search', measure(lambda query: index.search(query, 500), [rng.choice(ITEMS) for _ in range(args.queries // 10)]))
+
+
+if __name__ == '__main__':
+    main()